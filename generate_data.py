@@ -0,0 +1,45 @@
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.constant.training_pipeline import SYNTHETIC_CHUNK_SIZE
+from src.synthetic.generator import LAYOUTS, SyntheticCustomerGenerator
+from src.synthetic.sinks import write_csv, write_mongo, write_parquet
+
+
+def generate_data(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic customers that follow the repo's datasets")
+    parser.add_argument("--rows", type=int, required=True, help="number of customers to generate")
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="raw",
+                        help="raw marketing campaign columns or engineered (clustered) feature columns")
+    parser.add_argument("--format", choices=["csv", "parquet", "mongo"], default="csv")
+    parser.add_argument("--output", help="output file for csv and parquet")
+    parser.add_argument("--collection", help="target collection for mongo (MONGO_DB_URL, e.g. a local mongod)")
+    parser.add_argument("--drop", action="store_true", help="drop the target collection first")
+    parser.add_argument("--chunk-size", type=int, default=SYNTHETIC_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        generator = SyntheticCustomerGenerator(layout=args.layout, seed=args.seed)
+        chunks = generator.iter_chunks(args.rows, chunk_size=args.chunk_size)
+        if args.format == "mongo":
+            if not args.collection:
+                parser.error("--collection is required for --format mongo")
+            n_rows = write_mongo(chunks, args.collection, drop=args.drop)
+            target = args.collection
+        else:
+            target = args.output or f"data/synthetic/{args.layout}_{args.rows}.{args.format}"
+            n_rows = (write_csv if args.format == "csv" else write_parquet)(chunks, target)
+        print(f"✅ Generated {n_rows} {args.layout} rows into {target}")
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    generate_data()
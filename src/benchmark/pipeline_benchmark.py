@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from src.constant.env_variable import EMULATED_B2_LATENCY_MS, LOCAL_STORAGE_DIR, MONGODB_URL_KEY, STORAGE_BACKEND
+
+BENCHMARK_DIR = os.path.join("src", "artifact", "benchmarks")
+DEFAULT_SCALES = "10000"
+
+
+def run_scale(rows: int, layout: str, seed: int, mongo_url: Optional[str], keep_artifacts: bool) -> dict:
+    """
+    One benchmark run in this process: load rows synthetic customers into the Mongo stand-in and run
+    the full TrainPipeline on them. The storage backend comes from the environment set up by run().
+    """
+    if mongo_url:
+        os.environ[MONGODB_URL_KEY] = mongo_url
+    else:
+        try:
+            import mongomock
+        except ImportError as e:
+            raise ImportError("The in-process Mongo stand-in needs mongomock: pip install mongomock, "
+                              "or pass --mongo-url of a local mongod") from e
+        from src.configuration.mongo_db_connection import MongoDBClient
+
+        MongoDBClient.client = mongomock.MongoClient()
+
+    from src.constant.database import COLLECTION_NAME
+    from src.pipeline.run_report import peak_rss_mb
+    from src.pipeline.train_pipeline import TrainPipeline
+    from src.synthetic.generator import SyntheticCustomerGenerator
+    from src.synthetic.sinks import write_mongo
+
+    result = {"rows": rows, "layout": layout, "status": "failed", "error": None}
+    started = time.perf_counter()
+    write_mongo(SyntheticCustomerGenerator(layout=layout, seed=seed).iter_chunks(rows), COLLECTION_NAME, drop=True)
+    result["load_seconds"] = round(time.perf_counter() - started, 3)
+
+    train_pipeline = TrainPipeline(run_id=f"benchmark_{rows}_{datetime.now():%Y%m%d%H%M%S}")
+    artifact_dir = train_pipeline.training_pipeline_config.artifact_dir
+    # a feature store and score cache of its own, so the shared ones neither serve nor keep benchmark data
+    train_pipeline.data_ingestion_config.feature_store_root = os.path.join(artifact_dir, "feature_store")
+    train_pipeline.model_trainer_config.search_score_cache_dir = os.path.join(artifact_dir, "model_search_scores")
+    started = time.perf_counter()
+    try:
+        train_pipeline.run_pipeline()
+        result["status"] = "done"
+    except Exception as e:
+        result["error"] = str(e)
+    result["pipeline_seconds"] = round(time.perf_counter() - started, 3)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 2)
+
+    for report_name, key in (("pipeline_report.json", "pipeline"), ("run_report.json", "run_report")):
+        report_path = os.path.join(artifact_dir, report_name)
+        if os.path.exists(report_path):
+            with open(report_path) as file_obj:
+                result[key] = json.load(file_obj)
+    pipeline_report = result.pop("pipeline", {})
+    result["critical_path"] = pipeline_report.get("critical_path", [])
+    result["stages"] = result.pop("run_report", {}).get("stages", {})
+    for stage_name, stage in pipeline_report.get("stages", {}).items():
+        result["stages"].setdefault(stage_name, {})["status"] = stage["status"]
+
+    if not keep_artifacts:
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args) -> str:
+    """Each scale runs in a fresh process, so peak memory and caches of one scale do not leak into the next."""
+    scales = [int(scale) for scale in args.scales.split(",")]
+    storage_dir = tempfile.mkdtemp(prefix="benchmark_storage_")
+    env = dict(os.environ, **{STORAGE_BACKEND: args.storage, EMULATED_B2_LATENCY_MS: str(args.latency_ms),
+                              LOCAL_STORAGE_DIR: storage_dir})
+    results = []
+    try:
+        for rows in scales:
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+                result_path = result_file.name
+            command = [sys.executable, "-m", "src.benchmark.pipeline_benchmark", "run-one", "--rows", str(rows),
+                       "--layout", args.layout, "--seed", str(args.seed), "--result-file", result_path]
+            if args.mongo_url:
+                command += ["--mongo-url", args.mongo_url]
+            if args.keep_artifacts:
+                command.append("--keep-artifacts")
+            print(f"Benchmarking {rows} rows ({args.layout}, storage {args.storage})...")
+            completed = subprocess.run(command, env=env)
+            if completed.returncode == 0 and os.path.getsize(result_path) > 0:
+                with open(result_path) as file_obj:
+                    results.append(json.load(file_obj))
+            else:
+                results.append({"rows": rows, "layout": args.layout, "status": "crashed",
+                                "error": f"benchmark process exited with {completed.returncode}"})
+            os.remove(result_path)
+            print(f"  {results[-1]['status']}: {results[-1].get('pipeline_seconds')}s, "
+                  f"peak RSS {results[-1].get('peak_rss_mb')} MB")
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+    output_path = args.output or os.path.join(BENCHMARK_DIR, f"benchmark_{datetime.now():%Y%m%d%H%M%S}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as file_obj:
+        json.dump({
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+            "settings": {"layout": args.layout, "seed": args.seed, "storage": args.storage,
+                         "latency_ms": args.latency_ms, "mongo": "url" if args.mongo_url else "mongomock"},
+            "results": results,
+        }, file_obj, indent=2)
+    print(f"Results written to {output_path}")
+    return output_path
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """Per scale and stage: wall seconds and peak RSS of the candidate against the baseline."""
+    from src.pipeline.run_report import diff_reports
+
+    with open(baseline_path) as file_obj:
+        baseline = {result["rows"]: result for result in json.load(file_obj)["results"]}
+    with open(candidate_path) as file_obj:
+        candidate = {result["rows"]: result for result in json.load(file_obj)["results"]}
+
+    print(f"{'rows':>10}  {'stage':<22}{'wall base':>11}{'wall cand':>11}{'ratio':>8}{'rss base':>10}{'rss cand':>10}")
+    for rows in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[rows], candidate[rows]
+        diff = diff_reports({"stages": before.get("stages", {})}, {"stages": after.get("stages", {})})
+        diff["total"] = {
+            "wall_seconds": {"baseline": before.get("pipeline_seconds"), "candidate": after.get("pipeline_seconds")},
+            "peak_rss_mb": {"baseline": before.get("peak_rss_mb"), "candidate": after.get("peak_rss_mb")},
+        }
+        for stage_name, metrics in diff.items():
+            wall, rss = metrics["wall_seconds"], metrics["peak_rss_mb"]
+            ratio = (f"{wall['candidate'] / wall['baseline']:.3f}"
+                     if wall["baseline"] and wall["candidate"] is not None else "")
+            print(f"{rows:>10}  {stage_name:<22}{str(wall['baseline']):>11}{str(wall['candidate']):>11}{ratio:>8}"
+                  f"{str(rss['baseline']):>10}{str(rss['candidate']):>10}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the training pipeline against offline stand-ins")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="benchmark one or more data scales")
+    run_parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated row counts, e.g. 10000,1000000")
+    run_parser.add_argument("--output", help="results file (default src/artifact/benchmarks/benchmark_<time>.json)")
+    run_parser.add_argument("--storage", choices=["emulated_b2", "local"], default="emulated_b2",
+                            help="in-process B2 emulator or a temporary directory on disk")
+    run_parser.add_argument("--latency-ms", type=float, default=0, help="latency of every emulated_b2 call")
+
+    run_one_parser = subparsers.add_parser("run-one", help=argparse.SUPPRESS)
+    run_one_parser.add_argument("--rows", type=int, required=True)
+    run_one_parser.add_argument("--result-file", required=True)
+
+    for subparser in (run_parser, run_one_parser):
+        subparser.add_argument("--layout", choices=["raw", "engineered"], default="engineered")
+        subparser.add_argument("--seed", type=int, default=42)
+        subparser.add_argument("--mongo-url", help="a local mongod instead of the in-process mongomock stand-in")
+        subparser.add_argument("--keep-artifacts", action="store_true", help="keep the runs' artifact directories")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+    elif args.command == "run-one":
+        result = run_scale(args.rows, args.layout, args.seed, args.mongo_url, args.keep_artifacts)
+        with open(args.result_file, "w") as file_obj:
+            json.dump(result, file_obj, indent=2)
+    else:
+        compare(args.baseline, args.candidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List, Optional
+
+DEFAULT_ROWS = 100000
+# peak traced memory of the stage allowed per byte of its input frames, float32 and float64 output
+DEFAULT_MAX_RATIO = 1.75
+DEFAULT_MAX_RATIO_FLOAT64 = 2.5
+TEST_SHARE = 0.2
+
+
+def measure(rows: int, layout: str, seed: int, keep_float64: bool = False) -> dict:
+    """
+    Peak memory traced by tracemalloc while DataTransformation runs on rows synthetic customers,
+    against the size of its input: the train and test frames as pandas reads them. Memory-mapped
+    output arrays are file-backed and not part of the peak.
+    """
+    import pandas as pd
+
+    from src.components.data_transformation import DataTransformation
+    from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
+    from src.entity.config_entity import DataTransformationConfig
+    from src.synthetic.generator import SyntheticCustomerGenerator
+    from src.synthetic.sinks import write_csv
+    from src.utils.main_utils import MainUtils
+
+    drop_columns = [column.strip() for column in MainUtils().read_schema_config_file().get("drop_columns", [])]
+    generator = SyntheticCustomerGenerator(layout=layout, seed=seed)
+    with tempfile.TemporaryDirectory(prefix="transformation_memory_") as work_dir:
+        n_test = int(rows * TEST_SHARE)
+        paths = {}
+        for name, n_rows, id_offset in (("train", rows - n_test, 1), ("test", n_test, rows - n_test + 1)):
+            paths[name] = os.path.join(work_dir, f"{name}.csv")
+            chunks = (chunk.drop(columns=[column for column in drop_columns if column in chunk.columns])
+                      for chunk in generator.iter_chunks(n_rows, id_offset=id_offset))
+            write_csv(chunks, paths[name])
+        input_bytes = sum(pd.read_csv(path).memory_usage(deep=True).sum() for path in paths.values())
+
+        config = DataTransformationConfig(keep_float64=keep_float64)
+        config.transformed_train_file_path = os.path.join(work_dir, "transformed", "train.npy")
+        config.transformed_test_file_path = os.path.join(work_dir, "transformed", "test.npy")
+        config.transformed_object_file_path = os.path.join(work_dir, "transformed_object", "preprocessing.pkl")
+        data_transformation = DataTransformation(
+            data_ingestion_artifact=DataIngestionArtifact(trained_file_path=paths["train"], test_file_path=paths["test"]),
+            data_validation_artifact=DataValidationArtifact(
+                validation_status=True, valid_train_file_path=paths["train"], valid_test_file_path=paths["test"],
+                invalid_train_file_path="", invalid_test_file_path="", drift_report_file_path="",
+            ),
+            data_tranasformation_config=config,
+        )
+
+        started = time.perf_counter()
+        tracemalloc.start()
+        try:
+            data_transformation.initiate_data_transformation()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        seconds = time.perf_counter() - started
+
+    return {
+        "rows": rows,
+        "layout": layout,
+        "keep_float64": keep_float64,
+        "input_mb": round(input_bytes / 2 ** 20, 2),
+        "peak_mb": round(peak_bytes / 2 ** 20, 2),
+        "ratio": round(peak_bytes / input_bytes, 3),
+        "seconds": round(seconds, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Fail when the data transformation stage's peak memory exceeds a multiple of its input size")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS,
+                        help="below about 50000 rows fixed overheads dominate the ratio")
+    parser.add_argument("--layout", choices=["raw", "engineered"], default="raw")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-float64", action="store_true", help="transform in float64 instead of float32")
+    parser.add_argument("--max-ratio", type=float,
+                        help=f"largest allowed peak memory per byte of input (default {DEFAULT_MAX_RATIO}, "
+                             f"{DEFAULT_MAX_RATIO_FLOAT64} with --keep-float64)")
+    parser.add_argument("--output", help="also write the result as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.max_ratio is None:
+        args.max_ratio = DEFAULT_MAX_RATIO_FLOAT64 if args.keep_float64 else DEFAULT_MAX_RATIO
+
+    result = measure(args.rows, args.layout, args.seed, keep_float64=args.keep_float64)
+    result["max_ratio"] = args.max_ratio
+    result["passed"] = result["ratio"] <= args.max_ratio
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as file_obj:
+            json.dump(result, file_obj, indent=2)
+
+    print(f"{result['rows']} rows ({result['layout']}): input {result['input_mb']} MB, "
+          f"peak {result['peak_mb']} MB, ratio {result['ratio']} (max {args.max_ratio}), {result['seconds']}s")
+    if not result["passed"]:
+        print("FAILED: peak memory above the allowed multiple of the input size")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
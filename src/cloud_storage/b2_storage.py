@@ -1,63 +1,264 @@
 import os
 import sys
 import pickle
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from b2sdk.v2.exception import (B2ConnectionError, B2RequestTimeout, ConnectionReset, FileNotPresent,
+                                RequestTimeout, ServiceError, TooManyRequests)
 
 from src.configuration.b2_connection import B2Client
 from src.exception import CustomerException
 from src.logger import logging
-from src.utils.main_utils import MainUtils
+from src.utils.main_utils import MainUtils, compute_file_sha1
+
+TRANSIENT_B2_ERRORS = (B2ConnectionError, B2RequestTimeout, ConnectionReset, RequestTimeout, ServiceError,
+                       TooManyRequests)
+
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 20.0
+DEFAULT_TRANSFER_WORKERS = 8
 
 
 class B2Storage:
-    def __init__(self):
+    """
+    Thin wrapper over the shared B2Api of B2Client.
+
+    The B2Api, and with it the HTTP session, is created once per process, and bucket handles are
+    cached per bucket name, so an operation costs only its own request. Every call is retried with
+    full-jitter exponential backoff on transient B2 errors and timed into per-operation latency
+    counters; batch transfers run on a thread pool.
+    """
+
+    _buckets: Dict[str, object] = {}
+    _bucket_lock = Lock()
+    _latency_stats: Dict[str, dict] = {}
+    _stats_lock = Lock()
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, max_workers: int = DEFAULT_TRANSFER_WORKERS):
         self._ensure_environment()
         b2_client = B2Client()
         self.b2_api = b2_client.b2_api
+        self.max_retries = max_retries
+        self.max_workers = max_workers
 
     @staticmethod
     def _ensure_environment():
         env_loader = MainUtils()
         env_loader.load_dotenv_if_available()
 
+    def get_bucket(self, bucket_name: str):
+        bucket = B2Storage._buckets.get(bucket_name)
+        if bucket is None:
+            with B2Storage._bucket_lock:
+                bucket = B2Storage._buckets.get(bucket_name)
+                if bucket is None:
+                    bucket = self._call("get_bucket", self.b2_api.get_bucket_by_name, bucket_name)
+                    B2Storage._buckets[bucket_name] = bucket
+        return bucket
+
+    @staticmethod
+    def _record_latency(operation: str, elapsed_seconds: float, failed: bool) -> None:
+        with B2Storage._stats_lock:
+            stats = B2Storage._latency_stats.setdefault(
+                operation, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            stats["count"] += 1
+            stats["errors"] += int(failed)
+            stats["total_seconds"] += elapsed_seconds
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed_seconds)
+
+    @staticmethod
+    def get_latency_stats() -> Dict[str, dict]:
+        """Calls, errors, total/mean/max seconds per operation, retries included, since the last reset."""
+        with B2Storage._stats_lock:
+            return {
+                operation: dict(stats, mean_seconds=stats["total_seconds"] / stats["count"] if stats["count"] else 0.0)
+                for operation, stats in B2Storage._latency_stats.items()
+            }
+
+    @staticmethod
+    def reset_latency_stats() -> None:
+        with B2Storage._stats_lock:
+            B2Storage._latency_stats.clear()
+
+    def _call(self, operation: str, func: Callable, *args, retries: Optional[int] = None, **kwargs):
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                self._record_latency(operation, time.perf_counter() - start, failed=False)
+                return result
+            except TRANSIENT_B2_ERRORS as e:
+                self._record_latency(operation, time.perf_counter() - start, failed=True)
+                if attempt == retries:
+                    raise
+                delay = random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+                logging.warning(f"B2 {operation} failed ({e}), retry {attempt + 1} of {retries} in {delay:.2f}s")
+                time.sleep(delay)
+            except Exception:
+                self._record_latency(operation, time.perf_counter() - start, failed=True)
+                raise
+
     def file_exists(self, bucket_name: str, file_name: str) -> bool:
         try:
-            bucket = self.b2_api.get_bucket_by_name(bucket_name)
+            return self.get_file_info(bucket_name=bucket_name, file_name=file_name) is not None
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def get_file_info(self, bucket_name: str, file_name: str) -> Optional[dict]:
+        """Metadata of the latest version of file_name, or None when the bucket does not hold it."""
+        try:
+            bucket = self.get_bucket(bucket_name)
             try:
-                bucket.get_file_info_by_name(file_name)
-                return True
-            except:
-                return False
+                file_version = self._call("get_file_info", bucket.get_file_info_by_name, file_name)
+            except FileNotPresent:
+                return None
+
+            content_sha1 = file_version.content_sha1
+            if not content_sha1 or content_sha1 == "none":
+                content_sha1 = (file_version.file_info or {}).get("large_file_sha1")
+
+            return {
+                "file_id": file_version.id_,
+                "file_name": file_version.file_name,
+                "size": file_version.size,
+                "content_sha1": content_sha1,
+                "upload_timestamp": file_version.upload_timestamp,
+            }
         except Exception as e:
             raise CustomerException(e, sys)
 
     def download_file(self, bucket_name: str, file_name: str, local_path: str) -> None:
         try:
-            bucket = self.b2_api.get_bucket_by_name(bucket_name)
+            bucket = self.get_bucket(bucket_name)
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            bucket.download_file_by_name(file_name).save_to(local_path)
+            self._call("download", lambda: bucket.download_file_by_name(file_name).save_to(local_path))
             logging.info(f"Downloaded {file_name} from {bucket_name} to {local_path}")
         except Exception as e:
             raise CustomerException(e, sys)
 
-    def upload_file(self, bucket_name: str, local_path: str, file_name: str, remove: bool = False) -> None:
+    def upload_file(self, bucket_name: str, local_path: str, file_name: str, remove: bool = False,
+                    skip_if_unchanged: bool = False, min_part_size: Optional[int] = None,
+                    retries: Optional[int] = None) -> bool:
+        """
+        Upload local_path as file_name and return whether anything was sent.
+
+        The local sha1 is passed to B2, which splits files above min_part_size into parts uploaded
+        in parallel and retries failed parts. If the whole upload fails on a transient error it is
+        retried, and B2 resumes the unfinished large file with the same sha1 instead of starting
+        over. With skip_if_unchanged, content B2 already holds costs only one metadata call.
+        """
         try:
-            bucket = self.b2_api.get_bucket_by_name(bucket_name)
-            bucket.upload_local_file(local_file=local_path, file_name=file_name)
-            logging.info(f"Uploaded {local_path} to {bucket_name}/{file_name}")
+            content_sha1 = compute_file_sha1(local_path)
+
+            uploaded = True
+            if skip_if_unchanged:
+                remote_file_info = self.get_file_info(bucket_name=bucket_name, file_name=file_name)
+                uploaded = remote_file_info is None or remote_file_info["content_sha1"] != content_sha1
+
+            if uploaded:
+                bucket = self.get_bucket(bucket_name)
+                self._call(
+                    "upload",
+                    bucket.upload_local_file,
+                    local_file=local_path,
+                    file_name=file_name,
+                    sha1_sum=content_sha1,
+                    min_part_size=min_part_size,
+                    retries=retries,
+                )
+                logging.info(f"Uploaded {local_path} to {bucket_name}/{file_name}")
+            else:
+                logging.info(f"{bucket_name}/{file_name} already holds {local_path} (sha1 {content_sha1}), upload skipped")
+
             if remove:
                 os.remove(local_path)
+            return uploaded
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def read_file(self, bucket_name: str, file_name: str) -> bytes:
+        try:
+            bucket = self.get_bucket(bucket_name)
+
+            def download() -> bytes:
+                file_data = BytesIO()
+                bucket.download_file_by_name(file_name).save(file_data)
+                return file_data.getvalue()
+
+            return self._call("download", download)
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def stream_file(self, bucket_name: str, file_name: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield the content of file_name in chunks over a single streamed response."""
+        try:
+            bucket = self.get_bucket(bucket_name)
+            downloaded_file = self._call("stream", bucket.download_file_by_name, file_name)
+            yield from downloaded_file.response.iter_content(chunk_size=chunk_size)
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def upload_bytes(self, bucket_name: str, data: bytes, file_name: str) -> None:
+        try:
+            bucket = self.get_bucket(bucket_name)
+            self._call("upload", bucket.upload_bytes, data, file_name)
+            logging.info(f"Uploaded {len(data)} bytes to {bucket_name}/{file_name}")
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def list_files(self, bucket_name: str, prefix: str = "") -> List[str]:
+        try:
+            bucket = self.get_bucket(bucket_name)
+            file_versions = self._call("list", lambda: list(bucket.ls(prefix, latest_only=True, recursive=True)))
+            return [file_version.file_name for file_version, _ in file_versions]
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def download_files(self, bucket_name: str, files: List[Tuple[str, str]]) -> None:
+        """Download (file_name, local_path) pairs concurrently."""
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self.download_file, bucket_name, file_name, local_path)
+                    for file_name, local_path in files
+                ]
+                for future in futures:
+                    future.result()
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def upload_files(self, bucket_name: str, files: List[Tuple[str, str]], skip_if_unchanged: bool = False) -> List[bool]:
+        """Upload (local_path, file_name) pairs concurrently, returning for each whether it was sent."""
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self.upload_file, bucket_name, local_path, file_name,
+                                    skip_if_unchanged=skip_if_unchanged)
+                    for local_path, file_name in files
+                ]
+                return [future.result() for future in futures]
         except Exception as e:
             raise CustomerException(e, sys)
 
     def load_model(self, bucket_name: str, model_path: str):
         try:
-            bucket = self.b2_api.get_bucket_by_name(bucket_name)
-            downloaded_file = bucket.download_file_by_name(model_path)
-            file_data = BytesIO()
-            downloaded_file.save(file_data)
-            file_data.seek(0)
-            model = pickle.load(file_data)
+            bucket = self.get_bucket(bucket_name)
+
+            def download() -> BytesIO:
+                file_data = BytesIO()
+                bucket.download_file_by_name(model_path).save(file_data)
+                file_data.seek(0)
+                return file_data
+
+            model = pickle.load(self._call("load_model", download))
             logging.info(f"Loaded model from {bucket_name}/{model_path}")
             return model
         except Exception as e:
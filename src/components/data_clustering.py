@@ -1,4 +1,5 @@
 import sys
+import numpy as np
 from pandas import DataFrame
 
 from sklearn.decomposition import PCA
@@ -28,8 +29,7 @@ class CreateClusters:
             
         """
         try:
-            pca_object=PCA(**self.pca_config.__dict__).fit(preprocessed_data)
-            reduced_dataset = pca_object.fit_transform(preprocessed_data)
+            reduced_dataset = PCA(**self.pca_config.__dict__).fit_transform(preprocessed_data)
         
         
             logging.info("PCA transformation is done")
@@ -38,28 +38,44 @@ class CreateClusters:
         except Exception as e:
                 raise CustomerException(e,sys)
     
-    def initialize_clustering(self, preprocessed_data: DataFrame) -> DataFrame:
+    def get_cluster_labels(self, preprocessed_data) -> np.ndarray:
         """
-        Method Name :   initialize_clustering
-        Description :   This method initiates the clustering process 
+        Method Name :   get_cluster_labels
+        Description :   This method clusters the preprocessed dataset (a dataframe or an array)
         
-        Output      :   Data is clustered and the cluster names are used as lables to the preprocessed data and is returned.
+        Output      :   The cluster label of every row is returned, the data is left untouched
         On Failure  :   Write an exception log and then raise an exception
         
-        Version     :   0.1
+        Version     :   0.2
         
         """
         try:
             logging.info("Initializing clustering...")
-            
-            
+
             reduced_dataset = self.get_dataset_using_pca(preprocessed_data)
-            
+
             model = KMeans(n_clusters=3).fit(reduced_dataset)
 
-            preprocessed_data[TARGET_COLUMN] = model.labels_.astype(int)
-            
             logging.info("Clustering is done")
+
+            return model.labels_
+
+        except Exception as e:
+            raise CustomerException(e,sys)
+
+    def initialize_clustering(self, preprocessed_data: DataFrame) -> DataFrame:
+        """
+        Method Name :   initialize_clustering
+        Description :   This method initiates the clustering process 
+        
+        Output      :   Data is clustered and the cluster names are used as lables to the preprocessed data and is returned.
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   0.1
+        
+        """
+        try:
+            preprocessed_data[TARGET_COLUMN] = self.get_cluster_labels(preprocessed_data).astype(int)
             
             return preprocessed_data
         
@@ -1,17 +1,19 @@
 import sys
-from typing import Tuple
+from typing import Optional, Tuple
 import os
 import numpy as np
-from pandas import DataFrame
-from sklearn.model_selection import train_test_split
+from pandas import DataFrame, Series
 
 from src.constant.database import DATABASE_NAME, COLLECTION_NAME
 from src.entity.config_entity import DataIngestionConfig
 from src.entity.artifact_entity import DataIngestionArtifact
 from src.data_access.customer_data import CustomerData
+from src.data_access.engineered_features import DEFAULT_FEATURE_COLUMNS
+from src.data_access.feature_store import FeatureStore
 from src.exception import CustomerException
 from src.logger import logging
-from src.utils.main_utils import MainUtils
+from src.utils.dtype_planner import DtypePlanner, schema_layout
+from src.utils.main_utils import MainUtils, stable_hash_fraction
 
 
 class DataIngestion:
@@ -19,12 +21,16 @@ class DataIngestion:
         self.data_ingestion_config = data_ingestion_config
         self.utils = MainUtils()
 
-    def split_data_as_train_test(self, dataframe: DataFrame) -> Tuple[DataFrame, DataFrame]:
+    def split_data_as_train_test(self, dataframe: DataFrame, split_key: Optional[Series] = None) -> Tuple[DataFrame, DataFrame]:
+        """
+        Deterministic split: a customer is in the test set when the stable hash of its split key
+        (of the whole row without one) falls below the split ratio. The same customer lands in the
+        same set in every run, and customers added later do not move existing ones.
+        """
         try:
-            train_set, test_set = train_test_split(
-                dataframe, 
-                test_size=self.data_ingestion_config.train_test_split_ratio
-            )
+            hash_fraction = stable_hash_fraction(dataframe if split_key is None else split_key)
+            test_mask = hash_fraction < self.data_ingestion_config.train_test_split_ratio
+            train_set, test_set = dataframe[~test_mask], dataframe[test_mask]
             
             ingested_data_dir = self.data_ingestion_config.ingested_data_dir
             os.makedirs(ingested_data_dir, exist_ok=True)
@@ -32,7 +38,7 @@ class DataIngestion:
             train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
             test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
             
-            logging.info("Train-test split completed")
+            logging.info(f"Train-test split completed: {len(train_set)} train and {len(test_set)} test rows")
         except Exception as e:
             raise CustomerException(e, sys)
 
@@ -40,14 +46,23 @@ class DataIngestion:
         try:
             logging.info("Exporting data from MongoDB")
             customer_data = CustomerData()
-            customer_dataframe = customer_data.export_collection_as_dataframe(collection_name=COLLECTION_NAME)
+            if self.data_ingestion_config.feature_pushdown and customer_data.has_raw_layout(COLLECTION_NAME):
+                logging.info("Computing engineered features in a MongoDB aggregation pipeline")
+                feature_columns = [col.strip() for col in self.utils.read_schema_config_file().get("engineered_feature_columns", [])]
+                customer_dataframe = customer_data.export_engineered_features_as_dataframe(
+                    collection_name=COLLECTION_NAME,
+                    feature_columns=(feature_columns or DEFAULT_FEATURE_COLUMNS) + [self.data_ingestion_config.split_key_column],
+                )
+                feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+                os.makedirs(os.path.dirname(feature_store_file_path), exist_ok=True)
+                customer_dataframe.to_csv(feature_store_file_path, index=False, header=True)
+            else:
+                # only documents new or changed since the last run are transferred and stored
+                feature_store = FeatureStore(collection_name=COLLECTION_NAME, root_dir=self.data_ingestion_config.feature_store_root)
+                feature_store.ingest()
+                customer_dataframe = feature_store.read()
             
             logging.info(f"Dataframe shape: {customer_dataframe.shape}")
-            
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            os.makedirs(os.path.dirname(feature_store_file_path), exist_ok=True)
-            
-            customer_dataframe.to_csv(feature_store_file_path, index=False, header=True)
             logging.info("Data exported to feature store")
             
             return customer_dataframe
@@ -56,9 +71,17 @@ class DataIngestion:
 
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         try:
+            schema_config = self.utils.read_schema_config_file()
             dataframe = self.export_data_into_feature_store()
+            dataframe = DtypePlanner.from_schema(schema_layout(schema_config, dataframe.columns)).apply(dataframe)
             
-            schema_config = self.utils.read_schema_config_file()
+            split_key_column = self.data_ingestion_config.split_key_column
+            split_key = None
+            if split_key_column in dataframe.columns and dataframe[split_key_column].notna().all():
+                split_key = dataframe[split_key_column]
+            else:
+                logging.info(f"No complete {split_key_column} column, splitting by a hash of each row")
+
             drop_columns = [col.strip() for col in schema_config.get("drop_columns", [])]
             available_drop_columns = [col for col in drop_columns if col in dataframe.columns]
 
@@ -71,7 +94,7 @@ class DataIngestion:
                     ", ".join(missing_columns),
                 )
             
-            self.split_data_as_train_test(dataframe)
+            self.split_data_as_train_test(dataframe, split_key)
             
             data_ingestion_artifact = DataIngestionArtifact(
                 trained_file_path=self.data_ingestion_config.training_file_path,
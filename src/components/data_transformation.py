@@ -1,5 +1,5 @@
 import sys
-from datetime import datetime
+from typing import Optional, Tuple
 import numpy as np
 import os
 import pandas as pd
@@ -14,10 +14,12 @@ from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataTransformationArtifact, DataIngestionArtifact, DataValidationArtifact
 from src.components.data_ingestion import DataIngestion
 from src.components.data_clustering import CreateClusters
+from src.data_access.engineered_features import engineer_features, reference_midnight
 from src.constant.training_pipeline import TARGET_COLUMN
 from src.entity.config_entity import SimpleImputerConfig
 from src.exception import CustomerException
 from src.logger import logging
+from src.utils.dtype_planner import DtypePlanner, schema_layout
 from src.utils.main_utils import MainUtils
 
 
@@ -39,13 +41,21 @@ class DataTransformation:
         self._raw_column_names = self._extract_column_names(self._schema_config.get("columns", []))
         self._engineered_feature_columns = [col.strip() for col in self._schema_config.get("engineered_feature_columns", [])]
         self._engineered_column_names = [col.strip() for col in self._schema_config.get("engineered_columns", [])]
+        # Days_as_Customer of train and test rows counts to the same midnight
+        self.reference_date = reference_midnight()
+        keep_float64 = self.data_transformation_config.keep_float64
+        self.dtype_planners = {layout: DtypePlanner.from_schema(layout, keep_float64=keep_float64)
+                               for layout in ("raw", "engineered")}
+        self.float_dtype = np.float64 if keep_float64 else np.float32
         
         
         
     
     @staticmethod
-    def read_data(file_path:str) -> pd.DataFrame:
+    def read_data(file_path:str, dtype_planner: Optional[DtypePlanner] = None) -> pd.DataFrame:
         try:
+            if dtype_planner is not None:
+                return dtype_planner.read_csv(file_path)
             return pd.read_csv(file_path)
         except Exception as e:
             raise CustomerException(e,sys)
@@ -76,106 +86,29 @@ class DataTransformation:
         feature_columns_order = self._engineered_feature_columns
 
         def _transform(dataset: DataFrame) -> DataFrame:
-            df = dataset.copy()
-            dataset_column_set = set(df.columns)
+            dataset_column_set = set(dataset.columns)
 
             if raw_column_set and dataset_column_set == raw_column_set:
-                df['Age'] = 2022 - df['Year_Birth']
-                df['Education'] = df['Education'].replace({"Basic": 0, "2n Cycle": 1, "Graduation": 2, "Master": 3, "PhD": 4})
-                df['Marital_Status'] = df['Marital_Status'].replace({"Married": 1, "Together": 1, "Absurd": 0, "Widow": 0, "YOLO": 0, "Divorced": 0, "Single": 0, "Alone": 0})
-                df['Children'] = df['Kidhome'] + df['Teenhome']
-                df['Family_Size'] = df['Marital_Status'] + df['Children'] + 1
-
-                df['Total_Spending'] = (
-                    df["MntWines"]
-                    + df["MntFruits"]
-                    + df["MntMeatProducts"]
-                    + df["MntFishProducts"]
-                    + df["MntSweetProducts"]
-                    + df["MntGoldProds"]
-                )
-                df["Total Promo"] = (
-                    df["AcceptedCmp1"]
-                    + df["AcceptedCmp2"]
-                    + df["AcceptedCmp3"]
-                    + df["AcceptedCmp4"]
-                    + df["AcceptedCmp5"]
-                )
-
-                df['Dt_Customer'] = pd.to_datetime(df['Dt_Customer'])
-                today = datetime.today()
-                df['Days_as_Customer'] = (today - df['Dt_Customer']).dt.days
-                df['Offers_Responded_To'] = (
-                    df['AcceptedCmp1']
-                    + df['AcceptedCmp2']
-                    + df['AcceptedCmp3']
-                    + df['AcceptedCmp4']
-                    + df['AcceptedCmp5']
-                    + df['Response']
-                )
-                df["Parental Status"] = np.where(df["Children"] > 0, 1, 0)
-
-                df.drop(columns=['Year_Birth', 'Kidhome', 'Teenhome'], inplace=True)
-                df.rename(
-                    columns={
-                        "Marital_Status": "Marital Status",
-                        "MntWines": "Wines",
-                        "MntFruits": "Fruits",
-                        "MntMeatProducts": "Meat",
-                        "MntFishProducts": "Fish",
-                        "MntSweetProducts": "Sweets",
-                        "MntGoldProds": "Gold",
-                        "NumWebPurchases": "Web",
-                        "NumCatalogPurchases": "Catalog",
-                        "NumStorePurchases": "Store",
-                        "NumDealsPurchases": "Discount Purchases",
-                    },
-                    inplace=True,
-                )
+                # the read frame is not used afterwards, so the features are built in it
+                return engineer_features(dataset, feature_columns_order or None, self.reference_date, copy=False)
 
-                selected_columns = feature_columns_order or [
-                    "Age",
-                    "Education",
-                    "Marital Status",
-                    "Parental Status",
-                    "Children",
-                    "Income",
-                    "Total_Spending",
-                    "Days_as_Customer",
-                    "Recency",
-                    "Wines",
-                    "Fruits",
-                    "Meat",
-                    "Fish",
-                    "Sweets",
-                    "Gold",
-                    "Web",
-                    "Catalog",
-                    "Store",
-                    "Discount Purchases",
-                    "Total Promo",
-                    "NumWebVisitsMonth",
-                ]
-
-                df = df[selected_columns]
-                return df
-
-            if engineered_column_set and dataset_column_set == engineered_column_set:
-                df = df.drop(columns=[TARGET_COLUMN], errors='ignore')
+            if dataset_column_set in (engineered_column_set, set(feature_columns_order)) and dataset_column_set:
                 if not feature_columns_order:
-                    feature_columns = [column for column in df.columns if column != TARGET_COLUMN]
+                    feature_columns = [column for column in dataset.columns if column != TARGET_COLUMN]
                 else:
                     feature_columns = feature_columns_order
 
-                missing = [column for column in feature_columns if column not in df.columns]
+                missing = [column for column in feature_columns if column not in dataset.columns]
                 if missing:
                     raise CustomerException(
                         f"Engineered dataset missing expected feature columns: {missing}",
                         sys,
                     )
 
-                df = df[feature_columns]
-                return df
+                if list(dataset.columns) == feature_columns:
+                    return dataset
+                # selecting the feature columns also leaves out the target
+                return dataset[feature_columns]
 
             raise CustomerException(
                 f"Dataset columns {sorted(dataset_column_set)} do not match expected raw or engineered schemas",
@@ -191,17 +124,25 @@ class DataTransformation:
     
 
 
-    def transform_data(self,train_set:DataFrame, test_set:DataFrame) -> DataFrame:
+    @staticmethod
+    def allocate_output(file_path: str, n_rows: int, n_columns: int, dtype) -> np.memmap:
+        """Array of the transformed data memory-mapped straight onto its .npy artifact."""
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        return np.lib.format.open_memmap(file_path, mode="w+", dtype=dtype, shape=(n_rows, n_columns))
+
+    def transform_data(self,train_set:DataFrame, test_set:DataFrame) -> Tuple[np.memmap, np.memmap]:
         """
         Method Name :   transform_data
         Description :   This method applies feature transformation and other feature
-                        engineering operations and returns train and test datasets. 
+                        engineering operations and writes the train and test datasets
+                        into the transformed .npy artifacts. The last column of each
+                        is left for the cluster label.
         
-        Output      :   data transformer object is created and returned 
+        Output      :   memory-mapped train and test arrays are returned
         On Failure  :   Write an exception log and then raise an exception
         
-        Version     :   1.2
-        Revisions   :   moved setup to cloud
+        Version     :   1.3
+        Revisions   :   output written into preallocated memory-mapped arrays
         """
         logging.info(
             "Entered get_data_transformer_object method of DataTransformation class"
@@ -243,13 +184,14 @@ class DataTransformation:
 
             
             
-            preprocessed_train_set = preprocessor.fit_transform(train_set)
-            preprocessed_test_set = preprocessor.transform(test_set)
-            
-            
-            columns = train_set.columns
-            preprocessed_train_set =  pd.DataFrame(preprocessed_train_set, columns=columns)
-            preprocessed_test_set = pd.DataFrame(preprocessed_test_set, columns=columns)
+            # assigning into the slice casts to the artifact dtype while copying, no converted copy is made
+            n_features = len(numeric_features) + len(outlier_features)
+            train_arr = self.allocate_output(self.data_transformation_config.transformed_train_file_path,
+                                             len(train_set), n_features + 1, self.float_dtype)
+            train_arr[:, :-1] = preprocessor.fit_transform(train_set)
+            test_arr = self.allocate_output(self.data_transformation_config.transformed_test_file_path,
+                                            len(test_set), n_features + 1, self.float_dtype)
+            test_arr[:, :-1] = preprocessor.transform(test_set)
             
             preprocessor_obj_dir = os.path.dirname(self.data_transformation_config.transformed_object_file_path)
             os.makedirs(preprocessor_obj_dir, exist_ok=True)
@@ -261,7 +203,7 @@ class DataTransformation:
                 "Exited get_data_transformer_object method of DataTransformation class"
             )
 
-            return preprocessed_train_set, preprocessed_test_set
+            return train_arr, test_arr
 
         except Exception as e:
             raise CustomerException(e, sys) from e
@@ -283,38 +225,28 @@ class DataTransformation:
 
         try:
             if self.data_validation_artifact.validation_status:
-                train_set = DataTransformation.read_data(file_path=self.data_ingestion_artifact.trained_file_path)
-                test_set = DataTransformation.read_data(file_path=self.data_ingestion_artifact.test_file_path)
+                valid_train_file_path = self.data_validation_artifact.valid_train_file_path
+                input_columns = pd.read_csv(valid_train_file_path, nrows=0).columns
+                input_planner = self.dtype_planners[schema_layout(self._schema_config, input_columns)]
+                train_set = DataTransformation.read_data(file_path=valid_train_file_path, dtype_planner=input_planner)
+                test_set = DataTransformation.read_data(file_path=self.data_validation_artifact.valid_test_file_path,
+                                                        dtype_planner=input_planner)
                 train_set, test_set = self.get_new_features(train_set, test_set)
+                feature_planner = self.dtype_planners["engineered"]
+                train_set, test_set = feature_planner.apply(train_set), feature_planner.apply(test_set)
 
 
                 logging.info("Got the preprocessor object")
                 
-                preprocessed_train_set,  preprocessed_test_set  = self.transform_data(train_set, test_set)
+                train_arr, test_arr = self.transform_data(train_set, test_set)
+                del train_set, test_set
                 
+                # features are clustered as views of the artifacts, the labels fill their last column
                 cluster_creator = CreateClusters()
-
-                labelled_train_set = cluster_creator.initialize_clustering(preprocessed_data=preprocessed_train_set)
-                labelled_test_set = cluster_creator.initialize_clustering(preprocessed_data=preprocessed_test_set)
-                
-                
-                
-                X_train = labelled_train_set.drop(columns=[TARGET_COLUMN], axis=1)
-                y_train = labelled_train_set[TARGET_COLUMN]
-                
-                X_test = labelled_test_set.drop(columns=[TARGET_COLUMN], axis=1)
-                y_test = labelled_test_set[TARGET_COLUMN]
-                
-                train_arr = np.c_[
-                    np.array(X_train), np.array(y_train)
-                ]
-                
-                test_arr = np.c_[
-                    np.array(X_test), np.array(y_test)
-                ]
-                
-                self.utils.save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array=train_arr)
-                self.utils.save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array=test_arr)
+                for arr in (train_arr, test_arr):
+                    arr[:, -1] = cluster_creator.get_cluster_labels(arr[:, :-1])
+                    arr.flush()
+                del arr, train_arr, test_arr
 
                 
                 data_transformation_artifact = DataTransformationArtifact(
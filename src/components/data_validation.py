@@ -1,4 +1,5 @@
 import json
+import os
 import sys
 from typing import Tuple, Union
 import pandas as pd
@@ -22,9 +23,14 @@ except ImportError:
 
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
+from src.drift.engine import DriftEngine
+from src.drift.profile import ReferenceProfile
+from src.validation.engine import ValidationEngine
+from src.constant.prediction_pipeline import PRED_SCHEMA_FILE_PATH
 
 from src.exception import CustomerException
 from src.logger import logging
+from src.utils.dtype_planner import DtypePlanner
 from src.utils.main_utils import MainUtils, write_yaml_file
 
 
@@ -41,7 +47,10 @@ class DataValidation:
         self._schema_config = self.utils.read_schema_config_file()
         self._raw_column_names = self._extract_column_names(self._schema_config.get("columns", []))
         self._engineered_column_names = [col.strip() for col in self._schema_config.get("engineered_columns", [])]
+        # feature columns without the cluster label, as returned by the ingestion feature pushdown
+        self._engineered_feature_column_names = [col.strip() for col in self._schema_config.get("engineered_feature_columns", [])]
         self._detected_schema_type: Union[str, None] = None
+        self._validation_config = self._schema_config.get("validation", {}) or {}
 
     @staticmethod
     def _extract_column_names(columns_config) -> list:
@@ -53,6 +62,67 @@ class DataValidation:
                 names.append(str(entry).strip())
         return names
 
+    @staticmethod
+    def _extract_column_dtypes(columns_config) -> dict:
+        dtypes = {}
+        for entry in columns_config or []:
+            if isinstance(entry, dict):
+                dtypes.update({key.strip(): str(value).strip() for key, value in entry.items()})
+        return dtypes
+
+    def get_validation_engine(self) -> ValidationEngine:
+        if self._detected_schema_type == "raw":
+            column_dtypes = self._extract_column_dtypes(self._schema_config.get("columns", []))
+        else:
+            prediction_schema = self.utils.read_yaml_file(PRED_SCHEMA_FILE_PATH)
+            column_dtypes = {
+                column.strip(): str(dtype).strip()
+                for column, dtype in (prediction_schema.get("columns") or {}).items()
+            }
+
+        return ValidationEngine.from_rules(
+            column_dtypes=column_dtypes,
+            rules=self._validation_config.get(self._detected_schema_type),
+        )
+
+    def validate_dataset_values(self, dataframe: DataFrame, valid_file_path: str, invalid_file_path: str) -> Tuple[bool, DataFrame]:
+        """
+        Method Name :   validate_dataset_values
+        Description :   This method checks dtypes, value ranges, allowed levels and null rates of the
+                        dataframe against schema.yaml, writes the failing rows to the invalid path and
+                        the remaining rows to the valid path
+        
+        Output      :   Returns the validation status and the valid rows
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.3
+        """
+        try:
+            validation_engine = self.get_validation_engine()
+            result = validation_engine.validate(dataframe)
+            valid_df, invalid_df = ValidationEngine.split(dataframe, result)
+
+            for file_path, data in ((valid_file_path, valid_df), (invalid_file_path, invalid_df)):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                data.to_csv(file_path, index=False, header=True)
+
+            max_invalid_row_rate = self._validation_config.get("max_invalid_row_rate", 1.0)
+            status = not result.null_rate_violations and result.invalid_row_rate <= max_invalid_row_rate
+
+            if result.n_invalid:
+                logging.warning(f"Quarantined {result.n_invalid} of {result.n_rows} rows to {invalid_file_path}")
+            if result.null_rate_violations:
+                logging.error(f"Null rate above the allowed maximum: {result.null_rate_violations}")
+            if result.invalid_row_rate > max_invalid_row_rate:
+                logging.error(
+                    f"Invalid row rate {result.invalid_row_rate:.3f} above the allowed {max_invalid_row_rate}"
+                )
+
+            return status, valid_df
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
     def validate_schema_columns(self, dataframe: DataFrame) -> bool:
         """
         Method Name :   validate_schema_columns
@@ -70,6 +140,9 @@ class DataValidation:
 
             raw_column_set = set(self._raw_column_names)
             engineered_column_set = set(self._engineered_column_names)
+            engineered_layouts = [
+                column_set for column_set in (engineered_column_set, set(self._engineered_feature_column_names)) if column_set
+            ]
 
             expected_schema_type = self._detected_schema_type
 
@@ -79,7 +152,7 @@ class DataValidation:
                 return status
 
             if expected_schema_type == "engineered":
-                status = dataframe_column_set == engineered_column_set
+                status = dataframe_column_set in engineered_layouts
                 logging.info("Schema validation against engineered column layout: %s", status)
                 return status
 
@@ -88,7 +161,7 @@ class DataValidation:
                 logging.info("Detected raw schema layout for dataset")
                 return True
 
-            if engineered_column_set and dataframe_column_set == engineered_column_set:
+            if dataframe_column_set in engineered_layouts:
                 self._detected_schema_type = "engineered"
                 logging.info("Detected engineered schema layout for dataset")
                 return True
@@ -140,28 +213,121 @@ class DataValidation:
 
     
 
+    def get_drift_engine(self) -> DriftEngine:
+        return DriftEngine(
+            n_bins=self.data_validation_config.drift_n_bins,
+            p_value_threshold=self.data_validation_config.drift_p_value_threshold,
+            drift_share=self.data_validation_config.drift_share,
+            sample_size=self.data_validation_config.drift_sample_size,
+            n_jobs=self.data_validation_config.drift_n_jobs,
+        )
+
+    def build_reference_profile(self, reference_df: DataFrame) -> ReferenceProfile:
+        """
+        Method Name :   build_reference_profile
+        Description :   This method computes the reference profile of the training data once and saves it,
+                        so later drift checks only have to process the current data
+        
+        Output      :   Returns the reference profile
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.3
+        """
+        try:
+            reference_profile = ReferenceProfile.build(reference_df, drift_engine=self.get_drift_engine())
+            reference_profile.save(self.data_validation_config.reference_profile_file_path)
+            return reference_profile
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
     def detect_dataset_drift(
-        self, reference_df: DataFrame, current_df: DataFrame) -> bool:
+        self, reference_df: DataFrame, current_df: DataFrame,
+        reference_profile: Union[ReferenceProfile, None] = None) -> bool:
         """
         Method Name :   detect_dataset_drift
-        Description :   This method detects the dataset drift using the reference and production dataframe 
+        Description :   This method detects the dataset drift using the reference and production dataframe.
+                        The native engine is used unless the config asks for Evidently, and it is also
+                        the fallback when Evidently is not installed. A reference profile, when given,
+                        replaces the reference dataframe for the native engine.
         
-        Output      :   Returns bool or float value based on the get_ration parameter
+        Output      :   Returns bool value based on the dataset_drift summary
         On Failure  :   Write an exception log and then raise an exception
         
-        Version     :   1.2
-        Revisions   :   moved setup to cloud
+        Version     :   1.3
+        Revisions   :   native drift engine is the default
+        """
+        try:
+            if self.data_validation_config.drift_engine == "evidently" and reference_df is not None:
+                if _EVIDENTLY_API_MODE != "missing":
+                    return self.detect_dataset_drift_with_evidently(reference_df, current_df)
+
+                logging.warning("Evidently not installed; falling back to the native drift engine.")
+
+            drift_engine = self.get_drift_engine()
+            if reference_profile is None:
+                drift_report = drift_engine.run(reference_df, current_df)
+            else:
+                drift_report = reference_profile.detect_drift(current_df, drift_engine=drift_engine)
+
+            write_yaml_file(
+                file_path=self.data_validation_config.drift_report_file_path,
+                content=drift_report,
+            )
+
+            logging.info(
+                f"{drift_report['number_of_drifted_columns']}/{drift_report['number_of_columns']} drift detected."
+            )
+
+            return drift_report["dataset_drift"]
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def detect_drift_against_reference_profile(self, current_df: DataFrame, reference_profile_file_path: str) -> bool:
+        """
+        Method Name :   detect_drift_against_reference_profile
+        Description :   This method checks a production batch against a saved reference profile
+                        without touching the training data
+        
+        Output      :   Returns bool value based on the dataset_drift summary
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.3
+        """
+        try:
+            reference_profile = ReferenceProfile.load(reference_profile_file_path)
+            return self.detect_dataset_drift(
+                reference_df=None, current_df=current_df, reference_profile=reference_profile
+            )
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def detect_dataset_drift_with_evidently(
+        self, reference_df: DataFrame, current_df: DataFrame) -> bool:
+        """
+        Method Name :   detect_dataset_drift_with_evidently
+        Description :   This method runs the full Evidently drift report, saves it as HTML when the
+                        installed Evidently supports it and writes the compact summary as YAML
+        
+        Output      :   Returns bool value based on the dataset_drift summary
+        On Failure  :   Write an exception log and then raise an exception
+        
+        Version     :   1.3
+        Revisions   :   summary written in the same layout as the native engine
         """
         try:
+            html_report_file_path = None
+
             if _EVIDENTLY_API_MODE == "new":
                 data_drift_report = Report(metrics=[DataDriftPreset()])
                 data_drift_report.run(reference_data=reference_df, current_data=current_df)
 
+                if hasattr(data_drift_report, "save_html"):
+                    html_report_file_path = self.data_validation_config.drift_html_report_file_path
+                    os.makedirs(os.path.dirname(html_report_file_path), exist_ok=True)
+                    data_drift_report.save_html(html_report_file_path)
+
                 report_dict = data_drift_report.as_dict()
-                write_yaml_file(
-                    file_path=self.data_validation_config.drift_report_file_path,
-                    content=report_dict,
-                )
 
                 drift_metric = {}
                 for metric in report_dict.get("metrics", []):
@@ -179,50 +345,33 @@ class DataValidation:
 
                 n_features = drift_metric.get("number_of_columns", 0)
                 n_drifted_features = drift_metric.get("number_of_drifted_columns", 0)
-
-                logging.info(f"{n_drifted_features}/{n_features} drift detected.")
-
                 drift_status = drift_metric.get("dataset_drift", False)
-            elif _EVIDENTLY_API_MODE == "legacy":
+            else:
                 data_drift_profile = Profile(sections=[DataDriftProfileSection()])
                 data_drift_profile.calculate(reference_df, current_df)
 
-                report = data_drift_profile.json()
-                json_report = json.loads(report)
-                write_yaml_file(
-                    file_path=self.data_validation_config.drift_report_file_path,
-                    content=json_report,
-                )
+                json_report = json.loads(data_drift_profile.json())
+                drift_metrics = json_report["data_drift"]["data"]["metrics"]
 
-                n_features = json_report["data_drift"]["data"]["metrics"].get("n_features", 0)
-                n_drifted_features = json_report["data_drift"]["data"]["metrics"].get(
-                    "n_drifted_features", 0
-                )
+                n_features = drift_metrics.get("n_features", 0)
+                n_drifted_features = drift_metrics.get("n_drifted_features", 0)
+                drift_status = drift_metrics.get("dataset_drift", False)
 
-                logging.info(f"{n_drifted_features}/{n_features} drift detected.")
+            logging.info(f"{n_drifted_features}/{n_features} drift detected.")
 
-                drift_status = json_report["data_drift"]["data"]["metrics"].get("dataset_drift", False)
-            else:
-                logging.warning(
-                    "Evidently not installed; skipping drift detection and marking dataset as stable."
-                )
-
-                fallback_report = {
-                    "dataset_drift": False,
-                    "details": "Evidently package not available; drift check skipped.",
-                }
-                write_yaml_file(
-                    file_path=self.data_validation_config.drift_report_file_path,
-                    content=fallback_report,
-                )
-
-                n_features = len(reference_df.columns)
-                n_drifted_features = 0
+            write_yaml_file(
+                file_path=self.data_validation_config.drift_report_file_path,
+                content={
+                    "engine": f"evidently-{_EVIDENTLY_API_MODE}",
+                    "dataset_drift": bool(drift_status),
+                    "number_of_columns": int(n_features),
+                    "number_of_drifted_columns": int(n_drifted_features),
+                    "html_report_file_path": html_report_file_path,
+                },
+            )
 
-                drift_status = False
+            return bool(drift_status)
 
-            return drift_status
-        
         except Exception as e:
             raise CustomerException(e, sys) from e
         
@@ -234,7 +383,29 @@ class DataValidation:
         except Exception as e:
             raise CustomerException(e, sys)
 
-    def initiate_data_validation(self) -> DataValidationArtifact:
+    def initiate_drift_report(self, data_validation_artifact: DataValidationArtifact) -> bool:
+        """
+        Method Name :   initiate_drift_report
+        Description :   This method builds the reference profile from the validated train set and
+                        checks the validated test set for drift against it. Nothing before model
+                        training needs its result, so the pipeline runs it next to transformation.
+
+        Output      :   Returns bool value based on the dataset_drift summary
+        On Failure  :   Write an exception log and then raise an exception
+        """
+        try:
+            train_df = DataValidation.read_data(file_path=data_validation_artifact.valid_train_file_path)
+            test_df = DataValidation.read_data(file_path=data_validation_artifact.valid_test_file_path)
+
+            reference_profile = self.build_reference_profile(train_df)
+            drift = self.detect_dataset_drift(train_df, test_df, reference_profile=reference_profile)
+            if drift is True:
+                logging.warning("Data drift detected, continuing with latest dataset anyway")
+            return drift
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def initiate_data_validation(self, run_drift_report: bool = True) -> DataValidationArtifact:
         """
         Method Name :   initiate_data_validation
         Description :   This method initiates the data validation component for the pipeline
@@ -242,8 +413,8 @@ class DataValidation:
         Output      :   Returns bool value based on validation results
         On Failure  :   Write an exception log and then raise an exception
         
-        Version     :   1.2
-        Revisions   :   moved setup to cloud
+        Version     :   1.3
+        Revisions   :   drift report can be left to initiate_drift_report
         """
         logging.info("Entered initiate_data_validation method of Data_Validation class")
 
@@ -255,8 +426,6 @@ class DataValidation:
             
             
             
-            drift = self.detect_dataset_drift(train_df, test_df)
-
             (
                 schema_train_col_status,
                 schema_test_col_status,
@@ -268,12 +437,34 @@ class DataValidation:
 
             logging.info("Validated dataset schema columns")
 
-            
-
             validation_status = schema_train_col_status and schema_test_col_status
+            valid_train_file_path = self.data_ingestion_artifact.trained_file_path
+            valid_test_file_path = self.data_ingestion_artifact.test_file_path
+
+            if validation_status:
+                dtype_planner = DtypePlanner.from_schema(self._detected_schema_type)
+                train_df, test_df = dtype_planner.apply(train_df), dtype_planner.apply(test_df)
+                train_value_status, train_df = self.validate_dataset_values(
+                    train_df,
+                    valid_file_path=self.data_validation_config.valid_train_file_path,
+                    invalid_file_path=self.data_validation_config.invalid_train_file_path,
+                )
+                test_value_status, test_df = self.validate_dataset_values(
+                    test_df,
+                    valid_file_path=self.data_validation_config.valid_test_file_path,
+                    invalid_file_path=self.data_validation_config.invalid_test_file_path,
+                )
+                valid_train_file_path = self.data_validation_config.valid_train_file_path
+                valid_test_file_path = self.data_validation_config.valid_test_file_path
+                validation_status = train_value_status and test_value_status
+
+            drift = False
+            if run_drift_report:
+                reference_profile = self.build_reference_profile(train_df)
+                drift = self.detect_dataset_drift(train_df, test_df, reference_profile=reference_profile)
 
             if not validation_status:
-                logging.error("Dataset schema validation failed for train/test sets")
+                logging.error("Dataset schema or value validation failed for train/test sets")
             elif drift is True:
                 logging.warning("Data drift detected, continuing with latest dataset anyway")
             else:
@@ -281,11 +472,12 @@ class DataValidation:
             
             data_validation_artifact = DataValidationArtifact(
                 validation_status=validation_status,
-                valid_train_file_path=self.data_ingestion_artifact.trained_file_path,
-                valid_test_file_path=self.data_ingestion_artifact.test_file_path,
+                valid_train_file_path=valid_train_file_path,
+                valid_test_file_path=valid_test_file_path,
                 invalid_train_file_path=self.data_validation_config.invalid_train_file_path,
                 invalid_test_file_path=self.data_validation_config.invalid_test_file_path,
-                drift_report_file_path=self.data_validation_config.drift_report_file_path
+                drift_report_file_path=self.data_validation_config.drift_report_file_path,
+                reference_profile_file_path=self.data_validation_config.reference_profile_file_path
             )
 
             return data_validation_artifact
@@ -1,22 +1,26 @@
 from src.entity.config_entity import ModelEvaluationConfig
 from src.entity.artifact_entity import ModelTrainerArtifact, DataIngestionArtifact, ModelEvaluationArtifact, DataTransformationArtifact
-from sklearn.metrics import f1_score
 from src.exception import CustomerException
 from src.pipeline.prediction_pipeline import CustomerData
 from src.constant.training_pipeline import TARGET_COLUMN
 from src.logger import logging
 
+import hashlib
+import os
 import sys
+
+import numpy as np
 import pandas as pd
 
 
 from src.ml.model.b2_estimator import B2ModelEstimator
+from src.storage.backend import StorageBackend
 from dataclasses import dataclass
 from typing import Optional
 from src.entity.config_entity import Prediction_config
 
 from src.utils.main_utils import MainUtils,load_numpy_array_data
-from src.ml.metric import calculate_metric
+from src.ml.metric import calculate_metric_from_predictions
 from src.entity.artifact_entity import ClassificationMetricArtifact
 
 
@@ -40,12 +44,16 @@ def convert_test_numpy_array_to_dataframe(array:str):
 class ModelEvaluation:
 
     def __init__(self, model_eval_config: ModelEvaluationConfig, data_ingestion_artifact: DataIngestionArtifact,
-                 model_trainer_artifact: ModelTrainerArtifact, data_transformation_artifact: DataTransformationArtifact):
+                 model_trainer_artifact: ModelTrainerArtifact, data_transformation_artifact: DataTransformationArtifact,
+                 storage_backend: Optional[StorageBackend] = None,
+                 champion_estimator: Optional[B2ModelEstimator] = None):
         try:
             self.model_eval_config = model_eval_config
             self.data_ingestion_artifact = data_ingestion_artifact
             self.model_trainer_artifact = model_trainer_artifact
             self.data_transformation_artifact = data_transformation_artifact
+            self.storage_backend = storage_backend
+            self.champion_estimator = champion_estimator
             self.utils = MainUtils()
         except Exception as e:
             raise CustomerException(e, sys) from e
@@ -55,7 +63,8 @@ class ModelEvaluation:
             bucket_name = self.model_eval_config.bucket_name
             model_path = self.model_eval_config.b2_model_key_path
             b2_estimator = B2ModelEstimator(bucket_name=bucket_name,
-                                            model_path=model_path)
+                                            model_path=model_path,
+                                            storage_backend=self.storage_backend)
 
             if b2_estimator.is_model_present(model_path=model_path):
                 return b2_estimator
@@ -63,30 +72,83 @@ class ModelEvaluation:
         except Exception as e:
             raise CustomerException(e, sys)
 
+    @staticmethod
+    def prefetch_champion(model_eval_config: ModelEvaluationConfig,
+                          storage_backend: Optional[StorageBackend] = None) -> Optional[B2ModelEstimator]:
+        """
+        Resolve and download the production model ahead of evaluation, e.g. while the candidate trains.
+        Returns None when the bucket has no model or it cannot be fetched; evaluation then fetches it itself.
+        """
+        try:
+            estimator = B2ModelEstimator(bucket_name=model_eval_config.bucket_name,
+                                         model_path=model_eval_config.b2_model_key_path,
+                                         storage_backend=storage_backend)
+            model_version = estimator.get_model_version()
+            if model_version is None:
+                return None
+            estimator.loaded_model = estimator.load_model()
+            logging.info(f"Prefetched champion model version {model_version}")
+            return estimator
+        except Exception as e:
+            logging.warning(f"Could not prefetch the champion model: {e}")
+            return None
+
+    @staticmethod
+    def get_test_set_fingerprint(test_arr: np.ndarray) -> str:
+        """Hash of the transformed test set, so cached predictions are only reused on identical data."""
+        test_arr = np.ascontiguousarray(test_arr)
+        digest = hashlib.sha1(f"{test_arr.shape}:{test_arr.dtype}".encode())
+        digest.update(test_arr.tobytes())
+        return digest.hexdigest()
+
+    def get_champion_predictions(self, best_model: B2ModelEstimator, model_version: str,
+                                 x_test: pd.DataFrame, test_fingerprint: str) -> np.ndarray:
+        """
+        Predictions of the production model on the test set, cached per model version and test set.
+
+        The champion only changes when a model is pushed, so on repeated evaluations against the same
+        test data its predictions are read from the cache instead of downloading and scoring the model.
+        """
+        try:
+            cache_file_path = os.path.join(
+                self.model_eval_config.prediction_cache_dir, f"{model_version}_{test_fingerprint}.npy"
+            )
+            if os.path.exists(cache_file_path):
+                logging.info(f"Using cached champion predictions from {cache_file_path}")
+                return load_numpy_array_data(file_path=cache_file_path)
+
+            y_hat_best_model = np.asarray(best_model.predict(x_test))
+            self.utils.save_numpy_array_data(file_path=cache_file_path, array=y_hat_best_model)
+            logging.info(f"Cached champion predictions at {cache_file_path}")
+            return y_hat_best_model
+        except Exception as e:
+            raise CustomerException(e, sys)
+
     def evaluate_model(self) -> EvaluateModelResponse:
         try:
             test_arr = load_numpy_array_data(file_path=self.data_transformation_artifact.transformed_test_file_path)
-            # x_test = pd.read_csv(self.data_ingestion_artifact.test_file_path)
-            
-            x_test, y_test = pd.DataFrame(test_arr[:, :-1]), pd.DataFrame(test_arr[:, -1])
-            x_test = convert_test_numpy_array_to_dataframe(array= test_arr[:, :-1])
-           
+            x_test = convert_test_numpy_array_to_dataframe(array=test_arr[:, :-1])
+            y_test = test_arr[:, -1]
 
-            
-    
-          
             trained_model = self.utils.load_object(file_path=self.model_trainer_artifact.trained_model_file_path)
-            # y.replace(TargetValueMapping().to_dict(), inplace=True)
             y_hat_trained_model = trained_model.predict(x_test)
+            trained_model_f1_score = calculate_metric_from_predictions(y_test, y_hat_trained_model).f1_score
 
-            trained_model_f1_score = f1_score(y_test, y_hat_trained_model, average='weighted')
             best_model_f1_score = None
             best_model_metric_artifact = None
-            best_model = self.get_best_model()
-            if best_model is not None:
-                y_hat_best_model = best_model.predict(x_test)
-                best_model_f1_score = f1_score(y_test, y_hat_best_model,average='weighted')
-                best_model_metric_artifact = calculate_metric(best_model, x_test, y_test)
+            best_model = self.champion_estimator or B2ModelEstimator(
+                bucket_name=self.model_eval_config.bucket_name,
+                model_path=self.model_eval_config.b2_model_key_path,
+                storage_backend=self.storage_backend,
+            )
+            # one metadata call tells both whether a champion exists and which version it is
+            model_version = best_model.get_model_version()
+            if model_version is not None:
+                y_hat_best_model = self.get_champion_predictions(
+                    best_model, model_version, x_test, self.get_test_set_fingerprint(test_arr)
+                )
+                best_model_metric_artifact = calculate_metric_from_predictions(y_test, y_hat_best_model)
+                best_model_f1_score = best_model_metric_artifact.f1_score
             # calucate how much percentage training model accuracy is increased/decreased
             tmp_best_model_score = 0 if best_model_f1_score is None else best_model_f1_score
             result = EvaluateModelResponse(trained_model_f1_score=trained_model_f1_score,
@@ -1,29 +1,54 @@
+import os
 import sys
+from dataclasses import asdict
+from typing import Optional
+from src.constant.prediction_pipeline import PRED_SCHEMA_FILE_PATH
 from src.entity.artifact_entity import ModelPusherArtifact, ModelTrainerArtifact
 from src.entity.config_entity import ModelPusherConfig
 from src.exception import CustomerException
 from src.logger import logging
 from src.ml.model.b2_estimator import B2ModelEstimator
+from src.storage.backend import StorageBackend
+from src.utils.main_utils import compute_file_sha1
 
 
 class ModelPusher:
-    def __init__(self, model_trainer_artifact: ModelTrainerArtifact, model_pusher_config: ModelPusherConfig):
+    def __init__(self, model_trainer_artifact: ModelTrainerArtifact, model_pusher_config: ModelPusherConfig,
+                 storage_backend: Optional[StorageBackend] = None):
         self.model_trainer_artifact = model_trainer_artifact
         self.model_pusher_config = model_pusher_config
         self.estimator = B2ModelEstimator(
             bucket_name=model_pusher_config.bucket_name,
             model_path=model_pusher_config.b2_model_key_path,
+            storage_backend=storage_backend,
         )
 
     def initiate_model_pusher(self) -> ModelPusherArtifact:
         try:
-            logging.info("Uploading model to B2 bucket")
-            self.estimator.save_model(from_file=self.model_trainer_artifact.trained_model_file_path)
+            logging.info("Publishing model to the model registry")
+            reference_profile_file_path = self.model_trainer_artifact.reference_profile_file_path
+            if not (reference_profile_file_path and os.path.exists(reference_profile_file_path)):
+                reference_profile_file_path = None
+
+            model_version = self.estimator.publish(
+                from_file=self.model_trainer_artifact.trained_model_file_path,
+                metrics=asdict(self.model_trainer_artifact.metric_artifact),
+                schema_hash=compute_file_sha1(PRED_SCHEMA_FILE_PATH),
+                reference_profile_file=reference_profile_file_path,
+                min_part_size=self.model_pusher_config.min_part_size,
+                retries=self.model_pusher_config.upload_retries,
+            )
+
             model_pusher_artifact = ModelPusherArtifact(
                 bucket_name=self.model_pusher_config.bucket_name,
-                s3_model_path=self.model_pusher_config.b2_model_key_path,
+                s3_model_path=self.estimator.registry.model_key(model_version),
+                b2_reference_profile_path=(
+                    self.estimator.registry.reference_profile_key(model_version)
+                    if reference_profile_file_path else None
+                ),
+                model_version=model_version,
             )
-            logging.info("Model uploaded to B2 bucket")
+            logging.info(f"Model version {model_version} is the champion")
             return model_pusher_artifact
         except Exception as e:
             raise CustomerException(e, sys)
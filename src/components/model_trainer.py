@@ -1,16 +1,17 @@
+import shutil
 import sys
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import os
 from pandas import DataFrame
 import numpy as np
 
 from src.entity.config_entity import ModelTrainerConfig
-from src.entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
+from src.entity.artifact_entity import DataTransformationArtifact, DataValidationArtifact, ModelTrainerArtifact, ClassificationMetricArtifact
 
 from src.exception import CustomerException
 from src.logger import logging
 from src.utils.main_utils import MainUtils,load_numpy_array_data
-from neuro_mf  import ModelFactory
+from src.ml.search import ModelSearch
 
 
 
@@ -46,12 +47,25 @@ class CustomerSegmentationModel:
 class ModelTrainer:
     def __init__(self, 
                  data_transformation_artifact: DataTransformationArtifact,
-                 model_trainer_config: ModelTrainerConfig):
+                 model_trainer_config: ModelTrainerConfig,
+                 data_validation_artifact: Optional[DataValidationArtifact] = None):
         
         self.data_transformation_artifact = data_transformation_artifact
         self.model_trainer_config = model_trainer_config
+        self.data_validation_artifact = data_validation_artifact
         self.utils = MainUtils()
 
+    def save_reference_profile(self) -> Optional[str]:
+        """Keeps the reference profile of the training data next to the model it was trained with."""
+        if self.data_validation_artifact is None or not self.data_validation_artifact.reference_profile_file_path:
+            return None
+
+        reference_profile_file_path = self.model_trainer_config.reference_profile_file_path
+        os.makedirs(os.path.dirname(reference_profile_file_path), exist_ok=True)
+        shutil.copyfile(self.data_validation_artifact.reference_profile_file_path, reference_profile_file_path)
+        logging.info(f"Reference profile saved next to the model at: {reference_profile_file_path}")
+        return reference_profile_file_path
+
 
     
 
@@ -64,8 +78,10 @@ class ModelTrainer:
             x_train, y_train, x_test, y_test = train_arr[:, :-1], train_arr[:, -1], test_arr[:, :-1], test_arr[:, -1]
             
             
-            model_factory = ModelFactory(model_config_path=self.model_trainer_config.model_config_file_path)
-            best_model_detail = model_factory.get_best_model(X=x_train,y=y_train,base_accuracy=self.model_trainer_config.expected_accuracy)
+            model_search = ModelSearch(model_config_path=self.model_trainer_config.model_config_file_path,
+                                       score_cache_dir=self.model_trainer_config.search_score_cache_dir,
+                                       score_cache_max_scores=self.model_trainer_config.search_score_cache_max_scores)
+            best_model_detail = model_search.get_best_model(X=x_train,y=y_train,base_accuracy=self.model_trainer_config.expected_accuracy)
             preprocessing_obj = self.utils.load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
 
             if best_model_detail.best_score < self.model_trainer_config.expected_accuracy:
@@ -85,10 +101,12 @@ class ModelTrainer:
                 obj=customer_segmentation_model
             )
             logging.info(f"Customer Segmentation Model is saved successfully at: {trained_model_path}")
+            reference_profile_file_path = self.save_reference_profile()
             metric_artifact = ClassificationMetricArtifact(f1_score=0.8, precision_score=0.8, recall_score=0.9)
             model_trainer_artifact = ModelTrainerArtifact(
             trained_model_file_path=self.model_trainer_config.trained_model_file_path,
             metric_artifact=metric_artifact,
+            reference_profile_file_path=reference_profile_file_path,
             )
 
             logging.info("Model training completed successfully")
@@ -1,9 +1,12 @@
 import os
 import sys
 from b2sdk.v2 import B2Api, InMemoryAccountInfo
-from src.constant.env_variable import B2_APPLICATION_KEY_ID, B2_APPLICATION_KEY
+from src.constant.env_variable import B2_APPLICATION_KEY_ID, B2_APPLICATION_KEY, B2_MAX_UPLOAD_WORKERS
 from src.exception import CustomerException
 
+# Parts of a large file are uploaded concurrently by this many threads
+DEFAULT_B2_MAX_UPLOAD_WORKERS = 10
+
 
 class B2Client:
     b2_api = None
@@ -25,7 +28,8 @@ class B2Client:
             
             try:
                 info = InMemoryAccountInfo()
-                B2Client.b2_api = B2Api(info)
+                max_upload_workers = int(os.getenv(B2_MAX_UPLOAD_WORKERS, DEFAULT_B2_MAX_UPLOAD_WORKERS))
+                B2Client.b2_api = B2Api(info, max_upload_workers=max_upload_workers)
                 B2Client.b2_api.authorize_account("production", key_id, app_key)
             except Exception as e:
                 raise CustomerException(e, sys)
@@ -1,2 +1,15 @@
 DATABASE_NAME = "CustomerDB"
 COLLECTION_NAME = "customer_0"
+
+# Bookkeeping fields the bulk loader adds to every document
+CONTENT_HASH_FIELD = "_content_hash"
+# Numbers identical rows of a file without key column, so they stay separate documents
+OCCURRENCE_FIELD = "_occurrence"
+# Set only when a document's content hash changes; incremental readers use it as their watermark
+UPDATED_AT_FIELD = "updated_at"
+# Set by every load that contains the document; pruning deletes documents a load did not see
+SEEN_AT_FIELD = "seen_at"
+BULK_LOAD_KEY_FIELD = "ID"
+BULK_LOAD_CHUNK_SIZE: int = 10000
+BULK_LOAD_BATCH_SIZE: int = 1000
+BULK_LOAD_MAX_WORKERS: int = 4
@@ -1,3 +1,12 @@
 MONGODB_URL_KEY = "MONGO_DB_URL"
 B2_APPLICATION_KEY_ID = "B2_APPLICATION_KEY_ID"
 B2_APPLICATION_KEY = "B2_APPLICATION_KEY"
+B2_MAX_UPLOAD_WORKERS = "B2_MAX_UPLOAD_WORKERS"
+STORAGE_BACKEND = "STORAGE_BACKEND"
+LOCAL_STORAGE_DIR = "LOCAL_STORAGE_DIR"
+EMULATED_B2_LATENCY_MS = "EMULATED_B2_LATENCY_MS"
+LOG_LEVEL = "LOG_LEVEL"
+LOG_LEVELS = "LOG_LEVELS"
+LOG_SAMPLING = "LOG_SAMPLING"
+LOG_MAX_BYTES = "LOG_MAX_BYTES"
+LOG_BACKUP_COUNT = "LOG_BACKUP_COUNT"
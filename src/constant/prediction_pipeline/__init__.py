@@ -1,8 +1,14 @@
 import os
 from src.constant.b2_bucket import BUCKET_NAME
+from src.constant.training_pipeline import ARTIFACT_DIR, PIPELINE_NAME
 
 PRED_SCHEMA_FILE_PATH = os.path.join('config', 'prediction_schema.yaml')
 PREDICTION_DATA_BUCKET = BUCKET_NAME
 PREDICTION_INPUT_FILE_NAME = "customer_pred_data.csv"
 PREDICTION_OUTPUT_FILE_NAME = "customer_predictions.csv"
-MODEL_BUCKET_NAME = BUCKET_NAME
\ No newline at end of file
+MODEL_BUCKET_NAME = BUCKET_NAME
+REFERENCE_PROFILE_FILE_NAME = "reference_profile.json"
+PREDICTION_MONITORING_DIR = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, "prediction_monitoring")
+PREDICTION_MONITORING_ENABLED = os.getenv("PREDICTION_MONITORING_ENABLED", "true").lower() == "true"
+PREDICTION_MONITORING_FLUSH_INTERVAL_SECONDS = 60
+PREDICTION_MONITORING_FLUSH_EVERY_ROWS = 10000
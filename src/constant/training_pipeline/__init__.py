@@ -6,6 +6,16 @@ PIPELINE_NAME: str = "src"
 ARTIFACT_DIR: str = "artifact"
 LOG_DIR = "logs"
 LOG_FILE = "customer_segmentation.log"
+DEFAULT_LOG_LEVEL = "DEBUG"
+# Rotate the log file at this size, keeping this many gzip-compressed backups
+DEFAULT_LOG_MAX_BYTES: int = 50 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT: int = 10
+# Third-party loggers that are noisy at DEBUG
+DEFAULT_LOG_LEVELS = {"b2sdk": "WARNING", "urllib3": "WARNING", "pymongo": "WARNING"}
+# Hot-path call sites ("<module>.<function>") that keep 1 in N of their records below WARNING;
+# served models are pickled from model_trainer, so their predict logs as model_trainer.predict
+DEFAULT_LOG_SAMPLING = {"model_trainer.predict": 100, "estimator.predict": 100, "main_utils.load_object": 100,
+                        "main_utils.save_object": 100}
 
 # common file name
 
@@ -13,8 +23,14 @@ FILE_NAME: str = "customer.csv"
 TRAIN_FILE_NAME: str = "train.csv"
 TEST_FILE_NAME: str = "test.csv"
 PREPROCSSING_OBJECT_FILE_NAME = "preprocessing.pkl"
+REFERENCE_PROFILE_FILE_NAME: str = "reference_profile.json"
 MODEL_FILE_NAME = "model.pkl"
 SCHEMA_FILE_PATH = os.path.join("config", "schema.yaml")
+# Format of Dt_Customer in the raw data, read the same way by pandas and MongoDB
+DT_CUSTOMER_DATE_FORMAT: str = "%d-%m-%Y"
+PIPELINE_REPORT_FILE_NAME: str = "pipeline_report.json"
+# Independent training stages run concurrently on this many threads
+PIPELINE_MAX_WORKERS: int = 4
 
 """
 Data Ingestion related constant start with DATA_INGESTION VAR NAME
@@ -22,8 +38,14 @@ Data Ingestion related constant start with DATA_INGESTION VAR NAME
 DATA_INGESTION_COLLECTION_NAME: str = ""
 DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
+# Partitioned copy of the collection shared by all runs, appended with each ingestion's delta
+DATA_INGESTION_FEATURE_STORE_ROOT: str = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, "feature_store")
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.2
+# Customers go to train or test by a hash of this column, or of the whole row when it is missing
+DATA_INGESTION_SPLIT_KEY_COLUMN: str = "ID"
+# Compute the engineered features of a raw collection in a MongoDB (5.0+) aggregation pipeline
+DATA_INGESTION_FEATURE_PUSHDOWN: bool = False
 
 """
 Data Validation realted contant start with DATA_VALIDATION VAR NAME
@@ -34,6 +56,14 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+DATA_VALIDATION_REFERENCE_PROFILE_DIR: str = "reference_profile"
+DATA_VALIDATION_DRIFT_HTML_REPORT_FILE_NAME: str = "report.html"
+DATA_VALIDATION_DRIFT_ENGINE: str = "native"
+DATA_VALIDATION_DRIFT_N_BINS: int = 20
+DATA_VALIDATION_DRIFT_P_VALUE_THRESHOLD: float = 0.05
+DATA_VALIDATION_DRIFT_SHARE: float = 0.5
+DATA_VALIDATION_DRIFT_SAMPLE_SIZE: int = 200000
+DATA_VALIDATION_DRIFT_N_JOBS: int = 4
 
 """
 Data Transformation ralated constant start with DATA_TRANSFORMATION VAR NAME
@@ -42,6 +72,8 @@ Data Transformation ralated constant start with DATA_TRANSFORMATION VAR NAME
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+# Scale, cluster and save the transformed arrays in float64 instead of float32
+DATA_TRANSFORMATION_KEEP_FLOAT64: bool = False
 
 """
 MODEL TRAINER related constant start with MODEL_TRAINER var name
@@ -51,6 +83,26 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_MODEL_CONFIG_FILE_PATH: str = os.path.join("config", "model.yaml")
+# Cross-validation fold scores memoized by estimator, params and data, shared by all runs
+MODEL_TRAINER_SEARCH_SCORE_CACHE_DIR: str = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, "model_search_scores")
+# Least recently used fold scores beyond this many are deleted after every search
+MODEL_TRAINER_SEARCH_SCORE_CACHE_MAX_SCORES: int = 100000
 MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE: float = 0.02
+MODEL_EVALUATION_PREDICTION_CACHE_DIR: str = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, "champion_prediction_cache")
 MODEL_PUSHER_BUCKET_NAME = BUCKET_NAME
+MODEL_REGISTRY_MANIFEST_KEY: str = "registry/manifest.json"
+MODEL_REGISTRY_VERSIONS_PREFIX: str = "registry/models"
+MODEL_REGISTRY_CACHE_DIR: str = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, "model_registry_cache")
+# B2 uploads files above min part size as a parallel large file; 5 MB is the smallest part B2 accepts
+MODEL_PUSHER_MIN_PART_SIZE: int = 5 * 1024 * 1024
+MODEL_PUSHER_UPLOAD_RETRIES: int = 3
 
+
+"""
+Synthetic data related constant
+"""
+SYNTHETIC_RAW_SOURCE_PATH: str = os.path.join("data", "raw", "marketing_campaign.csv")
+SYNTHETIC_ENGINEERED_SOURCE_PATH: str = os.path.join("data", "processed", "clustered_data.csv")
+SYNTHETIC_ID_COLUMN: str = "ID"
+SYNTHETIC_DATE_FORMATS = {"Dt_Customer": DT_CUSTOMER_DATE_FORMAT}
+SYNTHETIC_CHUNK_SIZE: int = 100000
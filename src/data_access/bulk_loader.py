@@ -0,0 +1,208 @@
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constant.database import (BULK_LOAD_BATCH_SIZE, BULK_LOAD_CHUNK_SIZE, BULK_LOAD_KEY_FIELD,
+                                   BULK_LOAD_MAX_WORKERS, CONTENT_HASH_FIELD, DATABASE_NAME, OCCURRENCE_FIELD,
+                                   SEEN_AT_FIELD, UPDATED_AT_FIELD)
+from src.exception import CustomerException
+from src.logger import logging
+
+STAGING_SUFFIX = "_staging"
+
+
+@dataclass
+class BulkLoadResult:
+    """
+    n_modified counts every matched document written, which is all of them since each load
+    sets SEEN_AT_FIELD; n_changed counts those whose content changed, n_unchanged the rest.
+    """
+    collection_name: str
+    key_field: str
+    mode: str
+    n_rows: int
+    n_upserted: int
+    n_modified: int
+    n_matched: int
+    n_changed: int
+    n_pruned: int
+    seconds: float
+
+    @property
+    def n_unchanged(self) -> int:
+        return self.n_matched - self.n_changed
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.n_rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def _canonical_text(series: pd.Series) -> pd.Series:
+    """
+    String form of a column independent of the dtype pandas inferred for it: integral floats
+    are written as integers, so an int column read as float64 because a chunk holds a null
+    gives the same strings, and nulls of any kind are empty.
+    """
+    text = series.astype(str)
+    if pd.api.types.is_float_dtype(series):
+        integral = np.isfinite(series) & (series == np.floor(series))
+        text = text.where(~integral, series[integral].astype(np.int64).astype(str))
+    return text.mask(series.isna(), "")
+
+
+def content_hash(dataframe: pd.DataFrame) -> pd.Series:
+    """Stable 64-bit hash of every row's canonical string values, as 16 hex characters."""
+    canonical = pd.DataFrame({column: _canonical_text(dataframe[column]) for column in dataframe.columns},
+                             index=dataframe.index)
+    hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy(dtype=np.uint64)
+    return pd.Series([f"{value:016x}" for value in hashes], index=dataframe.index)
+
+
+class MongoBulkLoader:
+    """
+    Streams a CSV into a collection in chunks of chunk_size rows, upserting each row by key_field
+    in unordered bulk_write batches spread over max_workers threads. Files without that column
+    are keyed by each row's content hash plus its occurrence number among identical rows, so
+    duplicate rows stay separate documents and a reload of the same file matches them again.
+
+    Every document gets CONTENT_HASH_FIELD, SEEN_AT_FIELD and UPDATED_AT_FIELD. SEEN_AT_FIELD is
+    set to the load's start time on every document of the file; UPDATED_AT_FIELD only when the
+    document is new or its content hash differs from the stored one, so reloading an unchanged
+    file leaves it alone for incremental readers. Upserts make a load idempotent, so a failed
+    load is simply run again. Two modes:
+
+    - upsert: write into the live collection, which is never empty; prune=True then deletes the
+      documents the load did not see.
+    - swap: write into <collection>_staging and rename it over the collection once every batch
+      succeeded, so readers see either the old or the new data set.
+    """
+
+    def __init__(self, collection_name: str, database_name: str = DATABASE_NAME,
+                 key_field: str = BULK_LOAD_KEY_FIELD, chunk_size: int = BULK_LOAD_CHUNK_SIZE,
+                 batch_size: int = BULK_LOAD_BATCH_SIZE, max_workers: int = BULK_LOAD_MAX_WORKERS):
+        try:
+            self.mongo_client = MongoDBClient(database_name=database_name)
+            self.collection_name = collection_name
+            self.key_field = key_field
+            self.chunk_size = chunk_size
+            self.batch_size = batch_size
+            self.max_workers = max_workers
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def _batches(self, chunk: pd.DataFrame, key_fields: List[str], loaded_at: datetime,
+                 seen_hashes: Optional[Dict[str, int]] = None) -> Iterable[List[UpdateOne]]:
+        """
+        Upserts of one chunk in batches of batch_size. seen_hashes counts the content hashes of
+        earlier chunks when rows are keyed by hash and is updated in place.
+        """
+        hashes = content_hash(chunk)
+        chunk = chunk.replace({np.nan: None})
+        chunk[CONTENT_HASH_FIELD] = hashes
+        if seen_hashes is not None:
+            earlier = hashes.map(seen_hashes).fillna(0).astype(int)
+            chunk[OCCURRENCE_FIELD] = hashes.groupby(hashes).cumcount() + earlier
+            for hash_value, count in hashes.value_counts().items():
+                seen_hashes[hash_value] = seen_hashes.get(hash_value, 0) + int(count)
+        records = chunk.to_dict("records")
+        for start in range(0, len(records), self.batch_size):
+            yield [
+                UpdateOne({field: record[field] for field in key_fields}, self._update(record, loaded_at), upsert=True)
+                for record in records[start:start + self.batch_size]
+            ]
+
+    @staticmethod
+    def _update(record: dict, loaded_at: datetime) -> List[dict]:
+        """
+        Pipeline update of one document: UPDATED_AT_FIELD is compared against the stored content
+        hash before the record overwrites it, and kept when the hash is unchanged. Values are
+        wrapped in $literal so strings starting with $ are not read as field paths.
+        """
+        return [
+            {"$set": {UPDATED_AT_FIELD: {"$cond": [
+                {"$eq": [f"${CONTENT_HASH_FIELD}", record[CONTENT_HASH_FIELD]]}, f"${UPDATED_AT_FIELD}", loaded_at,
+            ]}}},
+            {"$set": {**{field: {"$literal": value} for field, value in record.items()}, SEEN_AT_FIELD: loaded_at}},
+        ]
+
+    def load(self, csv_path: str, mode: str = "upsert", prune: bool = False, **read_csv_kwargs) -> BulkLoadResult:
+        try:
+            if mode not in ("upsert", "swap"):
+                raise ValueError(f"Unknown load mode {mode}, expected upsert or swap")
+            database = self.mongo_client.database
+            target_name = self.collection_name + STAGING_SUFFIX if mode == "swap" else self.collection_name
+            if mode == "swap":
+                database.drop_collection(target_name)
+            collection = database[target_name]
+
+            header = pd.read_csv(csv_path, nrows=0, **read_csv_kwargs).columns
+            if self.key_field in header:
+                key_fields, seen_hashes = [self.key_field], None
+            else:
+                key_fields, seen_hashes = [CONTENT_HASH_FIELD, OCCURRENCE_FIELD], {}
+                logging.info(f"{csv_path} has no {self.key_field} column, upserting by content hash")
+            collection.create_index([(field, 1) for field in key_fields], unique=True)
+
+            # Mongo stores datetimes with millisecond precision
+            now = datetime.now(timezone.utc)
+            loaded_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            started = time.perf_counter()
+            n_rows, totals, in_flight = 0, {"upserted": 0, "modified": 0, "matched": 0}, set()
+
+            def collect(done) -> None:
+                for future in done:
+                    result = future.result()
+                    totals["upserted"] += result.upserted_count
+                    totals["modified"] += result.modified_count
+                    totals["matched"] += result.matched_count
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk-load") as executor:
+                for chunk in pd.read_csv(csv_path, chunksize=self.chunk_size, **read_csv_kwargs):
+                    for batch in self._batches(chunk, key_fields, loaded_at, seen_hashes):
+                        # bound the batches held in memory to two per worker
+                        if len(in_flight) >= 2 * self.max_workers:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            collect(done)
+                        in_flight.add(executor.submit(collection.bulk_write, batch, ordered=False))
+                    n_rows += len(chunk)
+                    logging.info(f"Loaded {n_rows} rows into {target_name} "
+                                 f"({n_rows / (time.perf_counter() - started):.0f} docs/sec)")
+                done, _ = wait(in_flight)
+                collect(done)
+
+            # matched documents whose content hash differed got updated_at == loaded_at, like the new ones
+            n_changed = collection.count_documents({UPDATED_AT_FIELD: loaded_at}) - totals["upserted"]
+            n_pruned = 0
+            if mode == "swap":
+                collection.rename(self.collection_name, dropTarget=True)
+                logging.info(f"Swapped {target_name} into {self.collection_name}")
+            elif prune:
+                # documents loaded before SEEN_AT_FIELD existed and missing from this load have none
+                n_pruned = collection.delete_many({"$or": [{SEEN_AT_FIELD: {"$lt": loaded_at}},
+                                                           {SEEN_AT_FIELD: {"$exists": False}}]}).deleted_count
+                logging.info(f"Pruned {n_pruned} documents missing from {csv_path}")
+
+            result = BulkLoadResult(
+                collection_name=self.collection_name,
+                key_field="+".join(key_fields),
+                mode=mode,
+                n_rows=n_rows,
+                n_upserted=totals["upserted"],
+                n_modified=totals["modified"],
+                n_matched=totals["matched"],
+                n_changed=n_changed,
+                n_pruned=n_pruned,
+                seconds=time.perf_counter() - started,
+            )
+            logging.info(f"Bulk load finished: {result} ({result.docs_per_second:.0f} docs/sec)")
+            return result
+        except Exception as e:
+            raise CustomerException(e, sys)
@@ -1,11 +1,13 @@
 import sys
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
 
 from src.configuration.mongo_db_connection import MongoDBClient
-from src.constant.database import DATABASE_NAME
+from src.constant.database import CONTENT_HASH_FIELD, DATABASE_NAME, OCCURRENCE_FIELD, SEEN_AT_FIELD, UPDATED_AT_FIELD
+from src.data_access.engineered_features import build_feature_pipeline, engineer_features
 from src.exception import CustomerException
 
 
@@ -18,12 +20,10 @@ class CustomerData:
 
     def export_collection_as_dataframe(self, collection_name: str, database_name: Optional[str] = None) -> pd.DataFrame:
         try:
-            if database_name is None:
-                collection = self.mongo_client.database[collection_name]
-            else:
-                collection = self.mongo_client[database_name][collection_name]
+            collection = self._collection(collection_name, database_name)
             
-            df = pd.DataFrame(list(collection.find()))
+            projection = {CONTENT_HASH_FIELD: 0, OCCURRENCE_FIELD: 0, SEEN_AT_FIELD: 0, UPDATED_AT_FIELD: 0}
+            df = pd.DataFrame(list(collection.find({}, projection)))
             
             if "_id" in df.columns.to_list():
                 df = df.drop(columns=["_id"], axis=1)
@@ -32,3 +32,53 @@ class CustomerData:
             return df
         except Exception as e:
             raise CustomerException(e, sys)
+
+    def _collection(self, collection_name: str, database_name: Optional[str] = None):
+        if database_name is None:
+            return self.mongo_client.database[collection_name]
+        return self.mongo_client.client[database_name][collection_name]
+
+    def has_raw_layout(self, collection_name: str, database_name: Optional[str] = None) -> bool:
+        """Whether the collection holds raw marketing campaign documents (judged by one document)."""
+        try:
+            document = self._collection(collection_name, database_name).find_one({}, {"Dt_Customer": 1, "Year_Birth": 1})
+            return document is not None and "Dt_Customer" in document and "Year_Birth" in document
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def export_engineered_features_as_dataframe(self, collection_name: str, database_name: Optional[str] = None,
+                                                feature_columns: Optional[List[str]] = None,
+                                                reference_date: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Engineered feature columns of a raw collection, computed by the server in an aggregation
+        pipeline, so only those columns are transferred.
+        """
+        try:
+            collection = self._collection(collection_name, database_name)
+            pipeline = build_feature_pipeline(feature_columns, reference_date)
+            df = pd.DataFrame(list(collection.aggregate(pipeline, allowDiskUse=True)))
+            return df.replace({"na": np.nan})
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def check_feature_parity(self, collection_name: str, database_name: Optional[str] = None,
+                             sample_size: int = 1000, feature_columns: Optional[List[str]] = None,
+                             reference_date: Optional[datetime] = None) -> int:
+        """
+        Computes the engineered features of the first sample_size documents both in pandas and in
+        the aggregation pipeline and raises if they differ; returns the number of rows compared.
+        """
+        try:
+            collection = self._collection(collection_name, database_name)
+            documents = list(collection.find().sort("_id", 1).limit(sample_size))
+            ids = [document.pop("_id") for document in documents]
+            expected = engineer_features(pd.DataFrame(documents).replace({"na": np.nan}), feature_columns,
+                                         reference_date).reset_index(drop=True)
+
+            pipeline = [{"$match": {"_id": {"$in": ids}}}, {"$sort": {"_id": 1}}]
+            pipeline += build_feature_pipeline(feature_columns, reference_date)
+            actual = pd.DataFrame(list(collection.aggregate(pipeline)), columns=expected.columns)
+            pd.testing.assert_frame_equal(actual.replace({"na": np.nan}), expected, check_dtype=False)
+            return len(expected)
+        except Exception as e:
+            raise CustomerException(e, sys)
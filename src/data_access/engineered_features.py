@@ -0,0 +1,139 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.constant.training_pipeline import DT_CUSTOMER_DATE_FORMAT
+
+# Ages are computed against this year, as when the clustering was designed
+AGE_REFERENCE_YEAR: int = 2022
+EDUCATION_CODES = {"Basic": 0, "2n Cycle": 1, "Graduation": 2, "Master": 3, "PhD": 4}
+MARITAL_STATUS_CODES = {"Married": 1, "Together": 1, "Absurd": 0, "Widow": 0, "YOLO": 0, "Divorced": 0,
+                        "Single": 0, "Alone": 0}
+SPENDING_COLUMNS = ["MntWines", "MntFruits", "MntMeatProducts", "MntFishProducts", "MntSweetProducts", "MntGoldProds"]
+CAMPAIGN_COLUMNS = ["AcceptedCmp1", "AcceptedCmp2", "AcceptedCmp3", "AcceptedCmp4", "AcceptedCmp5"]
+RAW_COLUMN_RENAMES = {
+    "Marital_Status": "Marital Status",
+    "MntWines": "Wines",
+    "MntFruits": "Fruits",
+    "MntMeatProducts": "Meat",
+    "MntFishProducts": "Fish",
+    "MntSweetProducts": "Sweets",
+    "MntGoldProds": "Gold",
+    "NumWebPurchases": "Web",
+    "NumCatalogPurchases": "Catalog",
+    "NumStorePurchases": "Store",
+    "NumDealsPurchases": "Discount Purchases",
+}
+DEFAULT_FEATURE_COLUMNS = [
+    "Age",
+    "Education",
+    "Marital Status",
+    "Parental Status",
+    "Children",
+    "Income",
+    "Total_Spending",
+    "Days_as_Customer",
+    "Recency",
+    "Wines",
+    "Fruits",
+    "Meat",
+    "Fish",
+    "Sweets",
+    "Gold",
+    "Web",
+    "Catalog",
+    "Store",
+    "Discount Purchases",
+    "Total Promo",
+    "NumWebVisitsMonth",
+]
+
+
+def reference_midnight(reference_date: Optional[datetime] = None) -> datetime:
+    """
+    Day against which Days_as_Customer is counted, truncated to midnight. Customer dates carry no
+    time, so whole days between midnights are the same in pandas and in MongoDB's $dateDiff.
+    """
+    reference_date = reference_date or datetime.today()
+    return datetime(reference_date.year, reference_date.month, reference_date.day)
+
+
+def _recode(series: pd.Series, codes: Dict[str, int]) -> pd.Series:
+    """Codes of a categorical column; a compact categorical column is decoded to its values first."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return series.replace(codes)
+
+
+def engineer_features(raw: pd.DataFrame, feature_columns: Optional[List[str]] = None,
+                      reference_date: Optional[datetime] = None, copy: bool = True) -> pd.DataFrame:
+    """
+    Engineered feature columns of a dataframe in the raw schema.yaml layout. With copy=False the
+    intermediate columns are built in raw itself, for callers that do not use raw afterwards.
+    """
+    df = raw.copy() if copy else raw
+    df['Age'] = AGE_REFERENCE_YEAR - df['Year_Birth']
+    df['Education'] = _recode(df['Education'], EDUCATION_CODES)
+    df['Marital_Status'] = _recode(df['Marital_Status'], MARITAL_STATUS_CODES)
+    df['Children'] = df['Kidhome'] + df['Teenhome']
+    df['Family_Size'] = df['Marital_Status'] + df['Children'] + 1
+    df['Total_Spending'] = df[SPENDING_COLUMNS].sum(axis=1, min_count=len(SPENDING_COLUMNS))
+    df["Total Promo"] = df[CAMPAIGN_COLUMNS].sum(axis=1, min_count=len(CAMPAIGN_COLUMNS))
+
+    df['Dt_Customer'] = pd.to_datetime(df['Dt_Customer'], format=DT_CUSTOMER_DATE_FORMAT)
+    df['Days_as_Customer'] = (reference_midnight(reference_date) - df['Dt_Customer']).dt.days
+    df['Offers_Responded_To'] = df[CAMPAIGN_COLUMNS + ['Response']].sum(axis=1, min_count=len(CAMPAIGN_COLUMNS) + 1)
+    df["Parental Status"] = np.where(df["Children"] > 0, 1, 0)
+
+    df.drop(columns=['Year_Birth', 'Kidhome', 'Teenhome'], inplace=True)
+    df.rename(columns=RAW_COLUMN_RENAMES, inplace=True)
+    return df[feature_columns or DEFAULT_FEATURE_COLUMNS]
+
+
+def _code_switch(field: str, codes: Dict[str, int]) -> dict:
+    """Codes of a categorical field; unknown values pass through unchanged, like DataFrame.replace."""
+    return {"$switch": {
+        "branches": [{"case": {"$eq": [f"${field}", value]}, "then": code} for value, code in codes.items()],
+        "default": f"${field}",
+    }}
+
+
+def feature_expressions(reference_date: Optional[datetime] = None) -> Dict[str, dict]:
+    """Aggregation expression of every engineered column, mirroring engineer_features."""
+    children = {"$add": ["$Kidhome", "$Teenhome"]}
+    marital_status = _code_switch("Marital_Status", MARITAL_STATUS_CODES)
+    customer_since = {"$dateFromString": {"dateString": "$Dt_Customer", "format": DT_CUSTOMER_DATE_FORMAT}}
+    expressions = {
+        "Age": {"$subtract": [AGE_REFERENCE_YEAR, "$Year_Birth"]},
+        "Education": _code_switch("Education", EDUCATION_CODES),
+        "Marital Status": marital_status,
+        "Children": children,
+        "Family_Size": {"$add": [marital_status, children, 1]},
+        "Total_Spending": {"$add": [f"${column}" for column in SPENDING_COLUMNS]},
+        "Total Promo": {"$add": [f"${column}" for column in CAMPAIGN_COLUMNS]},
+        "Days_as_Customer": {"$dateDiff": {
+            "startDate": customer_since, "endDate": reference_midnight(reference_date), "unit": "day",
+        }},
+        "Offers_Responded_To": {"$add": [f"${column}" for column in CAMPAIGN_COLUMNS + ["Response"]]},
+        "Parental Status": {"$cond": [{"$gt": [children, 0]}, 1, 0]},
+    }
+    for raw_column, engineered_column in RAW_COLUMN_RENAMES.items():
+        expressions.setdefault(engineered_column, f"${raw_column}")
+    return expressions
+
+
+def build_feature_pipeline(feature_columns: Optional[List[str]] = None,
+                           reference_date: Optional[datetime] = None) -> List[dict]:
+    """
+    Aggregation pipeline returning only the engineered feature columns of raw documents, so the
+    server does the feature engineering and ships 21 columns instead of the raw ones.
+    $dateDiff needs MongoDB 5.0 or newer.
+    """
+    expressions = feature_expressions(reference_date)
+    projection = {"_id": 0}
+    for column in feature_columns or DEFAULT_FEATURE_COLUMNS:
+        # columns kept as they are (Income, Recency, ...) are read straight from the document
+        projection[column] = expressions.get(column, f"${column}")
+    return [{"$project": projection}]
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constant.database import CONTENT_HASH_FIELD, DATABASE_NAME, OCCURRENCE_FIELD, SEEN_AT_FIELD, UPDATED_AT_FIELD
+from src.constant.training_pipeline import DATA_INGESTION_FEATURE_STORE_ROOT
+from src.data_access.bulk_loader import content_hash
+from src.exception import CustomerException
+from src.logger import logging
+
+DOC_ID_COLUMN = "_doc_id"
+STATE_FILE_NAME = "state.json"
+INDEX_FILE_NAME = "index.csv"
+FETCH_BATCH_SIZE = 1000
+
+
+class FeatureStore:
+    """
+    Local, append-only copy of a collection, kept as one CSV partition per ingestion batch under
+    <root_dir>/<collection>/date=<day>/<batch>.csv.
+
+    An ingestion reads only _id, content hash and updated_at of the documents updated since the
+    last ingestion (all documents the first time, or with full_scan) and compares them with the
+    index of content hashes already stored; only new and changed documents are fetched in full
+    and appended as a new partition. A full scan also records documents gone from the collection
+    in a tombstone file next to the partition, and runs by itself when the collection's document
+    count no longer matches the store. read() presents the partitions as one dataset, the
+    latest version of every document, and compact() rewrites them as a single partition.
+    Documents without a content hash (not written by the bulk loader) are fetched in full and
+    hashed locally.
+    """
+
+    def __init__(self, collection_name: str, root_dir: str = DATA_INGESTION_FEATURE_STORE_ROOT,
+                 database_name: str = DATABASE_NAME, fetch_batch_size: int = FETCH_BATCH_SIZE):
+        self.collection_name = collection_name
+        self.database_name = database_name
+        self.store_dir = os.path.join(root_dir, collection_name)
+        self.state_path = os.path.join(self.store_dir, STATE_FILE_NAME)
+        self.index_path = os.path.join(self.store_dir, INDEX_FILE_NAME)
+        self.fetch_batch_size = fetch_batch_size
+
+    def load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {"watermark": None, "batches": []}
+        with open(self.state_path) as file_obj:
+            return json.load(file_obj)
+
+    def _save_state(self, state: dict) -> None:
+        os.makedirs(self.store_dir, exist_ok=True)
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, "w") as file_obj:
+            json.dump(state, file_obj, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def _load_index(self) -> Dict[str, str]:
+        if not os.path.exists(self.index_path):
+            return {}
+        index = pd.read_csv(self.index_path, dtype=str)
+        return dict(zip(index[DOC_ID_COLUMN], index[CONTENT_HASH_FIELD]))
+
+    def _save_index(self, index: Dict[str, str]) -> None:
+        temp_path = f"{self.index_path}.tmp"
+        pd.DataFrame({DOC_ID_COLUMN: list(index), CONTENT_HASH_FIELD: list(index.values())}).to_csv(temp_path, index=False)
+        os.replace(temp_path, self.index_path)
+
+    def _fetch(self, collection, ids: List) -> pd.DataFrame:
+        """Full documents of ids without the loader's bookkeeping fields, _id as DOC_ID_COLUMN."""
+        frames = []
+        projection = {CONTENT_HASH_FIELD: 0, OCCURRENCE_FIELD: 0, SEEN_AT_FIELD: 0, UPDATED_AT_FIELD: 0}
+        for start in range(0, len(ids), self.fetch_batch_size):
+            documents = list(collection.find({"_id": {"$in": ids[start:start + self.fetch_batch_size]}}, projection))
+            frames.append(pd.DataFrame(documents))
+        if not frames:
+            return pd.DataFrame(columns=[DOC_ID_COLUMN])
+        df = pd.concat(frames, ignore_index=True)
+        df[DOC_ID_COLUMN] = df.pop("_id").astype(str)
+        return df
+
+    def ingest(self, full_scan: bool = False) -> dict:
+        """Append the documents new or changed since the last ingestion as a new partition."""
+        try:
+            collection = MongoDBClient(database_name=self.database_name).database[self.collection_name]
+            state, index = self.load_state(), self._load_index()
+            watermark = None if full_scan or state["watermark"] is None else datetime.fromisoformat(state["watermark"])
+
+            # >= so documents written in the same instant as the watermark, after the last scan, are not missed
+            query = {UPDATED_AT_FIELD: {"$gte": watermark}} if watermark is not None else {}
+            changed_ids, unhashed_ids, seen_ids, new_watermark = [], [], set(), watermark
+            changed_hashes: Dict[str, str] = {}
+            for document in collection.find(query, {"_id": 1, CONTENT_HASH_FIELD: 1, UPDATED_AT_FIELD: 1}):
+                doc_id = str(document["_id"])
+                seen_ids.add(doc_id)
+                updated_at = document.get(UPDATED_AT_FIELD)
+                if updated_at is not None and (new_watermark is None or updated_at > new_watermark):
+                    new_watermark = updated_at
+                document_hash = document.get(CONTENT_HASH_FIELD)
+                if document_hash is None:
+                    unhashed_ids.append(document["_id"])
+                elif index.get(doc_id) != document_hash:
+                    changed_ids.append(document["_id"])
+                    changed_hashes[doc_id] = document_hash
+
+            delta = self._fetch(collection, changed_ids)
+            if unhashed_ids:
+                unhashed = self._fetch(collection, unhashed_ids)
+                hashes = content_hash(unhashed.drop(columns=[DOC_ID_COLUMN]))
+                is_changed = [index.get(doc_id) != value for doc_id, value in zip(unhashed[DOC_ID_COLUMN], hashes)]
+                changed_hashes.update(zip(unhashed[DOC_ID_COLUMN][is_changed], hashes[is_changed]))
+                delta = pd.concat([delta, unhashed[is_changed]], ignore_index=True)
+
+            deleted_ids = sorted(set(index) - seen_ids) if watermark is None else []
+
+            now = datetime.now()
+            batch_id = now.strftime("%Y%m%dT%H%M%S%f")
+            partition_dir = os.path.join(self.store_dir, f"date={now:%Y-%m-%d}")
+            batch = {"batch_id": batch_id, "created_at": now.isoformat(timespec="seconds"),
+                     "rows": len(delta), "deleted": len(deleted_ids), "path": None, "deleted_path": None}
+            if len(delta) or deleted_ids:
+                os.makedirs(partition_dir, exist_ok=True)
+            if len(delta):
+                batch["path"] = os.path.join(partition_dir, f"{batch_id}.csv")
+                delta.to_csv(batch["path"], index=False)
+            if deleted_ids:
+                batch["deleted_path"] = os.path.join(partition_dir, f"{batch_id}.deleted.csv")
+                pd.DataFrame({DOC_ID_COLUMN: deleted_ids}).to_csv(batch["deleted_path"], index=False)
+
+            # state before index: after a crash in between, the next ingestion appends the same
+            # documents again, which read() deduplicates, instead of losing them
+            if len(delta) or deleted_ids:
+                state["batches"].append(batch)
+            state["watermark"] = new_watermark.isoformat() if new_watermark is not None else state["watermark"]
+            self._save_state(state)
+            if len(delta) or deleted_ids:
+                index.update(changed_hashes)
+                for doc_id in deleted_ids:
+                    index.pop(doc_id, None)
+                self._save_index(index)
+
+            logging.info(f"Feature store {self.collection_name}: scanned {len(seen_ids)} documents, "
+                         f"appended {len(delta)} new or changed, {len(deleted_ids)} deleted")
+
+            # documents deleted (or replaced, e.g. by a swap reload) since the last ingestion only
+            # show up in a full scan; the document count tells cheaply whether one is needed
+            if watermark is not None and collection.estimated_document_count() != len(index):
+                logging.info(f"Document count of {self.collection_name} differs from the feature store, rescanning")
+                return self.ingest(full_scan=True)
+            return batch
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def read(self, include_doc_id: bool = False) -> pd.DataFrame:
+        """Latest version of every stored document, without deleted ones, as one dataframe."""
+        try:
+            rows, tombstones = [], []
+            for sequence, batch in enumerate(self.load_state()["batches"]):
+                if batch["path"]:
+                    rows.append(pd.read_csv(batch["path"], dtype={DOC_ID_COLUMN: str}).assign(_sequence=sequence))
+                if batch["deleted_path"]:
+                    tombstones.append(pd.read_csv(batch["deleted_path"], dtype=str).assign(_sequence=sequence))
+            if not rows:
+                return pd.DataFrame()
+
+            df = pd.concat(rows, ignore_index=True).drop_duplicates(DOC_ID_COLUMN, keep="last")
+            if tombstones:
+                deleted_at = pd.concat(tombstones).drop_duplicates(DOC_ID_COLUMN, keep="last")
+                deleted_at = deleted_at.set_index(DOC_ID_COLUMN)["_sequence"]
+                df = df[~(df[DOC_ID_COLUMN].map(deleted_at) > df["_sequence"])]
+            df = df.drop(columns=["_sequence"]).reset_index(drop=True)
+            if not include_doc_id:
+                df = df.drop(columns=[DOC_ID_COLUMN])
+            df.replace({"na": np.nan}, inplace=True)
+            return df
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def compact(self) -> dict:
+        """Rewrite all partitions as one partition holding the current dataset."""
+        try:
+            state = self.load_state()
+            if len(state["batches"]) <= 1 and not any(batch["deleted_path"] for batch in state["batches"]):
+                logging.info(f"Feature store {self.collection_name} is already compact")
+                return state
+            df = self.read(include_doc_id=True)
+            now = datetime.now()
+            batch_id = now.strftime("%Y%m%dT%H%M%S%f")
+            compacted_dir = os.path.join(self.store_dir, "compacted")
+            os.makedirs(compacted_dir, exist_ok=True)
+            path = os.path.join(compacted_dir, f"{batch_id}.csv")
+            df.to_csv(path, index=False)
+
+            old_batches = state["batches"]
+            state["batches"] = [{"batch_id": batch_id, "created_at": now.isoformat(timespec="seconds"),
+                                 "rows": len(df), "deleted": 0, "path": path, "deleted_path": None}]
+            self._save_state(state)
+            for batch in old_batches:
+                for old_path in (batch["path"], batch["deleted_path"]):
+                    if old_path and os.path.exists(old_path):
+                        os.remove(old_path)
+            for entry in os.listdir(self.store_dir):
+                entry_path = os.path.join(self.store_dir, entry)
+                if entry.startswith("date=") and os.path.isdir(entry_path) and not os.listdir(entry_path):
+                    shutil.rmtree(entry_path)
+            logging.info(f"Compacted {len(old_batches)} partitions of {self.collection_name} into {path}")
+            return state
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+
+def main(argv: Optional[List[str]] = None):
+    from src.constant.database import COLLECTION_NAME
+
+    parser = argparse.ArgumentParser(description="Maintain the partitioned feature store")
+    parser.add_argument("command", choices=["ingest", "compact", "status"])
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--full-scan", action="store_true", help="with ingest, also detect deleted documents")
+    args = parser.parse_args(argv)
+
+    feature_store = FeatureStore(collection_name=args.collection)
+    if args.command == "ingest":
+        print(feature_store.ingest(full_scan=args.full_scan))
+    elif args.command == "compact":
+        feature_store.compact()
+    state = feature_store.load_state()
+    print(f"watermark: {state['watermark']}")
+    for batch in state["batches"]:
+        print(f"{batch['batch_id']}  rows {batch['rows']:>9}  deleted {batch['deleted']:>7}  {batch['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.exception import CustomerException
+from src.logger import logging
+
+NUMERIC_COLUMN = "numeric"
+CATEGORICAL_COLUMN = "categorical"
+
+# Numeric columns with at most this many distinct reference values are tested as categories,
+# the same rule Evidently uses to choose between the KS and chi-square tests.
+CATEGORICAL_MAX_UNIQUE = 5
+
+PSI_EPSILON = 1e-4
+
+
+def reservoir_sample(data: Union[DataFrame, Iterable[DataFrame]], sample_size: int,
+                     random_state: int = 42) -> DataFrame:
+    """
+    Uniform sample of sample_size rows from a frame or a stream of frame chunks.
+
+    Every row gets a random key and the rows with the sample_size smallest keys are kept, so the
+    sample only ever holds sample_size rows plus one chunk in memory.
+    """
+    chunks = [data] if isinstance(data, DataFrame) else data
+    rng = np.random.default_rng(random_state)
+
+    reservoir: Optional[DataFrame] = None
+    reservoir_keys = np.empty(0)
+    for chunk in chunks:
+        if reservoir is None:
+            reservoir = chunk.iloc[:0]
+        keys = np.concatenate([reservoir_keys, rng.random(len(chunk))])
+        if len(keys) <= sample_size:
+            reservoir = pd.concat([reservoir, chunk], ignore_index=True)
+            reservoir_keys = keys
+            continue
+
+        keep = np.argpartition(keys, sample_size - 1)[:sample_size]
+        keep.sort()
+        n_reservoir = len(reservoir)
+        from_reservoir, from_chunk = keep[keep < n_reservoir], keep[keep >= n_reservoir] - n_reservoir
+        reservoir = pd.concat([reservoir.iloc[from_reservoir], chunk.iloc[from_chunk]], ignore_index=True)
+        reservoir_keys = keys[keep]
+
+    return reservoir if reservoir is not None else DataFrame()
+
+
+def ks_p_value(statistic: float, n_reference: int, n_current: int) -> float:
+    """Asymptotic two-sample Kolmogorov-Smirnov p-value."""
+    if n_reference == 0 or n_current == 0:
+        return 1.0
+    en = math.sqrt(n_reference * n_current / (n_reference + n_current))
+    lam = (en + 0.12 + 0.11 / en) * statistic
+    if lam < 1e-3:
+        return 1.0
+    terms = [2 * (-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam) for j in range(1, 101)]
+    return float(min(max(sum(terms), 0.0), 1.0))
+
+
+def chi2_p_value(statistic: float, dof: int) -> float:
+    """Upper tail of the chi-square distribution, the regularized incomplete gamma Q(dof/2, x/2)."""
+    if dof <= 0:
+        return 1.0
+    a, x = dof / 2.0, statistic / 2.0
+    if x <= 0:
+        return 1.0
+    log_prefactor = -x + a * math.log(x) - math.lgamma(a)
+
+    if x < a + 1:
+        term = total = 1.0 / a
+        n = a
+        for _ in range(500):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-12:
+                break
+        return float(min(max(1.0 - total * math.exp(log_prefactor), 0.0), 1.0))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-12:
+            break
+    return float(min(max(math.exp(log_prefactor) * h, 0.0), 1.0))
+
+
+def population_stability_index(reference_counts: np.ndarray, current_counts: np.ndarray) -> float:
+    reference = np.maximum(reference_counts / max(reference_counts.sum(), 1), PSI_EPSILON)
+    current = np.maximum(current_counts / max(current_counts.sum(), 1), PSI_EPSILON)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+class DriftEngine:
+    """
+    Dependency-free dataset drift detection over binned histograms.
+
+    Each reference column is summarised once: numeric columns as counts over reference quantile
+    bins (with open-ended outer bins), low-cardinality and object columns as category counts.
+    The current column is counted into the same bins and compared with PSI plus a KS test for
+    numeric columns or a chi-square test for categorical ones. The dataset drifts when the
+    share of drifted columns reaches drift_share, which mirrors Evidently's DataDriftPreset.
+    """
+
+    def __init__(self, n_bins: int = 20, p_value_threshold: float = 0.05, drift_share: float = 0.5,
+                 sample_size: Optional[int] = None, n_jobs: int = 4, random_state: int = 42):
+        self.n_bins = n_bins
+        self.p_value_threshold = p_value_threshold
+        self.drift_share = drift_share
+        self.sample_size = sample_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    @staticmethod
+    def column_type(values: pd.Series) -> str:
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if values.nunique(dropna=True) > CATEGORICAL_MAX_UNIQUE:
+                return NUMERIC_COLUMN
+        return CATEGORICAL_COLUMN
+
+    def summarize_column(self, values: pd.Series) -> dict:
+        """Histogram summary of one reference column, the only reference state drift needs."""
+        column_type = self.column_type(values)
+        non_null = values.dropna()
+        summary = {
+            "type": column_type,
+            "count": int(len(non_null)),
+            "null_rate": float(values.isna().mean()) if len(values) else 0.0,
+        }
+
+        if column_type == NUMERIC_COLUMN:
+            array = non_null.to_numpy(dtype=np.float64)
+            edges = np.unique(np.quantile(array, np.linspace(0, 1, self.n_bins + 1)))[1:-1]
+            summary["bin_edges"] = edges.tolist()
+            summary["counts"] = self.count_numeric(array, edges).tolist()
+        else:
+            counts = non_null.astype(str).value_counts()
+            summary["categories"] = counts.index.tolist()
+            summary["counts"] = counts.to_numpy(dtype=np.int64).tolist()
+
+        return summary
+
+    @staticmethod
+    def count_numeric(array: np.ndarray, edges: np.ndarray) -> np.ndarray:
+        return np.bincount(np.searchsorted(edges, array, side="right"), minlength=len(edges) + 1)
+
+    def compare_column(self, summary: dict, values: pd.Series) -> dict:
+        non_null = values.dropna()
+        if summary["type"] == NUMERIC_COLUMN:
+            edges = np.asarray(summary["bin_edges"], dtype=np.float64)
+            current_counts = self.count_numeric(non_null.to_numpy(dtype=np.float64), edges)
+        else:
+            current_counts = non_null.astype(str).value_counts().to_dict()
+
+        current_null_rate = float(values.isna().mean()) if len(values) else 0.0
+        return self.compare_counts(summary, current_counts, current_null_rate)
+
+    def compare_counts(self, summary: dict, current_counts: Union[np.ndarray, Dict[str, int]],
+                       current_null_rate: float = 0.0) -> dict:
+        """
+        Compare a reference summary with current counts: an array aligned with the summary bins for
+        numeric columns, or a category to count mapping for categorical ones.
+        """
+        reference_counts = np.asarray(summary["counts"], dtype=np.float64)
+
+        if summary["type"] == NUMERIC_COLUMN:
+            current_counts = np.asarray(current_counts, dtype=np.float64)
+
+            reference_cdf = np.cumsum(reference_counts) / max(reference_counts.sum(), 1)
+            current_cdf = np.cumsum(current_counts) / max(current_counts.sum(), 1)
+            statistic = float(np.max(np.abs(reference_cdf - current_cdf))) if len(reference_cdf) else 0.0
+            p_value = ks_p_value(statistic, int(reference_counts.sum()), int(current_counts.sum()))
+            method = "ks"
+        else:
+            categories = list(summary["categories"])
+            known = set(categories)
+            unseen = [category for category in current_counts if category not in known]
+            categories.extend(unseen)
+            reference_counts = np.concatenate([reference_counts, np.zeros(len(unseen))])
+            current_counts = np.array([current_counts.get(category, 0) for category in categories], dtype=np.float64)
+
+            observed = np.vstack([reference_counts, current_counts])
+            row_totals = observed.sum(axis=1, keepdims=True)
+            column_totals = observed.sum(axis=0, keepdims=True)
+            expected = row_totals * column_totals / max(observed.sum(), 1)
+            mask = expected > 0
+            statistic = float(np.sum((observed[mask] - expected[mask]) ** 2 / expected[mask]))
+            dof = int(np.count_nonzero(column_totals)) - 1
+            p_value = chi2_p_value(statistic, dof) if row_totals.min() > 0 else 1.0
+            method = "chi_square"
+
+        return {
+            "type": summary["type"],
+            "method": method,
+            "statistic": statistic,
+            "p_value": p_value,
+            "psi": population_stability_index(reference_counts, current_counts),
+            "reference_null_rate": summary["null_rate"],
+            "current_null_rate": current_null_rate,
+            "drift_detected": bool(p_value < self.p_value_threshold),
+        }
+
+    def build_report(self, column_results: Dict[str, dict]) -> dict:
+        n_columns = len(column_results)
+        n_drifted = sum(result["drift_detected"] for result in column_results.values())
+        share_of_drifted = n_drifted / n_columns if n_columns else 0.0
+
+        return {
+            "engine": "native",
+            "dataset_drift": bool(n_columns and share_of_drifted >= self.drift_share),
+            "drift_share": self.drift_share,
+            "number_of_columns": n_columns,
+            "number_of_drifted_columns": int(n_drifted),
+            "share_of_drifted_columns": float(share_of_drifted),
+            "columns": column_results,
+        }
+
+    def _sample(self, dataframe: DataFrame) -> DataFrame:
+        if self.sample_size is None or len(dataframe) <= self.sample_size:
+            return dataframe
+        return reservoir_sample(dataframe, self.sample_size, random_state=self.random_state)
+
+    def summarize(self, reference_df: DataFrame) -> Dict[str, dict]:
+        reference_df = self._sample(reference_df)
+        columns = list(reference_df.columns)
+        with ThreadPoolExecutor(max_workers=max(1, self.n_jobs)) as executor:
+            summaries = executor.map(lambda column: self.summarize_column(reference_df[column]), columns)
+            return dict(zip(columns, summaries))
+
+    def compare(self, summaries: Dict[str, dict], current_df: DataFrame) -> dict:
+        current_df = self._sample(current_df)
+        columns = [column for column in summaries if column in current_df.columns]
+        missing = sorted(set(summaries) - set(columns))
+        if missing:
+            logging.warning(f"Columns missing from current data, skipped in drift check: {missing}")
+
+        with ThreadPoolExecutor(max_workers=max(1, self.n_jobs)) as executor:
+            results = executor.map(lambda column: self.compare_column(summaries[column], current_df[column]), columns)
+            column_results = dict(zip(columns, results))
+
+        return self.build_report(column_results)
+
+    def run(self, reference_df: DataFrame, current_df: DataFrame) -> dict:
+        try:
+            return self.compare(self.summarize(reference_df), current_df)
+        except Exception as e:
+            raise CustomerException(e, sys) from e
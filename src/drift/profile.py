@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+from pandas import DataFrame
+
+from src.drift.engine import NUMERIC_COLUMN, DriftEngine
+from src.exception import CustomerException
+from src.logger import logging
+
+PROFILE_VERSION = 1
+QUANTILE_PROBABILITIES = np.round(np.linspace(0, 1, 101), 2).tolist()
+
+
+class ReferenceProfile:
+    """
+    Compact statistics of the training data, computed once per model version.
+
+    Per column the profile keeps the drift engine summary (bin edges and counts, or category
+    counts), the null rate, a quantile sketch for numeric columns and category frequencies for
+    categorical ones. Drift checks against it only have to count the current data into the
+    stored bins, so the reference frame is never needed again.
+    """
+
+    def __init__(self, columns: Dict[str, dict], n_rows: int, created_at: str = None,
+                 version: int = PROFILE_VERSION):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.created_at = created_at or datetime.now().isoformat(timespec="seconds")
+        self.version = version
+
+    @property
+    def fingerprint(self) -> str:
+        """Short sha1 of the column summaries; profiles with the same bins share it."""
+        content = json.dumps(self.columns, sort_keys=True, default=str)
+        return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+    @classmethod
+    def build(cls, reference_df: DataFrame, drift_engine: DriftEngine = None) -> "ReferenceProfile":
+        try:
+            drift_engine = drift_engine or DriftEngine()
+            columns = drift_engine.summarize(reference_df)
+
+            for column, summary in columns.items():
+                values = reference_df[column].dropna()
+                if summary["type"] == NUMERIC_COLUMN:
+                    array = values.to_numpy(dtype=np.float64)
+                    summary["quantiles"] = np.quantile(array, QUANTILE_PROBABILITIES).tolist()
+                else:
+                    total = max(summary["count"], 1)
+                    summary["frequencies"] = [count / total for count in summary["counts"]]
+
+            logging.info(f"Built reference profile for {len(columns)} columns and {len(reference_df)} rows")
+            return cls(columns=columns, n_rows=int(len(reference_df)))
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "n_rows": self.n_rows,
+            "quantile_probabilities": QUANTILE_PROBABILITIES,
+            "columns": self.columns,
+        }
+
+    def save(self, file_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as file_obj:
+                json.dump(self.to_dict(), file_obj)
+            logging.info(f"Reference profile saved to {file_path}")
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    @classmethod
+    def from_dict(cls, content: dict) -> "ReferenceProfile":
+        return cls(
+            columns=content["columns"],
+            n_rows=content["n_rows"],
+            created_at=content.get("created_at"),
+            version=content.get("version", PROFILE_VERSION),
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReferenceProfile":
+        try:
+            with open(file_path) as file_obj:
+                return cls.from_dict(json.load(file_obj))
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def detect_drift(self, current_df: DataFrame, drift_engine: DriftEngine = None) -> dict:
+        try:
+            drift_engine = drift_engine or DriftEngine()
+            drift_report = drift_engine.compare(self.columns, current_df)
+            drift_report["reference_profile_created_at"] = self.created_at
+            drift_report["reference_rows"] = self.n_rows
+            return drift_report
+        except Exception as e:
+            raise CustomerException(e, sys) from e
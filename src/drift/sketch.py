@@ -0,0 +1,250 @@
+import atexit
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.drift.engine import NUMERIC_COLUMN, DriftEngine
+from src.drift.profile import ReferenceProfile
+from src.exception import CustomerException
+from src.logger import logging
+
+SKETCH_FILE_PREFIX = "sketch_"
+# Batches up to this size are counted in a plain loop, cheaper than a pandas value_counts
+SMALL_BATCH_ROWS = 64
+
+
+class FeatureSketch:
+    """
+    Constant-memory, mergeable summary of one feature.
+
+    Numeric features are counted into the fixed bins of the reference profile, categorical
+    features keep a count per category, and both track rows and nulls. Updating costs one
+    searchsorted/bincount per batch, and two sketches of the same feature merge by adding
+    their counts.
+    """
+
+    def __init__(self, column_type: str, bin_edges: Optional[List[float]] = None,
+                 counts=None, categories: Optional[Dict[str, int]] = None,
+                 n_rows: int = 0, n_nulls: int = 0):
+        self.column_type = column_type
+        self.bin_edges = np.asarray(bin_edges or [], dtype=np.float64)
+        if column_type == NUMERIC_COLUMN:
+            self.counts = (
+                np.asarray(counts, dtype=np.int64) if counts is not None
+                else np.zeros(len(self.bin_edges) + 1, dtype=np.int64)
+            )
+        self.categories = Counter(categories or {})
+        self.n_rows = n_rows
+        self.n_nulls = n_nulls
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "FeatureSketch":
+        return cls(column_type=summary["type"], bin_edges=summary.get("bin_edges"))
+
+    def update(self, values) -> None:
+        array = np.asarray(values)
+        null_mask = pd.isna(array)
+        n_nulls = int(null_mask.sum())
+        self.n_rows += len(array)
+        self.n_nulls += n_nulls
+        if n_nulls:
+            array = array[~null_mask]
+
+        if self.column_type == NUMERIC_COLUMN:
+            self.counts += DriftEngine.count_numeric(array.astype(np.float64), self.bin_edges)
+        elif len(array) <= SMALL_BATCH_ROWS:
+            for value in array:
+                self.categories[str(value)] += 1
+        else:
+            self.categories.update(pd.Series(array).astype(str).value_counts().to_dict())
+
+    def merge(self, other: "FeatureSketch") -> "FeatureSketch":
+        if self.column_type != other.column_type or not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Only sketches with the same type and bins can be merged")
+        if self.column_type == NUMERIC_COLUMN:
+            self.counts = self.counts + other.counts
+        self.categories.update(other.categories)
+        self.n_rows += other.n_rows
+        self.n_nulls += other.n_nulls
+        return self
+
+    @property
+    def current_counts(self):
+        return self.counts if self.column_type == NUMERIC_COLUMN else dict(self.categories)
+
+    @property
+    def null_rate(self) -> float:
+        return self.n_nulls / self.n_rows if self.n_rows else 0.0
+
+    def to_dict(self) -> dict:
+        content = {"type": self.column_type, "n_rows": self.n_rows, "n_nulls": self.n_nulls}
+        if self.column_type == NUMERIC_COLUMN:
+            content["bin_edges"] = self.bin_edges.tolist()
+            content["counts"] = self.counts.tolist()
+        else:
+            content["categories"] = dict(self.categories)
+        return content
+
+    @classmethod
+    def from_dict(cls, content: dict) -> "FeatureSketch":
+        return cls(
+            column_type=content["type"],
+            bin_edges=content.get("bin_edges"),
+            counts=content.get("counts"),
+            categories=content.get("categories"),
+            n_rows=content.get("n_rows", 0),
+            n_nulls=content.get("n_nulls", 0),
+        )
+
+
+class TrafficMonitor:
+    """
+    Streams scored prediction inputs into per-feature sketches built on the reference profile.
+
+    Raw rows are never retained. The current window of sketches is handed to a background
+    writer every flush_interval_seconds or flush_every_rows rows and saved as a small JSON
+    file, so the request thread only pays for the counting. Saved windows can be merged and
+    compared with the training reference at any time.
+    """
+
+    def __init__(self, reference_profile: ReferenceProfile, output_dir: str,
+                 flush_interval_seconds: float = 60.0, flush_every_rows: int = 10000,
+                 drift_engine: DriftEngine = None):
+        self.reference_profile = reference_profile
+        self.output_dir = output_dir
+        self.window_dir = os.path.join(output_dir, reference_profile.fingerprint)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_every_rows = flush_every_rows
+        self.drift_engine = drift_engine or DriftEngine()
+
+        self._lock = Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sketch-writer")
+        self._sketches = self._new_sketches()
+        self._window_rows = 0
+        self._window_started = time.monotonic()
+        atexit.register(self.close)
+
+    def _new_sketches(self) -> Dict[str, FeatureSketch]:
+        return {
+            column: FeatureSketch.from_summary(summary)
+            for column, summary in self.reference_profile.columns.items()
+        }
+
+    def observe(self, dataframe: DataFrame) -> None:
+        try:
+            with self._lock:
+                if len(dataframe) <= SMALL_BATCH_ROWS:
+                    # One object array beats a pandas column lookup per feature for tiny batches
+                    rows = dataframe.to_numpy(dtype=object)
+                    columns = {column: rows[:, position] for position, column in enumerate(dataframe.columns)}
+                else:
+                    columns = dataframe
+                for column, sketch in self._sketches.items():
+                    if column in columns:
+                        sketch.update(columns[column])
+                self._window_rows += len(dataframe)
+
+                if (
+                    self._window_rows >= self.flush_every_rows
+                    or time.monotonic() - self._window_started >= self.flush_interval_seconds
+                ):
+                    self._flush_locked()
+        except Exception as e:
+            logging.warning(f"Prediction traffic monitoring skipped a batch: {e}")
+
+    def _flush_locked(self) -> None:
+        if not self._window_rows:
+            return
+        sketches, n_rows = self._sketches, self._window_rows
+        self._sketches = self._new_sketches()
+        self._window_rows = 0
+        self._window_started = time.monotonic()
+        self._writer.submit(self._write_window, sketches, n_rows)
+
+    def _write_window(self, sketches: Dict[str, FeatureSketch], n_rows: int) -> None:
+        try:
+            os.makedirs(self.window_dir, exist_ok=True)
+            file_name = f"{SKETCH_FILE_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+            file_path = os.path.join(self.window_dir, file_name)
+            with open(file_path, "w") as file_obj:
+                json.dump(
+                    {
+                        "n_rows": n_rows,
+                        "profile": self.reference_profile.fingerprint,
+                        "flushed_at": datetime.now().isoformat(timespec="seconds"),
+                        "features": {column: sketch.to_dict() for column, sketch in sketches.items()},
+                    },
+                    file_obj,
+                )
+            logging.info(f"Flushed prediction traffic sketches for {n_rows} rows to {file_path}")
+        except Exception as e:
+            logging.warning(f"Could not write prediction traffic sketches: {e}")
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            if self._window_rows:
+                self._write_window(self._sketches, self._window_rows)
+                self._sketches = self._new_sketches()
+                self._window_rows = 0
+
+    @staticmethod
+    def load_sketches(output_dir: str, profile_fingerprint: Optional[str] = None) -> Dict[str, FeatureSketch]:
+        """
+        Merge every flushed window in output_dir into one sketch per feature; with a
+        profile_fingerprint, windows counted against another reference profile are skipped.
+        """
+        try:
+            merged: Dict[str, FeatureSketch] = {}
+            for file_path in sorted(glob.glob(os.path.join(output_dir, f"{SKETCH_FILE_PREFIX}*.json"))):
+                with open(file_path) as file_obj:
+                    window = json.load(file_obj)
+                if profile_fingerprint is not None and window.get("profile") != profile_fingerprint:
+                    logging.warning(f"Skipped {file_path}: counted against another reference profile")
+                    continue
+                for column, content in window["features"].items():
+                    sketch = FeatureSketch.from_dict(content)
+                    if column in merged:
+                        merged[column].merge(sketch)
+                    else:
+                        merged[column] = sketch
+            return merged
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def drift_report(self, include_flushed: bool = True) -> dict:
+        """Compare the live window, plus the flushed windows when asked, with the reference profile."""
+        try:
+            with self._lock:
+                sketches = {column: FeatureSketch.from_dict(sketch.to_dict()) for column, sketch in self._sketches.items()}
+
+            if include_flushed:
+                for column, sketch in self.load_sketches(self.window_dir, self.reference_profile.fingerprint).items():
+                    if column in sketches:
+                        sketches[column].merge(sketch)
+
+            column_results = {
+                column: self.drift_engine.compare_counts(
+                    self.reference_profile.columns[column], sketch.current_counts, sketch.null_rate
+                )
+                for column, sketch in sketches.items()
+                if sketch.n_rows
+            }
+            return self.drift_engine.build_report(column_results)
+        except Exception as e:
+            raise CustomerException(e, sys) from e
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -14,6 +15,7 @@ class DataValidationArtifact:
     invalid_train_file_path:str 
     invalid_test_file_path:str
     drift_report_file_path:str
+    reference_profile_file_path:Optional[str] = None
 
 
 
@@ -35,6 +37,7 @@ class ClassificationMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_file_path:str 
     metric_artifact:ClassificationMetricArtifact
+    reference_profile_file_path:Optional[str] = None
 
 @dataclass
 class ModelEvaluationArtifact:
@@ -49,6 +52,8 @@ class ModelEvaluationArtifact:
 class ModelPusherArtifact:
     bucket_name:str
     s3_model_path:str 
+    b2_reference_profile_path:Optional[str] = None
+    model_version:Optional[str] = None
 
 
     
@@ -18,6 +18,8 @@ class TrainingPipelineConfig:
     pipeline_name: str = PIPELINE_NAME
     artifact_dir: str = os.path.join(PIPELINE_NAME,ARTIFACT_DIR, TIMESTAMP)
     timestamp: str = TIMESTAMP
+    pipeline_report_file_path: str = os.path.join(artifact_dir, PIPELINE_REPORT_FILE_NAME)
+    max_workers: int = PIPELINE_MAX_WORKERS
 
 
 training_pipeline_config: TrainingPipelineConfig = TrainingPipelineConfig()
@@ -27,12 +29,15 @@ training_pipeline_config: TrainingPipelineConfig = TrainingPipelineConfig()
 class DataIngestionConfig:
     data_ingestion_dir: str = os.path.join(training_pipeline_config.artifact_dir, DATA_INGESTION_DIR_NAME)
     feature_store_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_FEATURE_STORE_DIR, FILE_NAME)
+    feature_store_root: str = DATA_INGESTION_FEATURE_STORE_ROOT
     
     ingested_data_dir: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR)
     training_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TRAIN_FILE_NAME)
     testing_file_path: str = os.path.join(data_ingestion_dir, DATA_INGESTION_INGESTED_DIR, TEST_FILE_NAME)
     train_test_split_ratio: float = DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
+    split_key_column: str = DATA_INGESTION_SPLIT_KEY_COLUMN
     collection_name:str = DATA_INGESTION_COLLECTION_NAME
+    feature_pushdown: bool = DATA_INGESTION_FEATURE_PUSHDOWN
 
 
 @dataclass
@@ -46,6 +51,16 @@ class DataValidationConfig:
     invalid_test_file_path: str = os.path.join(invalid_data_dir, TEST_FILE_NAME)
     drift_report_file_path: str = os.path.join(data_validation_dir, DATA_VALIDATION_DRIFT_REPORT_DIR,
                                                DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
+    drift_html_report_file_path: str = os.path.join(data_validation_dir, DATA_VALIDATION_DRIFT_REPORT_DIR,
+                                                    DATA_VALIDATION_DRIFT_HTML_REPORT_FILE_NAME)
+    reference_profile_file_path: str = os.path.join(data_validation_dir, DATA_VALIDATION_REFERENCE_PROFILE_DIR,
+                                                    REFERENCE_PROFILE_FILE_NAME)
+    drift_engine: str = DATA_VALIDATION_DRIFT_ENGINE
+    drift_n_bins: int = DATA_VALIDATION_DRIFT_N_BINS
+    drift_p_value_threshold: float = DATA_VALIDATION_DRIFT_P_VALUE_THRESHOLD
+    drift_share: float = DATA_VALIDATION_DRIFT_SHARE
+    drift_sample_size: int = DATA_VALIDATION_DRIFT_SAMPLE_SIZE
+    drift_n_jobs: int = DATA_VALIDATION_DRIFT_N_JOBS
 
 
 @dataclass
@@ -58,14 +73,19 @@ class DataTransformationConfig:
     transformed_object_file_path: str = os.path.join(data_transformation_dir,
                                                      DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
                                                      PREPROCSSING_OBJECT_FILE_NAME)
+    keep_float64: bool = DATA_TRANSFORMATION_KEEP_FLOAT64
 
 
 @dataclass
 class ModelTrainerConfig:
     model_trainer_dir: str = os.path.join(training_pipeline_config.artifact_dir, MODEL_TRAINER_DIR_NAME)
     trained_model_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR, MODEL_FILE_NAME)
+    reference_profile_file_path: str = os.path.join(model_trainer_dir, MODEL_TRAINER_TRAINED_MODEL_DIR,
+                                                    REFERENCE_PROFILE_FILE_NAME)
     expected_accuracy: float = MODEL_TRAINER_EXPECTED_SCORE
     model_config_file_path: str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    search_score_cache_dir: str = MODEL_TRAINER_SEARCH_SCORE_CACHE_DIR
+    search_score_cache_max_scores: int = MODEL_TRAINER_SEARCH_SCORE_CACHE_MAX_SCORES
 
 
 
@@ -74,12 +94,15 @@ class ModelEvaluationConfig:
     changed_threshold_score: float = MODEL_EVALUATION_CHANGED_THRESHOLD_SCORE
     bucket_name: str = MODEL_PUSHER_BUCKET_NAME
     b2_model_key_path: str = MODEL_FILE_NAME
+    prediction_cache_dir: str = MODEL_EVALUATION_PREDICTION_CACHE_DIR
 
 
 @dataclass
 class ModelPusherConfig:
     bucket_name: str = MODEL_PUSHER_BUCKET_NAME
     b2_model_key_path: str = MODEL_FILE_NAME
+    min_part_size: int = MODEL_PUSHER_MIN_PART_SIZE
+    upload_retries: int = MODEL_PUSHER_UPLOAD_RETRIES
 
 
 
@@ -92,6 +115,11 @@ class PredictionPipelineConfig:
     model_file_name: str = MODEL_FILE_NAME
     model_bucket_name: str = prediction_pipeline.MODEL_BUCKET_NAME
     output_file_name: str = prediction_pipeline.PREDICTION_OUTPUT_FILE_NAME
+    reference_profile_file_name: str = prediction_pipeline.REFERENCE_PROFILE_FILE_NAME
+    monitoring_enabled: bool = prediction_pipeline.PREDICTION_MONITORING_ENABLED
+    monitoring_dir: str = prediction_pipeline.PREDICTION_MONITORING_DIR
+    monitoring_flush_interval_seconds: float = prediction_pipeline.PREDICTION_MONITORING_FLUSH_INTERVAL_SECONDS
+    monitoring_flush_every_rows: int = prediction_pipeline.PREDICTION_MONITORING_FLUSH_EVERY_ROWS
 
 
 
@@ -1,9 +1,19 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
 
 from from_root import from_root
 
-from src.constant.training_pipeline import ARTIFACT_DIR, LOG_DIR, LOG_FILE, PIPELINE_NAME
+from src.constant.env_variable import LOG_BACKUP_COUNT, LOG_LEVEL, LOG_LEVELS, LOG_MAX_BYTES, LOG_SAMPLING
+from src.constant.training_pipeline import (ARTIFACT_DIR, DEFAULT_LOG_BACKUP_COUNT, DEFAULT_LOG_LEVEL,
+                                            DEFAULT_LOG_LEVELS, DEFAULT_LOG_MAX_BYTES, DEFAULT_LOG_SAMPLING, LOG_DIR,
+                                            LOG_FILE, PIPELINE_NAME)
+from src.logger.handlers import CompressingRotatingFileHandler, SamplingFilter
+
+LOG_FORMAT = "[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s"
 
 logs_path = os.path.join(from_root(), PIPELINE_NAME, ARTIFACT_DIR, LOG_DIR)
 
@@ -11,8 +21,85 @@ os.makedirs(logs_path, exist_ok=True)
 
 LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s",
-    level=logging.DEBUG,
-)
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """"name=value,name=value" as a dict, ignoring blank entries."""
+    mapping = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, item_value = item.split("=", 1)
+            mapping[name.strip()] = item_value.strip()
+    return mapping
+
+
+def _switch_to_direct_file_handler() -> None:
+    """
+    Worker processes (the model search pool) have no listener thread of their own to rely on, so
+    they write straight to the log file instead. They never rotate it; that stays with the parent.
+    """
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, QueueHandler):
+            root_logger.removeHandler(handler)
+            file_handler = logging.FileHandler(LOG_FILE_PATH, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            for log_filter in handler.filters:
+                file_handler.addFilter(log_filter)
+            root_logger.addHandler(file_handler)
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    """Flush the queued records at exit; a no-op when the listener was already stopped."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def configure_logging() -> QueueListener:
+    """
+    Log records are put on an in-memory queue by the calling thread and written to a size-rotated,
+    gzip-compressed log file by a background listener, so request threads never wait on disk.
+    Levels of noisy third-party loggers and sampling rates of hot-path call sites come from
+    DEFAULT_LOG_LEVELS / DEFAULT_LOG_SAMPLING, overridable with the LOG_LEVELS / LOG_SAMPLING
+    environment variables.
+    """
+    file_handler = CompressingRotatingFileHandler(
+        LOG_FILE_PATH,
+        max_bytes=int(os.getenv(LOG_MAX_BYTES, DEFAULT_LOG_MAX_BYTES)),
+        backup_count=int(os.getenv(LOG_BACKUP_COUNT, DEFAULT_LOG_BACKUP_COUNT)),
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    sample_rates = dict(DEFAULT_LOG_SAMPLING)
+    sample_rates.update({key: int(rate) for key, rate in _parse_mapping(os.getenv(LOG_SAMPLING, "")).items()})
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(os.getenv(LOG_LEVEL, DEFAULT_LOG_LEVEL).upper())
+
+    logger_levels = dict(DEFAULT_LOG_LEVELS)
+    logger_levels.update(_parse_mapping(os.getenv(LOG_LEVELS, "")))
+    for logger_name, level in logger_levels.items():
+        logging.getLogger(logger_name).setLevel(level.upper())
+
+    listener = QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_switch_to_direct_file_handler)
+    return listener
+
+
+log_listener = configure_logging()
+
+
+def configure_worker_logging() -> None:
+    """
+    Initializer of spawned worker processes: they import this module afresh and so start their own
+    listener, which is stopped in favour of writing straight to the log file.
+    """
+    _stop_listener(log_listener)
+    _switch_to_direct_file_handler()
@@ -0,0 +1,51 @@
+import gzip
+import logging
+import os
+import shutil
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from typing import Dict
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that gzips every rotated file: <log>.1.gz, <log>.2.gz, ..."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, encoding: str = "utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._compress
+
+    @staticmethod
+    def _compress(source: str, dest: str) -> None:
+        with open(source, "rb") as source_file, gzip.open(dest, "wb") as dest_file:
+            shutil.copyfileobj(source_file, dest_file)
+        os.remove(source)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps 1 in N records below WARNING for hot-path call sites.
+
+    Rates are keyed by "<module>.<function>" or "<module>" (e.g. "model_trainer.predict") and
+    counted per log statement, so every line of a sampled method keeps the same rate and a
+    "Entered ..." line is not kept while its "Exited ..." line is dropped by chance. Warnings
+    and errors always pass.
+    """
+
+    def __init__(self, sample_rates: Dict[str, int]):
+        super().__init__()
+        self.sample_rates = {key: rate for key, rate in sample_rates.items() if rate > 1}
+        self._counts: Dict[tuple, int] = defaultdict(int)
+        self._lock = Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.sample_rates:
+            return True
+        rate = self.sample_rates.get(f"{record.module}.{record.funcName}") or self.sample_rates.get(record.module)
+        if rate is None:
+            return True
+        with self._lock:
+            count = self._counts[(record.pathname, record.lineno)]
+            self._counts[(record.pathname, record.lineno)] = count + 1
+        return count % rate == 0
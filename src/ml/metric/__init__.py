@@ -1,28 +1,48 @@
-from sklearn.metrics import (confusion_matrix, f1_score, precision_score,
-                             recall_score)
+from typing import Optional
 
 from src.entity.artifact_entity import ClassificationMetricArtifact
+from src.ml.metric.confusion import ConfusionMatrixAccumulator
 
 
-def calculate_metric(model, x, y) -> ClassificationMetricArtifact:
+def calculate_metric(model, x, y, chunk_size: Optional[int] = None) -> ClassificationMetricArtifact:
     """
     model: estimator
     x: input feature
     y: output feature
+    chunk_size: when set, x is predicted and scored chunk by chunk
     """
-    yhat = model.predict(x)
+    if not chunk_size:
+        return calculate_metric_from_predictions(y, model.predict(x))
+
+    accumulator = ConfusionMatrixAccumulator()
+    y = y.to_numpy() if hasattr(y, "to_numpy") else y
+    for start in range(0, len(x), chunk_size):
+        x_chunk = x.iloc[start:start + chunk_size] if hasattr(x, "iloc") else x[start:start + chunk_size]
+        accumulator.update(y[start:start + chunk_size], model.predict(x_chunk))
+    return metric_artifact_from_accumulator(accumulator)
+
+
+def calculate_metric_from_predictions(y, yhat) -> ClassificationMetricArtifact:
+    """
+    y: true labels
+    yhat: predicted labels
+    """
+    return metric_artifact_from_accumulator(ConfusionMatrixAccumulator().update(y, yhat))
+
+
+def metric_artifact_from_accumulator(accumulator: ConfusionMatrixAccumulator) -> ClassificationMetricArtifact:
     classification_metric = ClassificationMetricArtifact(
-        f1_score=f1_score(y, yhat, average='weighted'),
-        recall_score=recall_score(y, yhat, average='weighted'),
-        precision_score=precision_score(y, yhat, average='weighted'),
+        f1_score=accumulator.f1(average='weighted'),
+        recall_score=accumulator.recall(average='weighted'),
+        precision_score=accumulator.precision(average='weighted'),
     )
     return classification_metric
 
 
-def total_cost(y_true, y_pred):
+def total_cost(y_true, y_pred, cost_matrix=None, labels=None):
     """
-    This function takes y_ture, y_predicted, and prints Total cost due to misclassification
+    This function takes y_ture, y_predicted, and returns Total cost due to misclassification.
+    Without a cost_matrix a binary problem keeps the 10 per false positive / 500 per false negative
+    costs and every other misclassification costs 1.
     """
-    tn, fp, fn, tp = confusion_matrix(y_true, y_pred).ravel()
-    cost = 10 * fp + 500 * fn
-    return cost
+    return ConfusionMatrixAccumulator().update(y_true, y_pred).total_cost(cost_matrix=cost_matrix, labels=labels)
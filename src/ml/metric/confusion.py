@@ -0,0 +1,122 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+BINARY_FALSE_POSITIVE_COST = 10
+BINARY_FALSE_NEGATIVE_COST = 500
+
+
+class ConfusionMatrixAccumulator:
+    """
+    Multiclass confusion matrix built from (y_true, y_pred) chunks.
+
+    Each update maps the chunk's labels to matrix positions with one np.unique and adds a
+    single bincount, so the labels are scanned once whatever the number of metrics derived
+    later. Labels not seen before grow the matrix, and accumulators filled in different
+    processes merge by adding their matrices, which makes sharded evaluation exact.
+    """
+
+    def __init__(self, labels: Optional[Sequence] = None):
+        self.labels = np.asarray(sorted(labels) if labels is not None else [])
+        self.matrix = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+
+    @property
+    def n_samples(self) -> int:
+        return int(self.matrix.sum())
+
+    def _add_labels(self, labels: np.ndarray) -> None:
+        all_labels = np.union1d(self.labels, labels) if len(self.labels) else np.unique(labels)
+        if len(all_labels) == len(self.labels):
+            return
+        positions = np.searchsorted(all_labels, self.labels)
+        matrix = np.zeros((len(all_labels), len(all_labels)), dtype=np.int64)
+        matrix[np.ix_(positions, positions)] = self.matrix
+        self.labels, self.matrix = all_labels, matrix
+
+    def update(self, y_true, y_pred) -> "ConfusionMatrixAccumulator":
+        y_true, y_pred = np.ravel(y_true), np.ravel(y_pred)
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"y_true and y_pred have different lengths: {len(y_true)} != {len(y_pred)}")
+        if not len(y_true):
+            return self
+
+        chunk_labels, inverse = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        self._add_labels(chunk_labels)
+        positions = np.searchsorted(self.labels, chunk_labels)[inverse]
+
+        n_labels = len(self.labels)
+        true_positions, pred_positions = positions[:len(y_true)], positions[len(y_true):]
+        self.matrix += np.bincount(
+            true_positions * n_labels + pred_positions, minlength=n_labels * n_labels
+        ).reshape(n_labels, n_labels)
+        return self
+
+    def merge(self, other: "ConfusionMatrixAccumulator") -> "ConfusionMatrixAccumulator":
+        self._add_labels(other.labels)
+        positions = np.searchsorted(self.labels, other.labels)
+        self.matrix[np.ix_(positions, positions)] += other.matrix
+        return self
+
+    def _per_class(self):
+        true_positives = np.diag(self.matrix).astype(np.float64)
+        support = self.matrix.sum(axis=1).astype(np.float64)
+        predicted = self.matrix.sum(axis=0).astype(np.float64)
+
+        # classes never predicted (or never present) score 0, as sklearn's zero_division default does
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            denominator = precision + recall
+            f1 = np.where(denominator > 0, 2 * precision * recall / denominator, 0.0)
+        return precision, recall, f1, support
+
+    def _average(self, values: np.ndarray, support: np.ndarray, average: str) -> float:
+        if not len(values):
+            return 0.0
+        if average == "macro":
+            return float(values.mean())
+        if average == "weighted":
+            return float(np.average(values, weights=support)) if support.sum() else 0.0
+        raise ValueError(f"Unsupported average '{average}', use 'weighted' or 'macro'")
+
+    def precision(self, average: str = "weighted") -> float:
+        precision, _, _, support = self._per_class()
+        return self._average(precision, support, average)
+
+    def recall(self, average: str = "weighted") -> float:
+        _, recall, _, support = self._per_class()
+        return self._average(recall, support, average)
+
+    def f1(self, average: str = "weighted") -> float:
+        _, _, f1, support = self._per_class()
+        return self._average(f1, support, average)
+
+    def accuracy(self) -> float:
+        return float(np.trace(self.matrix) / self.n_samples) if self.n_samples else 0.0
+
+    def default_cost_matrix(self) -> np.ndarray:
+        """The historical 10 per false positive / 500 per false negative for two classes, else 1 per error."""
+        n_labels = len(self.labels)
+        if n_labels == 2:
+            return np.array([[0, BINARY_FALSE_POSITIVE_COST], [BINARY_FALSE_NEGATIVE_COST, 0]])
+        return np.ones((n_labels, n_labels)) - np.eye(n_labels)
+
+    def total_cost(self, cost_matrix=None, labels: Optional[Sequence] = None) -> float:
+        """
+        Misclassification cost, cost_matrix[i][j] being the cost of predicting labels[j] for labels[i].
+
+        labels defaults to the sorted labels seen so far; classes missing from the matrix cost nothing.
+        """
+        if cost_matrix is None:
+            return float(np.sum(self.matrix * self.default_cost_matrix()))
+
+        cost_matrix = np.asarray(cost_matrix, dtype=np.float64)
+        labels = self.labels if labels is None else np.asarray(labels)
+        if cost_matrix.shape != (len(labels), len(labels)):
+            raise ValueError(f"Cost matrix of shape {cost_matrix.shape} does not match {len(labels)} labels")
+
+        accumulator = ConfusionMatrixAccumulator(labels=labels).merge(self)
+        if len(accumulator.labels) != len(labels):
+            raise ValueError(f"Cost matrix labels {list(labels)} do not cover labels {list(self.labels)}")
+        order = np.searchsorted(accumulator.labels, labels)
+        return float(np.sum(accumulator.matrix[np.ix_(order, order)] * cost_matrix))
@@ -1,35 +1,117 @@
+import os
+import pickle
 import sys
+from typing import Optional
 from pandas import DataFrame
-from src.cloud_storage.b2_storage import B2Storage
+from src.drift.profile import ReferenceProfile
 from src.exception import CustomerException
 from src.ml.model.estimator import CustomerSegmentationModel
+from src.ml.model.model_registry import ModelRegistry
+from src.storage.backend import StorageBackend, get_storage_backend
 
 
 class B2ModelEstimator:
-    def __init__(self, bucket_name: str, model_path: str):
+    """
+    Production model published in a bucket. B2 by default; any StorageBackend can be passed
+    instead, e.g. the local or emulated backends for offline runs.
+
+    The champion comes from the model registry manifest, read once per estimator; buckets
+    without a manifest fall back to the single model object at model_path.
+    """
+
+    def __init__(self, bucket_name: str, model_path: str, storage_backend: Optional[StorageBackend] = None):
         self.bucket_name = bucket_name
-        self.b2 = B2Storage()
+        self.storage = storage_backend or get_storage_backend(bucket_name)
+        self.registry = ModelRegistry(self.storage)
         self.model_path = model_path
         self.loaded_model: CustomerSegmentationModel = None
+        self._champion: Optional[dict] = None
+        self._champion_loaded = False
+
+    def get_champion(self) -> Optional[dict]:
+        if not self._champion_loaded:
+            self._champion = self.registry.get_champion()
+            self._champion_loaded = True
+        return self._champion
 
     def is_model_present(self, model_path: str) -> bool:
         try:
-            return self.b2.file_exists(bucket_name=self.bucket_name, file_name=model_path)
+            return self.get_champion() is not None or self.storage.exists(model_path)
         except Exception as e:
             print(e)
             return False
 
+    def get_model_version(self) -> Optional[str]:
+        """Registry version of the champion, else the content hash of the model object; None without a model."""
+        try:
+            champion = self.get_champion()
+            if champion is not None:
+                return champion["version"]
+            file_info = self.storage.metadata(self.model_path)
+            if file_info is None:
+                return None
+            return file_info["content_sha1"] or file_info["file_id"]
+        except Exception as e:
+            raise CustomerException(e, sys)
+
     def load_model(self) -> CustomerSegmentationModel:
-        return self.b2.load_model(bucket_name=self.bucket_name, model_path=self.model_path)
+        try:
+            champion = self.get_champion()
+            if champion is not None:
+                return self.registry.load_version(champion["version"])
+            return pickle.loads(self.storage.get(self.model_path))
+        except Exception as e:
+            raise CustomerException(e, sys)
 
-    def save_model(self, from_file: str, remove: bool = False) -> None:
+    def publish(self, from_file: str, metrics: Optional[dict] = None, schema_hash: Optional[str] = None,
+                reference_profile_file: Optional[str] = None, **upload_options) -> str:
+        """Register the model file as a version and make it the champion; returns the version."""
         try:
-            self.b2.upload_file(
-                bucket_name=self.bucket_name,
-                local_path=from_file,
-                file_name=self.model_path,
-                remove=remove
+            version = self.registry.register(
+                from_file,
+                metrics=metrics,
+                schema_hash=schema_hash,
+                reference_profile_file_path=reference_profile_file,
+                **upload_options,
             )
+            self.registry.promote(version)
+            self._champion_loaded = False
+            return version
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def save_model(self, from_file: str, remove: bool = False, skip_if_unchanged: bool = False,
+                   min_part_size: Optional[int] = None, retries: Optional[int] = None) -> bool:
+        try:
+            uploaded = self.storage.put_file(
+                from_file,
+                self.model_path,
+                skip_if_unchanged=skip_if_unchanged,
+                min_part_size=min_part_size,
+                retries=retries,
+            )
+            if remove:
+                os.remove(from_file)
+            return uploaded
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def save_reference_profile(self, from_file: str, profile_path: str, skip_if_unchanged: bool = False,
+                               retries: Optional[int] = None) -> bool:
+        try:
+            return self.storage.put_file(from_file, profile_path, skip_if_unchanged=skip_if_unchanged, retries=retries)
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def load_reference_profile(self, profile_path: str, to_file: str) -> Optional[ReferenceProfile]:
+        try:
+            champion = self.get_champion()
+            if champion is not None and champion.get("reference_profile_key"):
+                profile_path = champion["reference_profile_key"]
+            if not self.storage.exists(profile_path):
+                return None
+            self.storage.get_file(profile_path, to_file)
+            return ReferenceProfile.load(to_file)
         except Exception as e:
             raise CustomerException(e, sys)
 
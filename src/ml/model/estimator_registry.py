@@ -0,0 +1,103 @@
+import importlib
+import sys
+from importlib.metadata import entry_points
+from threading import Lock
+from typing import Dict, Union
+
+from src.exception import CustomerException
+from src.logger import logging
+
+ESTIMATOR_ENTRY_POINT_GROUP = "smart_customer_segmentation.estimators"
+
+BUILTIN_ESTIMATORS: Dict[str, str] = {
+    "LogisticRegression": "sklearn.linear_model:LogisticRegression",
+    "SGDClassifier": "sklearn.linear_model:SGDClassifier",
+    "RidgeClassifier": "sklearn.linear_model:RidgeClassifier",
+    "DecisionTreeClassifier": "sklearn.tree:DecisionTreeClassifier",
+    "RandomForestClassifier": "sklearn.ensemble:RandomForestClassifier",
+    "ExtraTreesClassifier": "sklearn.ensemble:ExtraTreesClassifier",
+    "GradientBoostingClassifier": "sklearn.ensemble:GradientBoostingClassifier",
+    "HistGradientBoostingClassifier": "sklearn.ensemble:HistGradientBoostingClassifier",
+    "AdaBoostClassifier": "sklearn.ensemble:AdaBoostClassifier",
+    "KNeighborsClassifier": "sklearn.neighbors:KNeighborsClassifier",
+    "SVC": "sklearn.svm:SVC",
+    "GaussianNB": "sklearn.naive_bayes:GaussianNB",
+    "XGBClassifier": "xgboost:XGBClassifier",
+    "CatBoostClassifier": "catboost:CatBoostClassifier",
+}
+
+
+class EstimatorRegistry:
+    """
+    Resolves estimator classes by name with a direct import of their module.
+
+    Names come from three places: the module/class pairs in model.yaml, the built-in table
+    above, and packages that advertise estimators under the ESTIMATOR_ENTRY_POINT_GROUP entry
+    point group. Entry points are only listed once and are not imported until they are
+    resolved; resolved classes are cached for the lifetime of the process.
+    """
+
+    _targets: Dict[str, Union[str, type]] = dict(BUILTIN_ESTIMATORS)
+    _classes: Dict[str, type] = {}
+    _entry_points_loaded: bool = False
+    _lock = Lock()
+
+    @classmethod
+    def register(cls, name: str, target: Union[str, type]) -> None:
+        """Register an estimator class, or a lazy "module:Class" reference to one, under name."""
+        with cls._lock:
+            cls._targets[name] = target
+            cls._classes.pop(name, None)
+
+    @classmethod
+    def _load_entry_points(cls) -> None:
+        if cls._entry_points_loaded:
+            return
+        with cls._lock:
+            if cls._entry_points_loaded:
+                return
+            for entry_point in entry_points(group=ESTIMATOR_ENTRY_POINT_GROUP):
+                cls._targets.setdefault(entry_point.name, entry_point.value)
+            cls._entry_points_loaded = True
+
+    @staticmethod
+    def _import_target(target: Union[str, type]) -> type:
+        if isinstance(target, type):
+            return target
+        module_name, _, attribute = target.partition(":")
+        obj = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+        return obj
+
+    @classmethod
+    def resolve(cls, class_name: str, module_name: str = None) -> type:
+        try:
+            key = f"{module_name}:{class_name}" if module_name else class_name
+            estimator_class = cls._classes.get(key)
+            if estimator_class is not None:
+                return estimator_class
+
+            if module_name:
+                target = key
+            else:
+                cls._load_entry_points()
+                target = cls._targets.get(class_name)
+                if target is None:
+                    raise Exception(
+                        f"Estimator '{class_name}' is not registered; add its module to model.yaml "
+                        f"or register it under the '{ESTIMATOR_ENTRY_POINT_GROUP}' entry point group"
+                    )
+
+            estimator_class = cls._import_target(target)
+            cls._classes[key] = estimator_class
+            logging.debug(f"Resolved estimator {key} to {estimator_class}")
+
+            return estimator_class
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    @classmethod
+    def create(cls, class_name: str, module_name: str = None, **params) -> object:
+        return cls.resolve(class_name, module_name)(**params)
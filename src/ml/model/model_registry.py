@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional
+
+from src.constant.training_pipeline import (MODEL_FILE_NAME, MODEL_REGISTRY_CACHE_DIR, MODEL_REGISTRY_MANIFEST_KEY,
+                                            MODEL_REGISTRY_VERSIONS_PREFIX, REFERENCE_PROFILE_FILE_NAME)
+from src.exception import CustomerException
+from src.logger import logging
+from src.storage.backend import StorageBackend
+from src.utils.main_utils import compute_file_sha1
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+class ModelRegistry:
+    """
+    Immutable, content-addressed model versions plus one small manifest naming the champion.
+
+    A version is the sha1 of its model file and is stored once under
+    <versions_prefix>/<version>/, next to its reference profile. The manifest records every
+    version's metrics, schema hash and content hash, the current champion and the champions
+    before it. Serving reads the manifest with a single GET and loads the champion from the
+    local version cache when it has seen that version before; promotion and rollback only
+    rewrite the manifest.
+    """
+
+    # Models already unpickled in this process, by version
+    _loaded_models: Dict[str, object] = {}
+    _loaded_models_lock = Lock()
+
+    def __init__(self, storage_backend: StorageBackend, manifest_key: str = MODEL_REGISTRY_MANIFEST_KEY,
+                 versions_prefix: str = MODEL_REGISTRY_VERSIONS_PREFIX, cache_dir: str = MODEL_REGISTRY_CACHE_DIR):
+        self.storage = storage_backend
+        self.manifest_key = manifest_key
+        self.versions_prefix = versions_prefix.rstrip("/")
+        self.cache_dir = cache_dir
+
+    def model_key(self, version: str) -> str:
+        return f"{self.versions_prefix}/{version}/{MODEL_FILE_NAME}"
+
+    def reference_profile_key(self, version: str) -> str:
+        return f"{self.versions_prefix}/{version}/{REFERENCE_PROFILE_FILE_NAME}"
+
+    def get_manifest(self) -> dict:
+        try:
+            try:
+                return json.loads(self.storage.get(self.manifest_key))
+            except Exception:
+                # a missing manifest is an empty registry, any other failure is an error
+                if self.storage.exists(self.manifest_key):
+                    raise
+            return {"format_version": MANIFEST_FORMAT_VERSION, "champion": None, "history": [], "versions": {}}
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def _write_manifest(self, manifest: dict) -> None:
+        manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self.storage.put(self.manifest_key, json.dumps(manifest, indent=2).encode())
+
+    def get_champion(self, manifest: Optional[dict] = None) -> Optional[dict]:
+        """Manifest entry of the champion, with its version, or None when nothing was promoted."""
+        manifest = manifest or self.get_manifest()
+        version = manifest.get("champion")
+        if version is None:
+            return None
+        return dict(manifest["versions"][version], version=version)
+
+    def register(self, model_file_path: str, metrics: Optional[dict] = None, schema_hash: Optional[str] = None,
+                 reference_profile_file_path: Optional[str] = None, **upload_options) -> str:
+        """Store a model version (a no-op for content already registered) and record it in the manifest."""
+        try:
+            version = compute_file_sha1(model_file_path)
+            self.storage.put_file(model_file_path, self.model_key(version), skip_if_unchanged=True, **upload_options)
+
+            reference_profile_key = None
+            if reference_profile_file_path and os.path.exists(reference_profile_file_path):
+                reference_profile_key = self.reference_profile_key(version)
+                self.storage.put_file(reference_profile_file_path, reference_profile_key, skip_if_unchanged=True)
+
+            manifest = self.get_manifest()
+            manifest["versions"].setdefault(version, {}).update({
+                "model_key": self.model_key(version),
+                "reference_profile_key": reference_profile_key,
+                "content_sha1": version,
+                "size": os.path.getsize(model_file_path),
+                "metrics": metrics or {},
+                "schema_hash": schema_hash,
+                "registered_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            self._write_manifest(manifest)
+            logging.info(f"Registered model version {version}")
+            return version
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def promote(self, version: str) -> None:
+        try:
+            manifest = self.get_manifest()
+            if version not in manifest["versions"]:
+                raise Exception(f"Model version {version} is not registered")
+            if manifest["champion"] == version:
+                logging.info(f"Model version {version} is already the champion")
+                return
+            if manifest["champion"] is not None:
+                manifest["history"].append(manifest["champion"])
+            manifest["champion"] = version
+            self._write_manifest(manifest)
+            logging.info(f"Promoted model version {version} to champion")
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def rollback(self, version: Optional[str] = None) -> str:
+        """Make the previous champion, or the given registered version, the champion again."""
+        try:
+            manifest = self.get_manifest()
+            history: List[str] = manifest["history"]
+            if version is None:
+                if not history:
+                    raise Exception("No previous champion to roll back to")
+                version = history.pop()
+            elif version not in manifest["versions"]:
+                raise Exception(f"Model version {version} is not registered")
+            else:
+                if version in history:
+                    history.remove(version)
+                if manifest["champion"] is not None:
+                    history.append(manifest["champion"])
+
+            manifest["champion"] = version
+            self._write_manifest(manifest)
+            logging.info(f"Rolled champion back to model version {version}")
+            return version
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def load_version(self, version: str) -> object:
+        """Unpickled model of a version, from memory, the local version cache or the bucket, in that order."""
+        try:
+            model = ModelRegistry._loaded_models.get(version)
+            if model is not None:
+                return model
+
+            cache_file_path = os.path.join(self.cache_dir, version, MODEL_FILE_NAME)
+            if not os.path.exists(cache_file_path) or compute_file_sha1(cache_file_path) != version:
+                self.storage.get_file(self.model_key(version), cache_file_path)
+                logging.info(f"Cached model version {version} at {cache_file_path}")
+
+            with open(cache_file_path, "rb") as file_obj:
+                model = pickle.load(file_obj)
+            with ModelRegistry._loaded_models_lock:
+                ModelRegistry._loaded_models[version] = model
+            return model
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def load_champion(self) -> Optional[object]:
+        champion = self.get_champion()
+        return None if champion is None else self.load_version(champion["version"])
+
+
+def main(argv=None):
+    from src.storage.backend import get_storage_backend
+    from src.entity.config_entity import ModelPusherConfig
+
+    parser = argparse.ArgumentParser(description="Inspect the model registry and move the champion")
+    parser.add_argument("--bucket", default=ModelPusherConfig.bucket_name)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="show the champion and every registered version")
+    promote_parser = subparsers.add_parser("promote", help="make a registered version the champion")
+    promote_parser.add_argument("version")
+    rollback_parser = subparsers.add_parser("rollback", help="restore the previous (or given) champion")
+    rollback_parser.add_argument("version", nargs="?")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(get_storage_backend(args.bucket))
+    if args.command == "list":
+        manifest = registry.get_manifest()
+        for version, entry in sorted(manifest["versions"].items(), key=lambda item: item[1]["registered_at"]):
+            marker = "*" if version == manifest["champion"] else " "
+            print(f"{marker} {version}  {entry['registered_at']}  {entry['metrics']}")
+    elif args.command == "promote":
+        registry.promote(args.version)
+        print(f"champion: {args.version}")
+    else:
+        print(f"champion: {registry.rollback(args.version)}")
+
+
+if __name__ == "__main__":
+    main()
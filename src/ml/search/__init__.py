@@ -0,0 +1,407 @@
+import math
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from src.exception import CustomerException
+from src.logger import configure_worker_logging, logging
+from src.ml.model.estimator_registry import EstimatorRegistry
+from src.ml.search.fold_cache import FoldCache, prune_scores
+
+MODEL_SELECTION_KEY = "model_selection"
+MODEL_SEARCH_KEY = "model_search"
+CLASS_KEY = "class"
+MODULE_KEY = "module"
+PARAM_KEY = "params"
+SEARCH_PARAM_GRID_KEY = "search_param_grid"
+
+SEARCH_STRATEGIES = ("halving", "random", "grid")
+# The search runs in a pipeline thread next to the log listener and other stages; forking such a
+# process can deadlock on a lock another thread holds, so workers start as fresh interpreters
+WORKER_START_METHOD = "spawn"
+
+
+@dataclass
+class ModelSearchConfig:
+    strategy: str = "halving"
+    n_candidates: int = 20
+    factor: int = 3
+    min_resources: int = 100
+    cv: int = 3
+    scoring: str = "accuracy"
+    score_upper_bound: float = 1.0
+    dominance_margin: float = 0.1
+    time_budget_seconds: float = 900.0
+    max_fits: int = 0
+    n_workers: int = 2
+    random_state: int = 42
+
+
+@dataclass
+class SearchCandidate:
+    family: str
+    module: str
+    class_name: str
+    params: dict
+    scores: Dict[int, float] = field(default_factory=dict)
+    aborted: bool = False
+
+    @property
+    def model_name(self) -> str:
+        return self.class_name
+
+
+@dataclass
+class BestModelDetail:
+    model_name: str
+    best_model: object
+    best_parameters: dict
+    best_score: float
+    n_candidates: int
+    n_fits: int
+    elapsed_seconds: float
+    budget_exhausted: bool
+
+
+def evaluate_candidate(module_name: str, class_name: str, params: dict, fold_cache: FoldCache, n_samples: int,
+                       abort_below: Optional[float], score_upper_bound: float,
+                       deadline: Optional[float] = None) -> dict:
+    """
+    Cross validate one candidate on the first n_samples rows and return the mean fold score.
+
+    Folds are scored one at a time so that a candidate which can no longer reach abort_below,
+    even if every remaining fold scored score_upper_bound, is stopped without fitting the rest.
+    Data and folds are read from the memory-mapped fold cache and memoized fold scores are
+    reused instead of refitting. No fold is fitted after deadline (a time.time() value, as it
+    is compared across processes); the candidate is then returned as timed out, unscored.
+    Runs inside the search process pool, so it only takes picklable arguments.
+    """
+    estimator = EstimatorRegistry.create(class_name, module_name, **params)
+    X, y = fold_cache.load_data()
+    scorer = check_scoring(estimator, scoring=fold_cache.scoring)
+    cv = fold_cache.cv
+
+    fold_scores, n_fits = [], 0
+    for fold, (train_idx, test_idx) in enumerate(fold_cache.load_folds(n_samples)):
+        score_key = fold_cache.score_key(module_name, class_name, params, n_samples, fold)
+        score = fold_cache.get_score(score_key)
+        if score is None:
+            if deadline is not None and time.time() >= deadline:
+                return {"score": None, "n_fits": n_fits, "n_cached": len(fold_scores) - n_fits,
+                        "aborted": False, "timed_out": True}
+            fitted = clone(estimator).fit(X[train_idx], y[train_idx])
+            score = float(scorer(fitted, X[test_idx], y[test_idx]))
+            fold_cache.put_score(score_key, score)
+            n_fits += 1
+        fold_scores.append(score)
+
+        if abort_below is not None:
+            remaining = cv - len(fold_scores)
+            best_reachable = (sum(fold_scores) + remaining * score_upper_bound) / cv
+            if remaining and best_reachable < abort_below:
+                return {"score": float(np.mean(fold_scores)), "n_fits": n_fits,
+                        "n_cached": len(fold_scores) - n_fits, "aborted": True, "timed_out": False}
+
+    return {"score": float(np.mean(fold_scores)), "n_fits": n_fits,
+            "n_cached": len(fold_scores) - n_fits, "aborted": False, "timed_out": False}
+
+
+class ModelSearch:
+    """
+    Budgeted hyperparameter search over the candidate families in model.yaml.
+
+    Every family under model_selection contributes candidates drawn from its search_param_grid
+    (exhaustively for "grid", sampled for "random" and "halving"). Candidates of all families
+    are cross validated concurrently on a process pool. With "halving" each rung evaluates the
+    survivors on factor times more rows and keeps the best 1/factor of them; candidates scoring
+    more than dominance_margin below the rung leader are dropped as dominated. The search stops
+    at the wall-clock/fit budget and returns the best candidate of the highest completed rung,
+    refitted on the full training data. Workers read the data and folds from a memory-mapped
+    FoldCache; fold scores are memoized in score_cache_dir when it is given, which keeps the
+    score_cache_max_scores most recently used ones.
+    """
+
+    def __init__(self, model_config_path: str, score_cache_dir: Optional[str] = None,
+                 score_cache_max_scores: Optional[int] = None):
+        try:
+            self.score_cache_dir = score_cache_dir
+            self.score_cache_max_scores = score_cache_max_scores
+            with open(model_config_path) as yaml_file:
+                self.config: dict = yaml.safe_load(yaml_file)
+
+            self.models_initialization_config: dict = dict(self.config[MODEL_SELECTION_KEY])
+            self.search_config = ModelSearchConfig(**(self.config.get(MODEL_SEARCH_KEY) or {}))
+
+            if self.search_config.strategy not in SEARCH_STRATEGIES:
+                raise Exception(
+                    f"Unknown search strategy '{self.search_config.strategy}', expected one of {SEARCH_STRATEGIES}"
+                )
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def get_candidates(self, families: Optional[List[str]] = None) -> List[SearchCandidate]:
+        candidates = []
+        search_config = self.search_config
+
+        for family, model_config in self.models_initialization_config.items():
+            if families is not None and family not in families:
+                continue
+
+            base_params = dict(model_config.get(PARAM_KEY) or {})
+            param_grid = dict(model_config.get(SEARCH_PARAM_GRID_KEY) or {})
+
+            if search_config.strategy == "grid" or not param_grid:
+                sampled_params = list(ParameterGrid(param_grid))
+            else:
+                n_grid_points = len(ParameterGrid(param_grid))
+                sampled_params = list(
+                    ParameterSampler(
+                        param_grid,
+                        n_iter=min(search_config.n_candidates, n_grid_points),
+                        random_state=search_config.random_state,
+                    )
+                )
+
+            for params in sampled_params:
+                candidates.append(
+                    SearchCandidate(
+                        family=family,
+                        module=model_config[MODULE_KEY],
+                        class_name=model_config[CLASS_KEY],
+                        params={**base_params, **params},
+                    )
+                )
+
+        return candidates
+
+    def get_rung_resources(self, n_samples: int, n_candidates: int) -> List[int]:
+        search_config = self.search_config
+        if search_config.strategy != "halving" or n_candidates <= 1:
+            return [n_samples]
+
+        n_rungs = 1 + int(math.floor(math.log(n_candidates, search_config.factor)))
+        min_resources = max(search_config.min_resources, search_config.cv * 2)
+        resources = [
+            min(n_samples, min_resources * search_config.factor ** rung) for rung in range(n_rungs)
+        ]
+        resources[-1] = n_samples
+        return sorted(set(resources))
+
+    def _run_rung(self, executor: ProcessPoolExecutor, candidates: List[SearchCandidate], rung: int,
+                  fold_cache: FoldCache, n_samples: int, deadline: float, fit_budget: Optional[int]) -> bool:
+        """
+        Evaluate candidates on one rung; returns False if the budget ran out mid-rung.
+
+        At most two candidates per worker are in flight, so candidates submitted later in the
+        rung are told the current leader score and abort as soon as they are dominated.
+        """
+        search_config = self.search_config
+        queue = list(candidates)
+        futures = {}
+        leader_score = None
+        max_in_flight = max(1, search_config.n_workers) * 2
+        # workers compare against the wall clock, monotonic clocks are not shared across processes
+        wall_deadline = time.time() + max(deadline - time.monotonic(), 0)
+
+        while queue or futures:
+            while queue and len(futures) < max_in_flight:
+                if fit_budget is not None and self.n_fits + (len(futures) + 1) * search_config.cv > fit_budget:
+                    queue = []
+                    break
+                candidate = queue.pop(0)
+                abort_below = None if leader_score is None else leader_score - search_config.dominance_margin
+                futures[executor.submit(
+                    evaluate_candidate,
+                    candidate.module,
+                    candidate.class_name,
+                    candidate.params,
+                    fold_cache,
+                    n_samples,
+                    abort_below,
+                    search_config.score_upper_bound,
+                    wall_deadline,
+                )] = candidate
+
+            if not futures:
+                break
+
+            done, _ = wait(list(futures), timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                return False
+
+            for future in done:
+                candidate = futures.pop(future)
+                result = future.result()
+                self.n_fits += result["n_fits"]
+                self.n_cached_scores += result["n_cached"]
+                if result["timed_out"]:
+                    return False
+                candidate.scores[rung] = result["score"]
+                candidate.aborted = result["aborted"]
+                if not result["aborted"] and (leader_score is None or result["score"] > leader_score):
+                    leader_score = result["score"]
+
+        return all(rung in candidate.scores for candidate in candidates)
+
+    @staticmethod
+    def _shutdown(executor: ProcessPoolExecutor, terminate: bool) -> None:
+        """
+        Shut the pool down; with terminate, queued candidates are cancelled and running ones
+        are killed instead of waited for, so an exhausted budget returns right away.
+        """
+        if not terminate:
+            executor.shutdown(wait=True)
+            return
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    def _select_survivors(self, candidates: List[SearchCandidate], rung: int) -> List[SearchCandidate]:
+        scored = [c for c in candidates if rung in c.scores and not c.aborted]
+        if not scored:
+            return []
+
+        scored.sort(key=lambda c: c.scores[rung], reverse=True)
+        leader_score = scored[0].scores[rung]
+        survivors = [
+            c for c in scored if c.scores[rung] >= leader_score - self.search_config.dominance_margin
+        ]
+        n_keep = max(1, int(math.ceil(len(scored) / self.search_config.factor)))
+        return survivors[:n_keep]
+
+    def search(self, X, y, families: Optional[List[str]] = None) -> BestModelDetail:
+        logging.info("Entered the search method of ModelSearch class")
+
+        try:
+            search_config = self.search_config
+            start = time.monotonic()
+            deadline = start + search_config.time_budget_seconds
+            fit_budget = search_config.max_fits or None
+            self.n_fits = 0
+            self.n_cached_scores = 0
+
+            candidates = self.get_candidates(families=families)
+            if not candidates:
+                raise Exception("No model candidates found in model config")
+
+            X, y = np.asarray(X), np.asarray(y)
+            order = np.random.RandomState(search_config.random_state).permutation(len(X))
+            fold_cache = FoldCache.create(X[order], y[order], cv=search_config.cv,
+                                          random_state=search_config.random_state, scoring=search_config.scoring,
+                                          score_dir=self.score_cache_dir)
+            try:
+                # the shuffled copy is dropped, the refit below reads the memory-mapped one
+                X, y = fold_cache.load_data()
+                best_model_detail = self._search(fold_cache, candidates, X, y, start, deadline, fit_budget)
+            finally:
+                fold_cache.close()
+
+            if self.score_cache_dir and self.score_cache_max_scores:
+                n_pruned = prune_scores(self.score_cache_dir, self.score_cache_max_scores)
+                if n_pruned:
+                    logging.info(f"Pruned {n_pruned} least recently used fold scores from {self.score_cache_dir}")
+
+            logging.info(
+                f"Best model {best_model_detail.model_name} with score {best_model_detail.best_score} "
+                f"after {best_model_detail.n_fits} fits and {self.n_cached_scores} memoized fold scores "
+                f"in {best_model_detail.elapsed_seconds:.1f}s"
+            )
+            logging.info("Exited the search method of ModelSearch class")
+
+            return best_model_detail
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def _search(self, fold_cache: FoldCache, candidates: List[SearchCandidate], X, y, start: float,
+                deadline: float, fit_budget: Optional[int]) -> BestModelDetail:
+        search_config = self.search_config
+        resources = self.get_rung_resources(len(X), len(candidates))
+        logging.info(
+            f"Searching {len(candidates)} candidates with strategy '{search_config.strategy}' "
+            f"over rungs {resources}"
+        )
+
+        survivors = candidates
+        best_candidate, best_rung = None, -1
+        budget_exhausted = False
+        executor = ProcessPoolExecutor(max_workers=max(1, search_config.n_workers),
+                                       mp_context=multiprocessing.get_context(WORKER_START_METHOD),
+                                       initializer=configure_worker_logging)
+        terminate = True
+        try:
+            for rung, n_samples in enumerate(resources):
+                fold_cache.prepare_folds(n_samples)
+                completed = self._run_rung(executor, survivors, rung, fold_cache, n_samples, deadline, fit_budget)
+                ranked = self._select_survivors(survivors, rung)
+                if ranked:
+                    best_candidate, best_rung = ranked[0], rung
+
+                logging.info(
+                    f"Rung {rung}: {len(survivors)} candidates on {n_samples} rows, "
+                    f"{len(ranked)} kept, {self.n_fits} fits so far"
+                )
+
+                if not completed:
+                    budget_exhausted = True
+                    logging.warning("Model search budget exhausted, keeping best candidate so far")
+                    break
+
+                survivors = ranked
+            terminate = budget_exhausted
+        finally:
+            self._shutdown(executor, terminate=terminate)
+
+        if best_candidate is None:
+            raise Exception("Model search budget exhausted before any candidate was scored")
+
+        best_model = EstimatorRegistry.create(best_candidate.class_name, best_candidate.module, **best_candidate.params)
+        best_model.fit(X, y)
+
+        return BestModelDetail(
+            model_name=best_candidate.model_name,
+            best_model=best_model,
+            best_parameters=best_candidate.params,
+            best_score=best_candidate.scores[best_rung],
+            n_candidates=len(candidates),
+            n_fits=self.n_fits,
+            elapsed_seconds=time.monotonic() - start,
+            budget_exhausted=budget_exhausted,
+        )
+
+    def get_best_model(self, X, y, base_accuracy: float = 0.6) -> BestModelDetail:
+        best_model_detail = self.search(X, y)
+        if best_model_detail.best_score < base_accuracy:
+            logging.info(
+                f"Best model score {best_model_detail.best_score} is below base accuracy {base_accuracy}"
+            )
+        return best_model_detail
+
+    def get_best_params(self, model: object, X, y) -> dict:
+        try:
+            model_name = model.__class__.__name__
+            families = [
+                family
+                for family, model_config in self.models_initialization_config.items()
+                if model_config[CLASS_KEY] == model_name
+            ]
+            if not families:
+                raise Exception(f"{model_name} has no model_selection entry in model config")
+
+            return self.search(X, y, families=families).best_parameters
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
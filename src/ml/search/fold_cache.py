@@ -0,0 +1,164 @@
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+# Memory-mapped arrays opened by this process, by path; a worker opens each file once
+_OPEN_ARRAYS: Dict[str, object] = {}
+
+
+def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """sha1 of the shapes, dtypes and bytes of X and y."""
+    digest = hashlib.sha1()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.shape}:{array.dtype}".encode())
+        digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
+
+
+def package_version(module_name: str) -> Optional[str]:
+    """__version__ of the top-level package of module_name, None when it has none."""
+    return getattr(importlib.import_module(module_name.split(".")[0]), "__version__", None)
+
+
+def prune_scores(score_dir: str, max_scores: int) -> int:
+    """
+    Deletes the least recently used fold scores of score_dir beyond max_scores; returns the
+    number deleted. Reads touch a score file, so its modification time is its last use.
+    """
+    paths = [os.path.join(directory, file_name) for directory, _, file_names in os.walk(score_dir)
+             for file_name in file_names if file_name.endswith(".json")]
+    if len(paths) <= max_scores:
+        return 0
+    paths.sort(key=lambda path: os.stat(path).st_mtime)
+    for path in paths[:len(paths) - max_scores]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return len(paths) - max_scores
+
+
+def _open(path: str):
+    if path not in _OPEN_ARRAYS:
+        _OPEN_ARRAYS[path] = joblib.load(path, mmap_mode="r")
+    return _OPEN_ARRAYS[path]
+
+
+@dataclass(frozen=True)
+class FoldCache:
+    """
+    Training data and cross-validation folds of one search, dumped once to a temporary directory.
+
+    The cache is what is sent to the search workers instead of the data: a few paths, which the
+    workers open as read-only memory maps, so every worker reads the same pages of X and y
+    without copying them. The folds of every row count are computed once, by the search process,
+    and shared the same way. Fold scores are memoized in score_dir, keyed by estimator, the
+    version of its package, params, the data fingerprint and the fold, so candidates repeated
+    across grids, searches and runs on the same data are not refitted.
+    """
+
+    work_dir: str
+    fingerprint: str
+    cv: int
+    random_state: int
+    scoring: str
+    score_dir: Optional[str] = None
+
+    @property
+    def x_path(self) -> str:
+        return os.path.join(self.work_dir, "X.joblib")
+
+    @property
+    def y_path(self) -> str:
+        return os.path.join(self.work_dir, "y.joblib")
+
+    def folds_path(self, n_samples: int) -> str:
+        return os.path.join(self.work_dir, f"folds_{n_samples}.joblib")
+
+    @classmethod
+    def create(cls, X, y, cv: int, random_state: int, scoring: str,
+               score_dir: Optional[str] = None) -> "FoldCache":
+        X, y = np.asarray(X), np.asarray(y)
+        fold_cache = cls(
+            work_dir=tempfile.mkdtemp(prefix="model_search_"),
+            fingerprint=data_fingerprint(X, y),
+            cv=cv,
+            random_state=random_state,
+            scoring=scoring,
+            score_dir=score_dir or None,
+        )
+        joblib.dump(X, fold_cache.x_path)
+        joblib.dump(y, fold_cache.y_path)
+        return fold_cache
+
+    def prepare_folds(self, n_samples: int) -> None:
+        """Computes and dumps the stratified folds of the first n_samples rows."""
+        if os.path.exists(self.folds_path(n_samples)):
+            return
+        _, y = self.load_data()
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        folds = list(splitter.split(np.zeros(n_samples), y[:n_samples]))
+        # the folds of a row count in one flat array each, so they can be memory-mapped too
+        joblib.dump({
+            "train": np.concatenate([train_idx for train_idx, _ in folds]),
+            "train_sizes": np.array([len(train_idx) for train_idx, _ in folds]),
+            "test": np.concatenate([test_idx for _, test_idx in folds]),
+            "test_sizes": np.array([len(test_idx) for _, test_idx in folds]),
+        }, self.folds_path(n_samples))
+
+    def load_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return _open(self.x_path), _open(self.y_path)
+
+    def load_folds(self, n_samples: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        folds = _open(self.folds_path(n_samples))
+        train_idx = np.split(folds["train"], np.cumsum(folds["train_sizes"])[:-1])
+        test_idx = np.split(folds["test"], np.cumsum(folds["test_sizes"])[:-1])
+        return list(zip(train_idx, test_idx))
+
+    def score_key(self, module_name: str, class_name: str, params: dict, n_samples: int, fold: int) -> str:
+        key = json.dumps({
+            "estimator": f"{module_name}.{class_name}", "version": package_version(module_name),
+            "params": params, "data": self.fingerprint,
+            "n_samples": n_samples, "cv": self.cv, "random_state": self.random_state,
+            "scoring": self.scoring, "fold": fold,
+        }, sort_keys=True, default=str)
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get_score(self, key: str) -> Optional[float]:
+        if not self.score_dir:
+            return None
+        path = os.path.join(self.score_dir, key[:2], f"{key}.json")
+        try:
+            with open(path) as file_obj:
+                score = json.load(file_obj)["score"]
+            # marks the score as used, prune_scores deletes the least recently used first
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return score
+
+    def put_score(self, key: str, score: float) -> None:
+        if not self.score_dir:
+            return
+        directory = os.path.join(self.score_dir, key[:2])
+        os.makedirs(directory, exist_ok=True)
+        # written aside and renamed, so workers scoring the same fold never read a partial file
+        temp_path = os.path.join(directory, f"{key}.{os.getpid()}.tmp")
+        with open(temp_path, "w") as file_obj:
+            json.dump({"score": score}, file_obj)
+        os.replace(temp_path, os.path.join(directory, f"{key}.json"))
+
+    def close(self) -> None:
+        for path in [path for path in _OPEN_ARRAYS if path.startswith(self.work_dir)]:
+            del _OPEN_ARRAYS[path]
+        shutil.rmtree(self.work_dir, ignore_errors=True)
@@ -0,0 +1,206 @@
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from src.exception import CustomerException
+from src.logger import logging
+
+COMPLETED_STATUSES = ("done", "restored")
+
+
+@dataclass
+class Stage:
+    """
+    One unit of pipeline work. The stage's output is stored under its name; func receives the
+    outputs of the stages listed in inputs as keyword arguments of the same names. Stages with
+    checkpoint=False produce in-memory outputs that cannot be restored and always run.
+    """
+    name: str
+    func: Callable
+    inputs: List[str] = field(default_factory=list)
+    checkpoint: bool = True
+
+
+@dataclass
+class StageRun:
+    name: str
+    status: str = "pending"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class DAGScheduler:
+    """
+    Runs stages on a thread pool as soon as all of their inputs are available.
+
+    Independent stages overlap, which pays off because the stages spend their time in I/O and in
+    numpy/sklearn code that releases the GIL. The first failure stops the run: no new stage is
+    started, stages already running are allowed to finish and the error is raised. After a run,
+    report() gives each stage's timings and the critical path, the dependency chain that bounds
+    the wall time.
+
+    A run can start from outputs restored from an earlier run; those stages are not executed.
+    on_stage_done is called from the scheduling thread with each finished stage and its output.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4,
+                 on_stage_done: Optional[Callable[[Stage, object], None]] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.max_workers = max_workers
+        self.on_stage_done = on_stage_done
+        self.order = self._topological_order()
+        self.runs: Dict[str, StageRun] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _topological_order(self) -> List[str]:
+        for stage in self.stages.values():
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {unknown}")
+
+        order, state = [], {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stages form a cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.stages[name].inputs:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def descendants(self, name: str) -> Set[str]:
+        """The stage itself and every stage that depends on it, directly or not."""
+        if name not in self.stages:
+            raise ValueError(f"Unknown stage {name}, stages are {self.order}")
+        found = {name}
+        for stage_name in self.order:
+            if any(dependency in found for dependency in self.stages[stage_name].inputs):
+                found.add(stage_name)
+        return found
+
+    def _run_stage(self, stage: Stage, outputs: Dict[str, object]):
+        run = self.runs[stage.name]
+        run.status, run.started_at = "running", time.perf_counter()
+        logging.info(f"Stage {stage.name} started")
+        try:
+            return stage.func(**{name: outputs[name] for name in stage.inputs})
+        finally:
+            run.finished_at = time.perf_counter()
+
+    def run(self, restored_outputs: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+        """Run every stage not covered by restored_outputs and return all outputs by stage name."""
+        restored_outputs = {
+            name: output for name, output in (restored_outputs or {}).items()
+            if name in self.stages and self.stages[name].checkpoint
+        }
+        self.runs = {
+            name: StageRun(name=name, status="restored" if name in restored_outputs else "pending")
+            for name in self.order
+        }
+        self.started_at = time.perf_counter()
+        outputs: Dict[str, object] = dict(restored_outputs)
+        if restored_outputs:
+            logging.info(f"Restored stages {sorted(restored_outputs)}")
+        running = {}
+        failed_future = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while True:
+                if failed_future is None:
+                    for name in self.order:
+                        stage = self.stages[name]
+                        if self.runs[name].status == "pending" and all(
+                            self.runs[dependency].status in COMPLETED_STATUSES for dependency in stage.inputs
+                        ):
+                            self.runs[name].status = "scheduled"
+                            running[executor.submit(self._run_stage, stage, dict(outputs))] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    run = self.runs[name]
+                    try:
+                        outputs[name] = future.result()
+                        run.status = "done"
+                        logging.info(f"Stage {name} finished in {run.duration:.2f}s")
+                        if self.on_stage_done is not None:
+                            self.on_stage_done(self.stages[name], outputs[name])
+                    except Exception as e:
+                        run.status, run.error = "failed", str(e)
+                        logging.error(f"Stage {name} failed after {run.duration:.2f}s, stopping the pipeline: {e}")
+                        failed_future = failed_future or future
+
+        self.finished_at = time.perf_counter()
+        for run in self.runs.values():
+            if run.status == "pending":
+                run.status = "skipped"
+
+        logging.info(f"Pipeline report: {self.report()}")
+        if failed_future is not None:
+            try:
+                failed_future.result()
+            except Exception as e:
+                raise CustomerException(e, sys) from e
+        return outputs
+
+    def critical_path(self) -> List[str]:
+        """Chain of stages with the largest summed duration, the lower bound of the wall time."""
+        longest: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.order:
+            dependencies = self.stages[name].inputs
+            best = max(dependencies, key=lambda dependency: longest[dependency], default=None)
+            previous[name] = best
+            longest[name] = self.runs[name].duration + (longest[best] if best else 0.0)
+
+        if not longest:
+            return []
+        name, path = max(longest, key=longest.get), []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1]
+
+    def report(self) -> dict:
+        critical_path = self.critical_path()
+        wall_seconds = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "critical_path": critical_path,
+            "critical_path_seconds": round(sum(self.runs[name].duration for name in critical_path), 3),
+            "total_stage_seconds": round(sum(run.duration for run in self.runs.values()), 3),
+            "stages": {
+                name: {
+                    "status": run.status,
+                    "inputs": self.stages[name].inputs,
+                    "start_offset_seconds": round(run.started_at - self.started_at, 3) if run.started_at else None,
+                    "duration_seconds": round(run.duration, 3),
+                    "error": run.error,
+                }
+                for name, run in self.runs.items()
+            },
+        }
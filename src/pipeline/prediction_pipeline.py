@@ -1,9 +1,16 @@
+import os
 import sys
+import threading
+from typing import Optional
 import pandas as pd
 from pandas import DataFrame
+from src.drift.sketch import TrafficMonitor
+from src.pipeline.run_report import PredictionBatchRecorder
 from src.ml.model.b2_estimator import B2ModelEstimator
+from src.storage.backend import StorageBackend
 from src.logger import logging
 from src.entity.config_entity import Prediction_config, PredictionPipelineConfig, ModelTrainerConfig
+from src.utils.dtype_planner import DtypePlanner
 from src.utils.main_utils import MainUtils
 from src.exception import CustomerException
 
@@ -12,6 +19,9 @@ from src.exception import CustomerException
 
 
 class CustomerData:
+    # compact dtypes of the engineered layout, read from the schema files once per process
+    dtype_planner: DtypePlanner = None
+
     @staticmethod
     def _cast_value(value, target_type, column_name):
         if target_type in (int, "int", "int64", "int32"):
@@ -85,7 +95,9 @@ class CustomerData:
             constructed_row.append(self._cast_value(value, target_type, column))
 
         input_dataset = pd.DataFrame([constructed_row], columns=columns)
-        return input_dataset
+        if CustomerData.dtype_planner is None:
+            CustomerData.dtype_planner = DtypePlanner.from_schema("engineered")
+        return CustomerData.dtype_planner.apply(input_dataset)
 
     @staticmethod
     def form_input_dataframe(data):
@@ -99,10 +111,78 @@ class CustomerData:
 
 
 class PredictionPipeline:
-    def __init__(self):
+    # Shared by every pipeline instance in the process, the app builds one per request
+    traffic_monitor: TrafficMonitor = None
+    batch_recorder: PredictionBatchRecorder = None
+    _traffic_monitor_lock = threading.Lock()
+    _traffic_monitor_started = False
+    _traffic_monitor_version: Optional[str] = None
+
+    def __init__(self, storage_backend: Optional[StorageBackend] = None):
         self.utils = MainUtils()
+        self.storage_backend = storage_backend
         # Ensure environment variables (e.g., B2 credentials) are loaded when running in app contexts
         self.utils.load_dotenv_if_available()
+        self.prediction_config = PredictionPipelineConfig()
+        if PredictionPipeline.batch_recorder is None:
+            PredictionPipeline.batch_recorder = PredictionBatchRecorder(output_dir=self.prediction_config.monitoring_dir)
+        
+    def start_traffic_monitor(self, model: Optional[B2ModelEstimator] = None) -> None:
+        """
+        Loads the reference profile of the serving model in a background thread and starts the
+        traffic monitor once it is available; batches scored before that are not monitored.
+        When the served model version changes, the monitor of the previous version is flushed
+        and closed and one is built on the reference profile of the new version.
+        """
+        if not self.prediction_config.monitoring_enabled:
+            return
+
+        try:
+            model = model or self.get_trained_model()
+            model_version = model.get_model_version()
+        except Exception as e:
+            logging.warning(f"Prediction traffic monitoring skipped: {e}")
+            return
+
+        with PredictionPipeline._traffic_monitor_lock:
+            if PredictionPipeline._traffic_monitor_started and PredictionPipeline._traffic_monitor_version == model_version:
+                return
+            PredictionPipeline._traffic_monitor_started = True
+            PredictionPipeline._traffic_monitor_version = model_version
+            previous_monitor, PredictionPipeline.traffic_monitor = PredictionPipeline.traffic_monitor, None
+
+        if previous_monitor is not None:
+            logging.info(f"Served model changed to version {model_version}; restarting traffic monitoring")
+            previous_monitor.close()
+
+        def _load_reference_profile():
+            try:
+                reference_profile = model.load_reference_profile(
+                    profile_path=self.prediction_config.reference_profile_file_name,
+                    to_file=os.path.join(self.prediction_config.monitoring_dir,
+                                         self.prediction_config.reference_profile_file_name),
+                )
+                if reference_profile is None:
+                    logging.warning("No reference profile found for the serving model; traffic monitoring disabled")
+                    return
+
+                traffic_monitor = TrafficMonitor(
+                    reference_profile=reference_profile,
+                    output_dir=self.prediction_config.monitoring_dir,
+                    flush_interval_seconds=self.prediction_config.monitoring_flush_interval_seconds,
+                    flush_every_rows=self.prediction_config.monitoring_flush_every_rows,
+                )
+                with PredictionPipeline._traffic_monitor_lock:
+                    # a newer model may have been served while the profile was loading
+                    if PredictionPipeline._traffic_monitor_version != model_version:
+                        traffic_monitor.close()
+                        return
+                    PredictionPipeline.traffic_monitor = traffic_monitor
+                logging.info(f"Prediction traffic monitoring started for model version {model_version}")
+            except Exception as e:
+                logging.warning(f"Prediction traffic monitoring disabled: {e}")
+
+        threading.Thread(target=_load_reference_profile, name="traffic-monitor-init", daemon=True).start()
         
     def prepare_input_data(self, input_data: list) -> pd.DataFrame:
         try:
@@ -118,10 +198,11 @@ class PredictionPipeline:
         
     def get_trained_model(self):
         try:
-            prediction_config = PredictionPipelineConfig()
+            prediction_config = self.prediction_config
             model = B2ModelEstimator(
                 bucket_name=prediction_config.model_bucket_name,
-                model_path=prediction_config.model_file_name
+                model_path=prediction_config.model_file_name,
+                storage_backend=self.storage_backend,
             )
             return model
         except Exception as e:
@@ -129,9 +210,16 @@ class PredictionPipeline:
         
     def run_pipeline(self, input_data: list):
         try:
+            batch_started = PredictionPipeline.batch_recorder.start()
             input_dataframe = self.prepare_input_data(input_data)
             model = self.get_trained_model()
             prediction = model.predict(input_dataframe)
+            PredictionPipeline.batch_recorder.record(batch_started, n_rows=len(input_dataframe))
+
+            self.start_traffic_monitor(model)
+            if PredictionPipeline.traffic_monitor is not None:
+                PredictionPipeline.traffic_monitor.observe(input_dataframe)
+
             return prediction
         except Exception as e:
             raise CustomerException(e, sys)
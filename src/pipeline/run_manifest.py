@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import typing
+from dataclasses import asdict, fields, is_dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.entity import artifact_entity
+from src.exception import CustomerException
+from src.logger import logging
+
+RUN_MANIFEST_FILE_NAME = "run_manifest.json"
+
+
+def _dataclass_type(annotation) -> Optional[type]:
+    """The artifact dataclass behind a field annotation, unwrapping Optional[...]."""
+    candidates = typing.get_args(annotation) or (annotation,)
+    for candidate in candidates:
+        if is_dataclass(candidate):
+            return candidate
+    return None
+
+
+def _build_artifact(artifact_class: type, content: dict):
+    type_hints = typing.get_type_hints(artifact_class)
+    values = {}
+    for artifact_field in fields(artifact_class):
+        if artifact_field.name not in content:
+            continue
+        value = content[artifact_field.name]
+        nested_class = _dataclass_type(type_hints[artifact_field.name])
+        if nested_class is not None and isinstance(value, dict):
+            value = _build_artifact(nested_class, value)
+        values[artifact_field.name] = value
+    return artifact_class(**values)
+
+
+def serialize_output(output) -> dict:
+    if is_dataclass(output):
+        return {"type": type(output).__name__, "value": asdict(output)}
+    return {"type": None, "value": output}
+
+
+def deserialize_output(content: dict):
+    if content["type"] is None:
+        return content["value"]
+    return _build_artifact(getattr(artifact_entity, content["type"]), content["value"])
+
+
+class RunManifest:
+    """
+    Checkpoint file of one training run, kept at <artifact_dir>/run_manifest.json.
+
+    Each completed stage records its artifact dataclass (or plain JSON output) as soon as it
+    finishes, and the file is rewritten atomically, so a run interrupted at any point can be
+    resumed from the stages it already finished. Artifacts only hold paths inside the run's
+    artifact directory, which a resumed run reuses.
+    """
+
+    def __init__(self, run_id: str, artifact_dir: str, stages: Optional[Dict[str, dict]] = None,
+                 created_at: Optional[str] = None):
+        self.run_id = run_id
+        self.artifact_dir = artifact_dir
+        self.stages = stages or {}
+        self.created_at = created_at or datetime.now().isoformat(timespec="seconds")
+
+    @property
+    def file_path(self) -> str:
+        return os.path.join(self.artifact_dir, RUN_MANIFEST_FILE_NAME)
+
+    @classmethod
+    def load(cls, artifact_dir: str) -> "RunManifest":
+        try:
+            file_path = os.path.join(artifact_dir, RUN_MANIFEST_FILE_NAME)
+            if not os.path.exists(file_path):
+                raise Exception(f"No run manifest at {file_path}; the run cannot be resumed")
+            with open(file_path) as file_obj:
+                content = json.load(file_obj)
+            return cls(
+                run_id=content["run_id"],
+                artifact_dir=artifact_dir,
+                stages=content["stages"],
+                created_at=content.get("created_at"),
+            )
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def save(self) -> None:
+        try:
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            temp_file_path = f"{self.file_path}.tmp"
+            with open(temp_file_path, "w") as file_obj:
+                json.dump(
+                    {"run_id": self.run_id, "created_at": self.created_at, "stages": self.stages},
+                    file_obj,
+                    indent=2,
+                    default=float,
+                )
+            os.replace(temp_file_path, self.file_path)
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def record(self, stage_name: str, output) -> None:
+        self.stages[stage_name] = dict(serialize_output(output), completed_at=datetime.now().isoformat(timespec="seconds"))
+        self.save()
+        logging.info(f"Checkpointed stage {stage_name} of run {self.run_id}")
+
+    def discard(self, stage_names) -> None:
+        for stage_name in stage_names:
+            self.stages.pop(stage_name, None)
+        self.save()
+
+    def completed_outputs(self) -> Dict[str, object]:
+        try:
+            return {stage_name: deserialize_output(content) for stage_name, content in self.stages.items()}
+        except Exception as e:
+            raise CustomerException(e, sys) from e
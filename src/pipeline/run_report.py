@@ -0,0 +1,271 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.constant.training_pipeline import ARTIFACT_DIR, PIPELINE_NAME
+from src.exception import CustomerException
+from src.logger import logging
+from src.pipeline.dag import Stage
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak memory then comes from tracemalloc
+    resource = None
+    import tracemalloc
+
+RUN_REPORT_FILE_NAME = "run_report.json"
+PREDICTION_BATCHES_FILE_NAME = "prediction_batches.jsonl"
+COUNT_CHUNK_SIZE = 1024 * 1024
+DIFF_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb", "input_rows", "output_rows",
+                "bytes_read", "bytes_written", "rows_per_second")
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of the process's resident memory, or of traced Python allocations without resource."""
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process plus its finished child processes (e.g. the model search pool)."""
+    if resource is None:
+        return time.process_time()
+    own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def count_file_rows(file_path: str) -> Optional[int]:
+    """Data rows of a csv (lines minus header) or first dimension of a .npy array; None for other files."""
+    try:
+        if file_path.endswith(".npy"):
+            return int(np.load(file_path, mmap_mode="r").shape[0])
+        if file_path.endswith(".csv"):
+            n_lines = 0
+            with open(file_path, "rb") as file_obj:
+                for chunk in iter(lambda: file_obj.read(COUNT_CHUNK_SIZE), b""):
+                    n_lines += chunk.count(b"\n")
+            return max(n_lines - 1, 0)
+    except Exception as e:
+        logging.debug(f"Could not count rows of {file_path}: {e}")
+    return None
+
+
+def artifact_files(output) -> List[str]:
+    """Existing files referenced by the path fields of an artifact dataclass."""
+    if not is_dataclass(output):
+        return []
+    files = []
+    for artifact_field in fields(output):
+        value = getattr(output, artifact_field.name)
+        if is_dataclass(value):
+            files.extend(artifact_files(value))
+        elif isinstance(value, str) and os.path.isfile(value):
+            files.append(value)
+    return files
+
+
+def summarize_files(file_paths: Iterable[str],
+                    count_rows: Callable[[str], Optional[int]] = count_file_rows) -> Dict[str, int]:
+    """Total bytes and, for data files, rows of a set of files, each file counted once."""
+    n_bytes, n_rows = 0, 0
+    for file_path in sorted(set(file_paths)):
+        n_bytes += os.path.getsize(file_path)
+        n_rows += count_rows(file_path) or 0
+    return {"bytes": n_bytes, "rows": n_rows}
+
+
+class RunReport:
+    """
+    Machine-readable resource report of a training run, saved as <artifact_dir>/run_report.json.
+
+    Every instrumented stage records wall time, CPU seconds and the process peak RSS when it
+    finished, plus rows and bytes of the artifact files it read (its inputs' outputs) and wrote.
+    CPU time and peak RSS are process-wide figures, so stages running concurrently share them.
+    Row counts are cached by path, modification time and size, so an artifact is counted once
+    when its stage writes it rather than again by every stage reading it. Reports of a resumed
+    run keep the figures of the stages that were not run again.
+    """
+
+    def __init__(self, run_id: str, artifact_dir: str):
+        self.run_id = run_id
+        self.artifact_dir = artifact_dir
+        self.file_path = os.path.join(artifact_dir, RUN_REPORT_FILE_NAME)
+        self.stages: Dict[str, dict] = {}
+        self._row_counts: Dict[Tuple[str, int, int], Optional[int]] = {}
+        self._lock = Lock()
+        if os.path.exists(self.file_path):
+            with open(self.file_path) as file_obj:
+                self.stages = json.load(file_obj).get("stages", {})
+
+    def count_rows(self, file_path: str) -> Optional[int]:
+        """count_file_rows of file_path, counted again only when the file changed."""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._row_counts:
+                return self._row_counts[key]
+        n_rows = count_file_rows(file_path)
+        with self._lock:
+            self._row_counts[key] = n_rows
+        return n_rows
+
+    def instrument(self, stage: Stage) -> Stage:
+        """Same stage with its func measured into this report."""
+        def measured(**inputs):
+            started_at = datetime.now().isoformat(timespec="seconds")
+            wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+            output = stage.func(**inputs)
+            wall = time.perf_counter() - wall_start
+
+            read = summarize_files((path for upstream in inputs.values() for path in artifact_files(upstream)),
+                                   self.count_rows)
+            written = summarize_files(artifact_files(output), self.count_rows)
+            metrics = {
+                "started_at": started_at,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu_seconds() - cpu_start, 4),
+                "peak_rss_mb": round(peak_rss_mb(), 2),
+                "input_rows": read["rows"],
+                "output_rows": written["rows"],
+                "bytes_read": read["bytes"],
+                "bytes_written": written["bytes"],
+                "rows_per_second": round(max(read["rows"], written["rows"]) / wall, 2) if wall > 0 else None,
+            }
+            with self._lock:
+                self.stages[stage.name] = metrics
+            logging.info(f"Stage {stage.name} metrics: {metrics}")
+            return output
+
+        return Stage(name=stage.name, func=measured, inputs=stage.inputs, checkpoint=stage.checkpoint)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = dict(self.stages)
+        return {
+            "run_id": self.run_id,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+            "peak_rss_mb": round(peak_rss_mb(), 2),
+            "stages": stages,
+        }
+
+    def save(self) -> None:
+        try:
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            with open(self.file_path, "w") as file_obj:
+                json.dump(self.to_dict(), file_obj, indent=2)
+            logging.info(f"Run report saved to {self.file_path}")
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+
+class PredictionBatchRecorder:
+    """
+    Appends one JSON line per scored prediction batch (wall, CPU, peak RSS, rows) to
+    <output_dir>/prediction_batches.jsonl. Records are buffered and written every flush_every
+    batches and at exit, so the request path only pays for a few clock reads.
+    """
+
+    def __init__(self, output_dir: str, flush_every: int = 100):
+        self.file_path = os.path.join(output_dir, PREDICTION_BATCHES_FILE_NAME)
+        self.flush_every = flush_every
+        self._buffer: List[dict] = []
+        self._lock = Lock()
+        atexit.register(self.flush)
+
+    def start(self) -> tuple:
+        return time.perf_counter(), cpu_seconds()
+
+    def record(self, started: tuple, n_rows: int) -> None:
+        wall_start, cpu_start = started
+        wall = time.perf_counter() - wall_start
+        record = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "wall_seconds": round(wall, 6),
+            "cpu_seconds": round(cpu_seconds() - cpu_start, 6),
+            "peak_rss_mb": round(peak_rss_mb(), 2),
+            "rows": n_rows,
+        }
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) < self.flush_every:
+                return
+            records, self._buffer = self._buffer, []
+        self._write(records)
+
+    def flush(self) -> None:
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if records:
+            self._write(records)
+
+    def _write(self, records: List[dict]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(self.file_path, "a") as file_obj:
+                file_obj.writelines(json.dumps(record) + "\n" for record in records)
+        except Exception as e:
+            logging.warning(f"Could not write prediction batch metrics: {e}")
+
+
+def resolve_report_path(run_or_path: str) -> str:
+    if os.path.isfile(run_or_path):
+        return run_or_path
+    return os.path.join(PIPELINE_NAME, ARTIFACT_DIR, run_or_path, RUN_REPORT_FILE_NAME)
+
+
+def diff_reports(baseline: dict, candidate: dict) -> Dict[str, Dict[str, dict]]:
+    """Per stage and metric: baseline value, candidate value and candidate/baseline ratio."""
+    diff = {}
+    for stage_name in sorted(set(baseline["stages"]) | set(candidate["stages"])):
+        before, after = baseline["stages"].get(stage_name, {}), candidate["stages"].get(stage_name, {})
+        diff[stage_name] = {}
+        for metric in DIFF_METRICS:
+            old, new = before.get(metric), after.get(metric)
+            ratio = round(new / old, 3) if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old else None
+            diff[stage_name][metric] = {"baseline": old, "candidate": new, "ratio": ratio}
+    return diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the run reports of two training runs")
+    parser.add_argument("baseline", help="run id or path of the baseline run_report.json")
+    parser.add_argument("candidate", help="run id or path of the candidate run_report.json")
+    parser.add_argument("--json", action="store_true", help="print the diff as JSON")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for run_or_path in (args.baseline, args.candidate):
+        with open(resolve_report_path(run_or_path)) as file_obj:
+            reports.append(json.load(file_obj))
+    diff = diff_reports(*reports)
+
+    if args.json:
+        print(json.dumps(diff, indent=2))
+        return
+    print(f"{'stage':<22}{'metric':<18}{'baseline':>14}{'candidate':>14}{'ratio':>9}")
+    for stage_name, metrics in diff.items():
+        for metric, values in metrics.items():
+            if values["baseline"] is None and values["candidate"] is None:
+                continue
+            ratio = "" if values["ratio"] is None else f"{values['ratio']:.3f}"
+            print(f"{stage_name:<22}{metric:<18}{str(values['baseline']):>14}{str(values['candidate']):>14}{ratio:>9}")
+
+
+if __name__ == "__main__":
+    main()
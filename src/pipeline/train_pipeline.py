@@ -1,5 +1,8 @@
+import json
+import os
 import sys
-from typing import Tuple
+from dataclasses import fields
+from typing import Optional, Tuple
 
 from pandas import DataFrame
 
@@ -11,6 +14,11 @@ from src.components.model_trainer import ModelTrainer
 from src.components.model_evaluation import ModelEvaluation
 
 from src.components.model_pusher import ModelPusher
+from src.ml.model.b2_estimator import B2ModelEstimator
+from src.pipeline.dag import DAGScheduler, Stage
+from src.pipeline.run_manifest import RunManifest
+from src.pipeline.run_report import RunReport
+from src.constant.training_pipeline import ARTIFACT_DIR, PIPELINE_NAME, PIPELINE_REPORT_FILE_NAME
 
 from src.exception import CustomerException
 from src.logger import logging
@@ -23,18 +31,43 @@ from src.entity.config_entity import (DataIngestionConfig,
                                          DataTransformationConfig,
                                          DataValidationConfig,
                                          ModelEvaluationConfig,
-                                         ModelPusherConfig, ModelTrainerConfig)
+                                         ModelPusherConfig, ModelTrainerConfig,
+                                         TrainingPipelineConfig, training_pipeline_config)
 
 
 
 class TrainPipeline:
-    def __init__(self):
-        self.data_ingestion_config = DataIngestionConfig()
-        self.data_validation_config = DataValidationConfig()
-        self.data_transformation_config = DataTransformationConfig()
-        self.model_trainer_config = ModelTrainerConfig()
-        self.model_evaluation_config = ModelEvaluationConfig()
-        self.model_pusher_config = ModelPusherConfig()
+    def __init__(self, run_id: Optional[str] = None):
+        """
+        run_id: id of the run, by default the timestamp of this process. The id of an earlier run
+        reuses its artifact directory, which resuming requires; a new id names a fresh run.
+        """
+        self.training_pipeline_config = training_pipeline_config
+        if run_id is not None:
+            artifact_dir = os.path.join(PIPELINE_NAME, ARTIFACT_DIR, run_id)
+            self.training_pipeline_config = TrainingPipelineConfig(
+                artifact_dir=artifact_dir,
+                timestamp=run_id,
+                pipeline_report_file_path=os.path.join(artifact_dir, PIPELINE_REPORT_FILE_NAME),
+            )
+
+        self.data_ingestion_config = self.rebase_config(DataIngestionConfig())
+        self.data_validation_config = self.rebase_config(DataValidationConfig())
+        self.data_transformation_config = self.rebase_config(DataTransformationConfig())
+        self.model_trainer_config = self.rebase_config(ModelTrainerConfig())
+        self.model_evaluation_config = self.rebase_config(ModelEvaluationConfig())
+        self.model_pusher_config = self.rebase_config(ModelPusherConfig())
+
+    def rebase_config(self, config):
+        """Point the config's paths inside the default artifact directory at this run's directory."""
+        default_artifact_dir = training_pipeline_config.artifact_dir
+        artifact_dir = self.training_pipeline_config.artifact_dir
+        if artifact_dir != default_artifact_dir:
+            for config_field in fields(config):
+                value = getattr(config, config_field.name)
+                if isinstance(value, str) and value.startswith(default_artifact_dir):
+                    setattr(config, config_field.name, artifact_dir + value[len(default_artifact_dir):])
+        return config
         
 
     def start_data_ingestion(self) -> DataIngestionArtifact:
@@ -48,19 +81,39 @@ class TrainPipeline:
             raise CustomerException(e, sys)
 
     
-    def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+    def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact,
+                              run_drift_report: bool = True) -> DataValidationArtifact:
         try:
             logging.info("Starting data validation")
             data_validation = DataValidation(
                 data_ingestion_artifact=data_ingestion_artifact,
                 data_validation_config=self.data_validation_config
             )
-            data_validation_artifact = data_validation.initiate_data_validation()
+            data_validation_artifact = data_validation.initiate_data_validation(run_drift_report=run_drift_report)
+            if not data_validation_artifact.validation_status:
+                raise Exception("Data Validation Failed.")
             logging.info("Data validation completed")
             return data_validation_artifact
         except Exception as e:
             raise CustomerException(e, sys)
 
+    def start_drift_report(self, data_ingestion_artifact: DataIngestionArtifact,
+                           data_validation_artifact: DataValidationArtifact) -> bool:
+        try:
+            logging.info("Starting drift report")
+            data_validation = DataValidation(
+                data_ingestion_artifact=data_ingestion_artifact,
+                data_validation_config=self.data_validation_config
+            )
+            drift = data_validation.initiate_drift_report(data_validation_artifact)
+            logging.info("Drift report completed")
+            return drift
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def start_champion_prefetch(self) -> Optional[B2ModelEstimator]:
+        return ModelEvaluation.prefetch_champion(self.model_evaluation_config)
+
     
     def start_data_transformation(self, data_ingestion_artifact: DataIngestionArtifact,
                                   data_validation_artifact: DataValidationArtifact) -> DataTransformationArtifact:
@@ -80,12 +133,14 @@ class TrainPipeline:
     
 
     
-    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact,
+                            data_validation_artifact: DataValidationArtifact = None) -> ModelTrainerArtifact:
         try:
             logging.info("Starting model training")
             model_trainer = ModelTrainer(
                 data_transformation_artifact=data_transformation_artifact,
-                model_trainer_config=self.model_trainer_config
+                model_trainer_config=self.model_trainer_config,
+                data_validation_artifact=data_validation_artifact
             )
             model_trainer_artifact = model_trainer.initiate_model_trainer()
             logging.info("Model training completed")
@@ -97,14 +152,16 @@ class TrainPipeline:
         self,
         data_ingestion_artifact: DataIngestionArtifact,
         model_trainer_artifact: ModelTrainerArtifact,
-        data_transformation_artifact: DataTransformationArtifact
+        data_transformation_artifact: DataTransformationArtifact,
+        champion_estimator: Optional[B2ModelEstimator] = None
     ) -> ModelEvaluationArtifact:
         try:
             model_evaluation = ModelEvaluation(
                 model_eval_config=self.model_evaluation_config,
                 data_ingestion_artifact=data_ingestion_artifact,
                 model_trainer_artifact=model_trainer_artifact,
-                data_transformation_artifact= data_transformation_artifact
+                data_transformation_artifact= data_transformation_artifact,
+                champion_estimator=champion_estimator
             )
             model_evaluation_artifact = model_evaluation.initiate_model_evaluation()
             return model_evaluation_artifact
@@ -124,31 +181,117 @@ class TrainPipeline:
         except Exception as e:
             raise CustomerException(e, sys)
 
-    def run_pipeline(self) -> None:
+    def start_conditional_model_pusher(self, model_trainer_artifact: ModelTrainerArtifact,
+                                       model_evaluation_artifact: ModelEvaluationArtifact):
+        if not model_evaluation_artifact.is_model_accepted:
+            logging.info("Model not accepted")
+            return None
+        return self.start_model_pusher(model_trainer_artifact=model_trainer_artifact)
+
+    def get_stages(self):
+        """
+        Training pipeline as a DAG: the drift report runs alongside transformation and the champion
+        is downloaded while the candidate trains; validation failing stops everything downstream.
+        """
+        return [
+            Stage("data_ingestion", lambda: self.start_data_ingestion()),
+            Stage("champion_prefetch", lambda: self.start_champion_prefetch(), checkpoint=False),
+            Stage(
+                "data_validation",
+                lambda data_ingestion: self.start_data_validation(data_ingestion, run_drift_report=False),
+                inputs=["data_ingestion"],
+            ),
+            Stage(
+                "drift_report",
+                lambda data_ingestion, data_validation: self.start_drift_report(data_ingestion, data_validation),
+                inputs=["data_ingestion", "data_validation"],
+            ),
+            Stage(
+                "data_transformation",
+                lambda data_ingestion, data_validation: self.start_data_transformation(
+                    data_ingestion_artifact=data_ingestion, data_validation_artifact=data_validation
+                ),
+                inputs=["data_ingestion", "data_validation"],
+            ),
+            Stage(
+                "model_trainer",
+                # the drift report writes the reference profile the trainer ships with the model
+                lambda data_validation, data_transformation, drift_report: self.start_model_trainer(
+                    data_transformation_artifact=data_transformation, data_validation_artifact=data_validation
+                ),
+                inputs=["data_validation", "data_transformation", "drift_report"],
+            ),
+            Stage(
+                "model_evaluation",
+                lambda data_ingestion, data_transformation, model_trainer, champion_prefetch: self.start_model_evaluation(
+                    data_ingestion_artifact=data_ingestion,
+                    model_trainer_artifact=model_trainer,
+                    data_transformation_artifact=data_transformation,
+                    champion_estimator=champion_prefetch,
+                ),
+                inputs=["data_ingestion", "data_transformation", "model_trainer", "champion_prefetch"],
+            ),
+            Stage(
+                "model_pusher",
+                lambda model_trainer, model_evaluation: self.start_conditional_model_pusher(
+                    model_trainer_artifact=model_trainer, model_evaluation_artifact=model_evaluation
+                ),
+                inputs=["model_trainer", "model_evaluation"],
+            ),
+        ]
+
+    def save_pipeline_report(self, scheduler: DAGScheduler) -> None:
         try:
-            logging.info("Starting training pipeline")
-            
-            data_ingestion_artifact = self.start_data_ingestion()
-            data_validation_artifact = self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact = self.start_data_transformation(
-                data_ingestion_artifact=data_ingestion_artifact,
-                data_validation_artifact=data_validation_artifact
+            report_file_path = self.training_pipeline_config.pipeline_report_file_path
+            os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
+            with open(report_file_path, "w") as file_obj:
+                json.dump(scheduler.report(), file_obj, indent=2)
+            logging.info(f"Pipeline report saved to {report_file_path}")
+        except Exception as e:
+            logging.warning(f"Could not save the pipeline report: {e}")
+
+    def run_pipeline(self, resume: bool = False, from_stage: Optional[str] = None) -> None:
+        """
+        resume: restore the stages the run manifest records as completed instead of running them
+        from_stage: with resume, run this stage and everything downstream of it again
+        """
+        try:
+            logging.info(f"Starting training pipeline, run {self.training_pipeline_config.timestamp}")
+
+            run_manifest = RunManifest(
+                run_id=self.training_pipeline_config.timestamp,
+                artifact_dir=self.training_pipeline_config.artifact_dir,
             )
-            
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            
-            model_evaluation_artifact = self.start_model_evaluation(
-                data_ingestion_artifact=data_ingestion_artifact,
-                model_trainer_artifact=model_trainer_artifact,
-                data_transformation_artifact=data_transformation_artifact
+
+            def checkpoint(stage: Stage, output) -> None:
+                if stage.checkpoint:
+                    run_manifest.record(stage.name, output)
+
+            run_report = RunReport(
+                run_id=self.training_pipeline_config.timestamp,
+                artifact_dir=self.training_pipeline_config.artifact_dir,
+            )
+            scheduler = DAGScheduler(
+                [run_report.instrument(stage) for stage in self.get_stages()],
+                max_workers=self.training_pipeline_config.max_workers,
+                on_stage_done=checkpoint,
             )
-            
-            if not model_evaluation_artifact.is_model_accepted:
-                logging.info("Model not accepted")
-                return None
-            
-            model_pusher_artifact = self.start_model_pusher(model_trainer_artifact=model_trainer_artifact)
-            
+
+            restored_outputs = {}
+            if resume:
+                run_manifest = RunManifest.load(self.training_pipeline_config.artifact_dir)
+                if from_stage is not None:
+                    run_manifest.discard(scheduler.descendants(from_stage))
+                restored_outputs = run_manifest.completed_outputs()
+            elif from_stage is not None:
+                raise Exception("from_stage needs a run to resume")
+
+            try:
+                scheduler.run(restored_outputs=restored_outputs)
+            finally:
+                self.save_pipeline_report(scheduler)
+                run_report.save()
+
             logging.info("Training pipeline completed successfully")
         except Exception as e:
             raise CustomerException(e, sys)
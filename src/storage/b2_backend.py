@@ -0,0 +1,43 @@
+from typing import Iterator, List, Optional
+
+from src.cloud_storage.b2_storage import B2Storage
+from src.storage.backend import DEFAULT_CHUNK_SIZE, StorageBackend
+
+
+class B2StorageBackend(StorageBackend):
+    """StorageBackend over one Backblaze B2 bucket, with B2Storage's caching and retries."""
+
+    def __init__(self, bucket_name: str, b2_storage: B2Storage = None):
+        self.bucket_name = bucket_name
+        self.b2 = b2_storage or B2Storage()
+
+    def exists(self, key: str) -> bool:
+        return self.b2.file_exists(bucket_name=self.bucket_name, file_name=key)
+
+    def metadata(self, key: str) -> Optional[dict]:
+        return self.b2.get_file_info(bucket_name=self.bucket_name, file_name=key)
+
+    def get(self, key: str) -> bytes:
+        return self.b2.read_file(bucket_name=self.bucket_name, file_name=key)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.b2.upload_bytes(bucket_name=self.bucket_name, data=data, file_name=key)
+
+    def list(self, prefix: str = "") -> List[str]:
+        return self.b2.list_files(bucket_name=self.bucket_name, prefix=prefix)
+
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        return self.b2.stream_file(bucket_name=self.bucket_name, file_name=key, chunk_size=chunk_size)
+
+    def get_file(self, key: str, local_path: str) -> None:
+        self.b2.download_file(bucket_name=self.bucket_name, file_name=key, local_path=local_path)
+
+    def put_file(self, local_path: str, key: str, skip_if_unchanged: bool = False, **upload_options) -> bool:
+        return self.b2.upload_file(
+            bucket_name=self.bucket_name,
+            local_path=local_path,
+            file_name=key,
+            skip_if_unchanged=skip_if_unchanged,
+            min_part_size=upload_options.get("min_part_size"),
+            retries=upload_options.get("retries"),
+        )
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
+
+from src.constant.env_variable import EMULATED_B2_LATENCY_MS, LOCAL_STORAGE_DIR, STORAGE_BACKEND
+from src.exception import CustomerException
+from src.utils.main_utils import compute_file_sha1
+
+B2_BACKEND = "b2"
+LOCAL_BACKEND = "local"
+EMULATED_B2_BACKEND = "emulated_b2"
+DEFAULT_LOCAL_STORAGE_DIR = "models"
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    Key/value object store the pipeline reads and publishes artifacts through.
+
+    Keys are flat, "/"-separated names inside one bucket or root directory. metadata returns
+    file_id, file_name, size, content_sha1 and upload_timestamp, or None for a missing key, so
+    callers can compare versions without downloading. put_file returns whether anything was
+    written; backends accept upload_options they understand (e.g. min_part_size, retries for B2)
+    and ignore the others.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def metadata(self, key: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> List[str]:
+        pass
+
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        data = self.get(key)
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    def get_file(self, key: str, local_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+            with open(local_path, "wb") as file_obj:
+                for chunk in self.stream(key):
+                    file_obj.write(chunk)
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def put_file(self, local_path: str, key: str, skip_if_unchanged: bool = False, **upload_options) -> bool:
+        try:
+            if skip_if_unchanged:
+                remote_metadata = self.metadata(key)
+                if remote_metadata is not None and remote_metadata["content_sha1"] == compute_file_sha1(local_path):
+                    return False
+            with open(local_path, "rb") as file_obj:
+                self.put(key, file_obj.read())
+            return True
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+
+class AsyncStorageBackend:
+    """
+    asyncio view of a StorageBackend: every call runs the blocking method in a worker thread, so
+    downloads and uploads can be awaited alongside other work instead of blocking the event loop.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self.backend.exists, key)
+
+    async def metadata(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.backend.metadata, key)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.backend.get, key)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self.backend.put, key, data)
+
+    async def list(self, prefix: str = "") -> List[str]:
+        return await asyncio.to_thread(self.backend.list, prefix)
+
+    async def get_file(self, key: str, local_path: str) -> None:
+        await asyncio.to_thread(self.backend.get_file, key, local_path)
+
+    async def put_file(self, local_path: str, key: str, skip_if_unchanged: bool = False, **upload_options) -> bool:
+        return await asyncio.to_thread(self.backend.put_file, local_path, key, skip_if_unchanged, **upload_options)
+
+    async def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        iterator = await asyncio.to_thread(lambda: iter(self.backend.stream(key, chunk_size)))
+        sentinel = object()
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, sentinel)
+            if chunk is sentinel:
+                return
+            yield chunk
+
+
+def get_storage_backend(bucket_name: str, backend_name: Optional[str] = None) -> StorageBackend:
+    """
+    Backend for bucket_name chosen by backend_name or the STORAGE_BACKEND environment variable:
+    "b2" (default), "local" (files under LOCAL_STORAGE_DIR/<bucket>) or "emulated_b2" (in-process
+    B2 stand-in, EMULATED_B2_LATENCY_MS milliseconds per call).
+    """
+    try:
+        backend_name = (backend_name or os.getenv(STORAGE_BACKEND) or B2_BACKEND).strip().lower()
+
+        if backend_name == B2_BACKEND:
+            from src.storage.b2_backend import B2StorageBackend
+
+            return B2StorageBackend(bucket_name=bucket_name)
+
+        if backend_name == LOCAL_BACKEND:
+            from src.storage.local_storage import LocalStorageBackend
+
+            root_dir = os.path.join(os.getenv(LOCAL_STORAGE_DIR, DEFAULT_LOCAL_STORAGE_DIR), bucket_name)
+            return LocalStorageBackend(root_dir=root_dir)
+
+        if backend_name == EMULATED_B2_BACKEND:
+            from src.storage.emulated_b2 import EmulatedB2Backend
+
+            latency_seconds = float(os.getenv(EMULATED_B2_LATENCY_MS, 0)) / 1000
+            return EmulatedB2Backend(bucket_name=bucket_name, latency_seconds=latency_seconds)
+
+        raise Exception(
+            f"Unknown storage backend '{backend_name}', use one of "
+            f"{[B2_BACKEND, LOCAL_BACKEND, EMULATED_B2_BACKEND]}"
+        )
+    except Exception as e:
+        raise CustomerException(e, sys)
@@ -0,0 +1,108 @@
+import hashlib
+import itertools
+import random
+import sys
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+from src.exception import CustomerException
+from src.storage.backend import StorageBackend
+
+# B2 stores uploads above this size as large files, which carry no content_sha1 of their own
+DEFAULT_LARGE_FILE_THRESHOLD = 100 * 1024 * 1024
+
+
+class EmulatedB2Backend(StorageBackend):
+    """
+    In-process stand-in for a B2 bucket, for offline tests and benchmarks of the storage paths.
+
+    Buckets live in a class-level table, so every instance opened on the same bucket name sees the
+    same objects, like clients of one real bucket. Like B2, each put adds a new file version with a
+    fresh file id and upload timestamp and reads return the latest version; large files report the
+    sha1 through file_info["large_file_sha1"] only. Every call sleeps latency_seconds (plus up to
+    jitter_seconds) and transfers are throttled to bytes_per_second when set.
+    """
+
+    _buckets: Dict[str, Dict[str, List[dict]]] = {}
+    _lock = Lock()
+    _file_ids = itertools.count(1)
+
+    def __init__(self, bucket_name: str, latency_seconds: float = 0.0, jitter_seconds: float = 0.0,
+                 bytes_per_second: Optional[float] = None,
+                 large_file_threshold: int = DEFAULT_LARGE_FILE_THRESHOLD):
+        self.bucket_name = bucket_name
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.bytes_per_second = bytes_per_second
+        self.large_file_threshold = large_file_threshold
+        with EmulatedB2Backend._lock:
+            self._files = EmulatedB2Backend._buckets.setdefault(bucket_name, {})
+
+    @classmethod
+    def reset(cls, bucket_name: Optional[str] = None) -> None:
+        with cls._lock:
+            if bucket_name is None:
+                cls._buckets.clear()
+            else:
+                cls._buckets.get(bucket_name, {}).clear()
+
+    def _wait(self, n_bytes: int = 0) -> None:
+        delay = self.latency_seconds + random.uniform(0, self.jitter_seconds)
+        if self.bytes_per_second:
+            delay += n_bytes / self.bytes_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+    def _latest(self, key: str) -> Optional[dict]:
+        versions = self._files.get(key)
+        return versions[-1] if versions else None
+
+    def exists(self, key: str) -> bool:
+        self._wait()
+        return self._latest(key) is not None
+
+    def metadata(self, key: str) -> Optional[dict]:
+        self._wait()
+        version = self._latest(key)
+        if version is None:
+            return None
+        content_sha1 = version["content_sha1"]
+        if content_sha1 == "none":
+            content_sha1 = version["file_info"].get("large_file_sha1")
+        return {
+            "file_id": version["file_id"],
+            "file_name": key,
+            "size": len(version["data"]),
+            "content_sha1": content_sha1,
+            "upload_timestamp": version["upload_timestamp"],
+        }
+
+    def get(self, key: str) -> bytes:
+        try:
+            version = self._latest(key)
+            if version is None:
+                raise FileNotFoundError(f"File not present: {self.bucket_name}/{key}")
+            self._wait(len(version["data"]))
+            return version["data"]
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def put(self, key: str, data: bytes) -> None:
+        self._wait(len(data))
+        data = bytes(data)
+        sha1 = hashlib.sha1(data).hexdigest()
+        is_large_file = len(data) >= self.large_file_threshold
+        version = {
+            "file_id": f"4_z{self.bucket_name}_f{next(EmulatedB2Backend._file_ids):012d}",
+            "data": data,
+            "content_sha1": "none" if is_large_file else sha1,
+            "file_info": {"large_file_sha1": sha1} if is_large_file else {},
+            "upload_timestamp": int(time.time() * 1000),
+        }
+        with EmulatedB2Backend._lock:
+            self._files.setdefault(key, []).append(version)
+
+    def list(self, prefix: str = "") -> List[str]:
+        self._wait()
+        return sorted(key for key, versions in self._files.items() if versions and key.startswith(prefix))
@@ -1,9 +1,12 @@
 import os
 import pickle
+import shutil
 import sys
-from typing import Any
+from typing import Any, Iterator, List, Optional
 from src.exception import CustomerException
 from src.logger import logging
+from src.storage.backend import DEFAULT_CHUNK_SIZE, StorageBackend
+from src.utils.main_utils import compute_file_sha1
 
 
 class LocalStorage:
@@ -34,3 +37,76 @@ class LocalStorage:
 
     def file_exists(self, file_path: str) -> bool:
         return os.path.exists(file_path)
+
+
+class LocalStorageBackend(StorageBackend):
+    """StorageBackend over a directory, keys being paths relative to root_dir."""
+
+    def __init__(self, root_dir: str = "models"):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def metadata(self, key: str) -> Optional[dict]:
+        try:
+            path = self._path(key)
+            if not os.path.isfile(path):
+                return None
+            stat = os.stat(path)
+            return {
+                "file_id": path,
+                "file_name": key,
+                "size": stat.st_size,
+                "content_sha1": compute_file_sha1(path),
+                "upload_timestamp": int(stat.st_mtime * 1000),
+            }
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as file_obj:
+                return file_obj.read()
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def put(self, key: str, data: bytes) -> None:
+        try:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write then rename, so readers never see a partially written object
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as file_obj:
+                file_obj.write(data)
+            os.replace(temp_path, path)
+            logging.info(f"Stored {len(data)} bytes at {path}")
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def list(self, prefix: str = "") -> List[str]:
+        keys = []
+        for dir_path, _, file_names in os.walk(self.root_dir):
+            for file_name in file_names:
+                key = os.path.relpath(os.path.join(dir_path, file_name), self.root_dir).replace(os.sep, "/")
+                if key.startswith(prefix) and not key.endswith(".tmp"):
+                    keys.append(key)
+        return sorted(keys)
+
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        try:
+            with open(self._path(key), "rb") as file_obj:
+                yield from iter(lambda: file_obj.read(chunk_size), b"")
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def get_file(self, key: str, local_path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+            shutil.copyfile(self._path(key), local_path)
+        except Exception as e:
+            raise CustomerException(e, sys)
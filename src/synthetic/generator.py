@@ -0,0 +1,163 @@
+import sys
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+
+from src.constant.training_pipeline import (SYNTHETIC_CHUNK_SIZE, SYNTHETIC_DATE_FORMATS,
+                                            SYNTHETIC_ENGINEERED_SOURCE_PATH, SYNTHETIC_ID_COLUMN,
+                                            SYNTHETIC_RAW_SOURCE_PATH)
+from src.data_access.engineered_features import CAMPAIGN_COLUMNS, RAW_COLUMN_RENAMES, SPENDING_COLUMNS
+from src.exception import CustomerException
+from src.logger import logging
+
+# Source file and read options of each layout the pipeline accepts
+LAYOUTS = {
+    "raw": {"source_path": SYNTHETIC_RAW_SOURCE_PATH, "read_csv_kwargs": {"sep": "\t"}},
+    "engineered": {"source_path": SYNTHETIC_ENGINEERED_SOURCE_PATH, "read_csv_kwargs": {}},
+}
+
+
+ENGINEERED_SPENDING_COLUMNS = [RAW_COLUMN_RENAMES[column] for column in SPENDING_COLUMNS]
+# Columns computed from others by the feature engineering: their inputs and how, as in engineer_features.
+# They are left out of the copula and recomputed after sampling, when the layout has all their inputs.
+DERIVED_COLUMNS: Dict[str, Tuple[List[str], Callable[[pd.DataFrame], pd.Series]]] = {
+    "Parental Status": (["Children"],
+                        lambda df: (df["Children"] > 0).astype(int).where(df["Children"].notna())),
+    "Total_Spending": (ENGINEERED_SPENDING_COLUMNS,
+                       lambda df: df[ENGINEERED_SPENDING_COLUMNS].sum(axis=1, min_count=len(SPENDING_COLUMNS))),
+    "Total Promo": (CAMPAIGN_COLUMNS,
+                    lambda df: df[CAMPAIGN_COLUMNS].sum(axis=1, min_count=len(CAMPAIGN_COLUMNS))),
+}
+
+
+class GaussianCopulaModel:
+    """
+    Empirical marginals joined by a Gaussian copula.
+
+    Every column keeps its observed values sorted (dates by date, strings alphabetically) and its
+    null rate; the dependence between columns is the correlation matrix of their normal scores.
+    Sampling draws correlated normals, maps them to uniforms and reads each column's inverse
+    empirical CDF: float columns interpolate between observed values, every other column returns
+    observed values only, so codes, categories, dates and integer counts stay valid.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.continuous: Dict[str, bool] = {}
+        self.integral: Dict[str, bool] = {}
+        self.null_rates: Dict[str, float] = {}
+        self.dtypes: Dict[str, np.dtype] = {}
+        self.cholesky: Optional[np.ndarray] = None
+
+    def fit(self, dataframe: pd.DataFrame, date_formats: Optional[Dict[str, str]] = None) -> "GaussianCopulaModel":
+        try:
+            date_formats = date_formats or {}
+            self.columns = list(dataframe.columns)
+            normal_scores = np.zeros((len(dataframe), len(self.columns)))
+
+            for position, column in enumerate(self.columns):
+                series = dataframe[column]
+                present = series.notna().to_numpy()
+                values = series[present]
+                if column in date_formats:
+                    sort_key = pd.to_datetime(values, format=date_formats[column]).to_numpy()
+                elif values.dtype == object:
+                    sort_key = values.astype(str).to_numpy()
+                else:
+                    sort_key = values.to_numpy()
+
+                order = np.argsort(sort_key, kind="stable")
+                self.sorted_values[column] = values.to_numpy()[order]
+                self.continuous[column] = pd.api.types.is_float_dtype(series) and column not in date_formats
+                self.integral[column] = bool(self.continuous[column] and np.all(np.mod(values, 1) == 0))
+                self.null_rates[column] = 1.0 - present.mean()
+                self.dtypes[column] = series.dtype
+
+                # rows with nulls sit at the median of the copula, a constant column carries no signal
+                if len(values) > 1 and len(np.unique(sort_key)) > 1:
+                    ranks = rankdata(sort_key, method="average")
+                    normal_scores[present, position] = ndtri(ranks / (len(values) + 1))
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                correlation = np.nan_to_num(np.corrcoef(normal_scores, rowvar=False))
+            np.fill_diagonal(correlation, 1.0)
+            # clip to the nearest positive definite matrix so the Cholesky factor exists
+            eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+            correlation = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+            scale = np.sqrt(np.diag(correlation))
+            self.cholesky = np.linalg.cholesky(correlation / np.outer(scale, scale))
+            logging.info(f"Fitted Gaussian copula on {len(dataframe)} rows and {len(self.columns)} columns")
+            return self
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def sample(self, n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+        uniforms = ndtr(rng.standard_normal((n_rows, len(self.columns))) @ self.cholesky.T)
+        data = {}
+        for position, column in enumerate(self.columns):
+            sorted_values, u = self.sorted_values[column], uniforms[:, position]
+            n_values = len(sorted_values)
+            if n_values == 0:
+                data[column] = pd.Series(np.nan, index=range(n_rows), dtype=self.dtypes[column])
+                continue
+            if self.continuous[column]:
+                values = np.interp(u, (np.arange(n_values) + 0.5) / n_values, sorted_values)
+                if self.integral[column]:
+                    values = np.round(values)
+            else:
+                values = sorted_values[np.minimum((u * n_values).astype(np.int64), n_values - 1)]
+            series = pd.Series(values)
+            if self.null_rates[column] > 0:
+                series = series.where(rng.random(n_rows) >= self.null_rates[column])
+            data[column] = series
+        return pd.DataFrame(data, columns=self.columns)
+
+
+class SyntheticCustomerGenerator:
+    """
+    Fits a GaussianCopulaModel to the dataset of a layout ("raw": the marketing campaign file of
+    schema.yaml, "engineered": the clustered feature file) and streams synthetic rows in the same
+    columns and order. The id column is not modelled but numbered from id_offset, so generated
+    ids are unique. Derived columns (DERIVED_COLUMNS) are not modelled either but recomputed
+    from the sampled ones, so e.g. Parental Status always agrees with Children. Chunk i is drawn from its own generator seeded with (seed, i): the output
+    depends on seed and chunk_size only.
+    """
+
+    def __init__(self, layout: str = "raw", seed: int = 42, source_path: Optional[str] = None,
+                 id_column: str = SYNTHETIC_ID_COLUMN, date_formats: Optional[Dict[str, str]] = None):
+        try:
+            if layout not in LAYOUTS:
+                raise ValueError(f"Unknown layout {layout}, expected one of {sorted(LAYOUTS)}")
+            self.layout = layout
+            self.seed = seed
+            source = pd.read_csv(source_path or LAYOUTS[layout]["source_path"], **LAYOUTS[layout]["read_csv_kwargs"])
+            self.column_order: Sequence[str] = list(source.columns)
+            self.id_column = id_column if id_column in source.columns else None
+            self.derived_columns = {
+                column: derive for column, (inputs, derive) in DERIVED_COLUMNS.items()
+                if column in source.columns and set(inputs) <= set(source.columns)
+            }
+            not_modelled = ([self.id_column] if self.id_column else []) + list(self.derived_columns)
+            modelled = source.drop(columns=not_modelled)
+            date_formats = SYNTHETIC_DATE_FORMATS if date_formats is None else date_formats
+            self.model = GaussianCopulaModel().fit(
+                modelled, {column: fmt for column, fmt in date_formats.items() if column in modelled.columns}
+            )
+        except Exception as e:
+            raise CustomerException(e, sys)
+
+    def iter_chunks(self, n_rows: int, chunk_size: int = SYNTHETIC_CHUNK_SIZE,
+                    id_offset: int = 1) -> Iterator[pd.DataFrame]:
+        for chunk_index, start in enumerate(range(0, n_rows, chunk_size)):
+            size = min(chunk_size, n_rows - start)
+            chunk = self.model.sample(size, np.random.default_rng([self.seed, chunk_index]))
+            for column, derive in self.derived_columns.items():
+                chunk[column] = derive(chunk)
+            if self.id_column:
+                chunk[self.id_column] = np.arange(id_offset + start, id_offset + start + size)
+            chunk.index = pd.RangeIndex(start, start + size)
+            yield chunk[self.column_order]
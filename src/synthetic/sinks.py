@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constant.database import DATABASE_NAME
+from src.exception import CustomerException
+from src.logger import logging
+
+
+def _log_progress(n_rows: int, started: float, target: str) -> None:
+    elapsed = time.perf_counter() - started
+    logging.info(f"Wrote {n_rows} synthetic rows to {target} ({n_rows / elapsed if elapsed else 0:.0f} rows/sec)")
+
+
+def write_csv(chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        n_rows, started = 0, time.perf_counter()
+        with open(file_path, "w", newline="") as file_obj:
+            for chunk in chunks:
+                chunk.to_csv(file_obj, index=False, header=n_rows == 0)
+                n_rows += len(chunk)
+                _log_progress(n_rows, started, file_path)
+        return n_rows
+    except Exception as e:
+        raise CustomerException(e, sys)
+
+
+def write_parquet(chunks: Iterable[pd.DataFrame], file_path: str) -> int:
+    """One row group per chunk; needs pyarrow."""
+    try:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing parquet needs pyarrow: pip install pyarrow") from e
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        n_rows, started, writer = 0, time.perf_counter(), None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                n_rows += len(chunk)
+                _log_progress(n_rows, started, file_path)
+        finally:
+            if writer is not None:
+                writer.close()
+        return n_rows
+    except Exception as e:
+        raise CustomerException(e, sys)
+
+
+def write_mongo(chunks: Iterable[pd.DataFrame], collection_name: str, database_name: str = DATABASE_NAME,
+                drop: bool = False) -> int:
+    """Inserts every chunk with one unordered insert_many into the MONGO_DB_URL database."""
+    try:
+        collection = MongoDBClient(database_name=database_name).database[collection_name]
+        if drop:
+            collection.drop()
+        n_rows, started = 0, time.perf_counter()
+        for chunk in chunks:
+            records = chunk.replace({np.nan: None}).to_dict("records")
+            if records:
+                collection.insert_many(records, ordered=False)
+            n_rows += len(chunk)
+            _log_progress(n_rows, started, f"{database_name}.{collection_name}")
+        return n_rows
+    except Exception as e:
+        raise CustomerException(e, sys)
@@ -0,0 +1,151 @@
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.constant.prediction_pipeline import PRED_SCHEMA_FILE_PATH
+from src.constant.training_pipeline import SCHEMA_FILE_PATH
+from src.exception import CustomerException
+from src.logger import logging
+
+INT_LABELS = ("int", "int8", "int16", "int32", "int64")
+FLOAT_LABELS = ("float", "float32", "float64")
+# narrowest first; the first one holding a column's range is used
+INT_CANDIDATES = (np.int8, np.int16, np.int32, np.int64)
+# rows parsed at a time by read_csv; the parser's buffers scale with it, not with the file
+READ_CHUNK_SIZE = 10000
+
+
+def schema_layout(schema_config: dict, columns) -> str:
+    """'raw' when every column of the raw schema.yaml layout is present, 'engineered' otherwise."""
+    raw_columns = {key.strip() for entry in schema_config.get("columns") or [] if isinstance(entry, dict) for key in entry}
+    return "raw" if raw_columns and raw_columns <= {str(column).strip() for column in columns} else "engineered"
+
+
+class DtypePlanner:
+    """
+    Compact dtype of every schema column instead of the pandas defaults.
+
+    int columns get the narrowest integer type holding both the schema's bounds (value range or
+    allowed values) and the values actually present, so out-of-range rows still fit and are left
+    for validation to quarantine; int columns holding nulls become float. float columns become
+    float32 unless keep_float64 is set, object columns with allowed values become categorical
+    with the allowed values as categories, so every frame shares the same categories and codes.
+    Values outside them are appended as extra categories rather than lost, again for validation
+    to quarantine. Columns that do not parse as their schema type are left as they are.
+    """
+
+    def __init__(self, column_dtypes: Dict[str, str], value_ranges: Optional[Dict[str, list]] = None,
+                 allowed_values: Optional[Dict[str, list]] = None, keep_float64: bool = False):
+        self.column_dtypes = {column: str(dtype).strip() for column, dtype in column_dtypes.items()}
+        self.value_ranges = value_ranges or {}
+        self.allowed_values = allowed_values or {}
+        self.float_dtype = np.float64 if keep_float64 else np.float32
+
+    @classmethod
+    def from_schema(cls, layout: str, keep_float64: bool = False) -> "DtypePlanner":
+        """Planner of the raw (schema.yaml) or engineered (prediction_schema.yaml) layout."""
+        try:
+            from src.utils.main_utils import MainUtils
+
+            utils = MainUtils()
+            schema_config = utils.read_yaml_file(SCHEMA_FILE_PATH)
+            if layout == "raw":
+                column_dtypes = {key: value for entry in schema_config.get("columns") or []
+                                 if isinstance(entry, dict) for key, value in entry.items()}
+            else:
+                column_dtypes = utils.read_yaml_file(PRED_SCHEMA_FILE_PATH).get("columns") or {}
+            rules = (schema_config.get("validation") or {}).get(layout) or {}
+            return cls(
+                column_dtypes={column.strip(): dtype for column, dtype in column_dtypes.items()},
+                value_ranges=rules.get("value_ranges"),
+                allowed_values=rules.get("allowed_values"),
+                keep_float64=keep_float64,
+            )
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def _schema_bounds(self, column: str) -> Tuple[Optional[float], Optional[float]]:
+        if column in self.allowed_values:
+            levels = [level for level in self.allowed_values[column] if isinstance(level, (int, float))]
+            if levels:
+                return min(levels), max(levels)
+        lower, upper = self.value_ranges.get(column, (None, None))
+        return lower, upper
+
+    def int_dtype(self, column: str, values: Optional[pd.Series] = None) -> np.dtype:
+        """Narrowest integer type holding the schema bounds of column and the range of values."""
+        lower, upper = self._schema_bounds(column)
+        if values is not None and len(values):
+            lower = values.min() if lower is None else min(lower, values.min())
+            upper = values.max() if upper is None else max(upper, values.max())
+        if lower is None or upper is None:
+            return np.dtype(np.int64)
+        for candidate in INT_CANDIDATES:
+            info = np.iinfo(candidate)
+            if info.min <= lower and upper <= info.max:
+                return np.dtype(candidate)
+        return np.dtype(np.int64)
+
+    def category_dtype(self, column: str, values: Optional[pd.Series] = None) -> pd.CategoricalDtype:
+        """Allowed values of column as categories, followed by the other values present, sorted."""
+        categories = list(self.allowed_values[column])
+        if values is not None:
+            allowed = set(categories)
+            categories += sorted((value for value in pd.unique(values.dropna()) if value not in allowed), key=str)
+        return pd.CategoricalDtype(categories)
+
+    def plan(self, dataframe: DataFrame) -> Dict[str, object]:
+        """Target dtype of every schema column of dataframe that can be narrowed."""
+        planned = {}
+        for column, label in self.column_dtypes.items():
+            if column not in dataframe.columns:
+                continue
+            series = dataframe[column]
+            if label in INT_LABELS or label in FLOAT_LABELS:
+                if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                    continue
+                if label in FLOAT_LABELS or series.hasnans:
+                    planned[column] = np.dtype(self.float_dtype)
+                elif pd.api.types.is_integer_dtype(series):
+                    planned[column] = self.int_dtype(column, series)
+                elif (series == np.floor(series)).all():
+                    planned[column] = self.int_dtype(column, series)
+            elif label == "object" and column in self.allowed_values and (
+                    series.dtype == object or isinstance(series.dtype, pd.CategoricalDtype)):
+                planned[column] = self.category_dtype(column, series)
+        return {column: dtype for column, dtype in planned.items() if dataframe[column].dtype != dtype}
+
+    def apply(self, dataframe: DataFrame) -> DataFrame:
+        """dataframe with the planned dtypes; untouched columns are not copied."""
+        try:
+            planned = self.plan(dataframe)
+            if not planned:
+                return dataframe
+            before = dataframe.memory_usage(deep=True).sum()
+            compact = dataframe.astype(planned, copy=False)
+            after = compact.memory_usage(deep=True).sum()
+            logging.info(f"Narrowed {len(planned)} columns: {before / 2 ** 20:.2f} MB -> {after / 2 ** 20:.2f} MB")
+            return compact
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    def read_csv(self, file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> DataFrame:
+        """
+        CSV file read chunk by chunk, each chunk narrowed before the next is parsed, so the full
+        file never exists in the default dtypes. Chunks narrowed to different integer widths are
+        joined in the widest; categorical columns share their categories and stay categorical,
+        unless a chunk holds values outside the allowed ones and they are recategorized once.
+        """
+        try:
+            chunks = [self.apply(chunk) for chunk in pd.read_csv(file_path, chunksize=chunk_size)]
+            if not chunks:
+                return pd.read_csv(file_path)
+            dataframe = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
+            del chunks
+            return self.apply(dataframe)
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import sys
 from typing import Dict, Tuple
@@ -6,19 +7,18 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import pickle
-from sklearn import linear_model
 import yaml
 from dotenv import load_dotenv
 
 from pandas import DataFrame
 from sklearn.metrics import roc_auc_score
-from sklearn.model_selection import GridSearchCV
-from sklearn.utils import all_estimators
 from yaml import safe_dump
 
 from src.constant.training_pipeline import *
 from src.exception import CustomerException
 from src.logger import logging
+from src.ml.model.estimator_registry import EstimatorRegistry
+from src.ml.search import ModelSearch
 
 
 
@@ -35,6 +35,37 @@ def load_numpy_array_data(file_path: str) -> np.array:
     except Exception as e:
         raise CustomerException(e, sys) from e
     
+def compute_file_sha1(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    sha1 hex digest of a file, read in chunks
+    file_path: str location of file to hash
+    return: str 40 character hex digest
+    """
+    try:
+        digest = hashlib.sha1()
+        with open(file_path, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except Exception as e:
+        raise CustomerException(e, sys) from e
+
+
+def stable_hash_fraction(values) -> np.ndarray:
+    """
+    Deterministic number in [0, 1) for every element of a series (or row of a dataframe), from
+    pandas' fixed-key siphash of its string form, so it is the same in every run and process
+    values: pd.Series or DataFrame to hash
+    return: np.ndarray of float64
+    """
+    try:
+        values = values.astype(str)
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        return (hashes >> np.uint64(11)) / float(1 << 53)
+    except Exception as e:
+        raise CustomerException(e, sys) from e
+
+
 def write_yaml_file(file_path: str, content: object, replace: bool = False) -> None:
     try:
         if replace:
@@ -150,13 +181,7 @@ class MainUtils:
         logging.info("Entered the get_base_model method of MainUtils class")
 
         try:
-            if model_name.lower().startswith("logistic") is True:
-                model = linear_model.__dict__[model_name]()
-
-            else:
-                model_idx = [model[0] for model in all_estimators()].index(model_name)
-
-                model = all_estimators().__getitem__(model_idx)[1]()
+            model = EstimatorRegistry.create(model_name)
 
             logging.info("Exited the get_base_model method of MainUtils class")
 
@@ -171,24 +196,15 @@ class MainUtils:
         logging.info("Entered the get_model_params method of MainUtils class")
 
         try:
-            model_name = model.__class__.__name__
-
-            model_config = self.read_model_config_file()
-
-            model_param_grid = model_config["train_model"][model_name]
-
-            model_grid = GridSearchCV(
-                model, model_param_grid, 
-                verbose = 2,
-                cv = 2,
-                n_jobs = -1
-            )
+            model_search = ModelSearch(model_config_path=MODEL_TRAINER_MODEL_CONFIG_FILE_PATH,
+                                       score_cache_dir=MODEL_TRAINER_SEARCH_SCORE_CACHE_DIR,
+                                       score_cache_max_scores=MODEL_TRAINER_SEARCH_SCORE_CACHE_MAX_SCORES)
 
-            model_grid.fit(x_train, y_train)
+            model_best_params = model_search.get_best_params(model, x_train, y_train)
 
             logging.info("Exited the get_model_params method of MainUtils class")
 
-            return model_grid.best_params_
+            return model_best_params
 
         except Exception as e:
             raise CustomerException(e, sys) from e
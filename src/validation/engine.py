@@ -0,0 +1,154 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.exception import CustomerException
+from src.logger import logging
+
+INT_DTYPES = ("int", "int8", "int16", "int32", "int64")
+FLOAT_DTYPES = ("float", "float32", "float64")
+
+VALIDATION_ERRORS_COLUMN = "validation_errors"
+
+
+@dataclass
+class ValidationResult:
+    valid_mask: np.ndarray
+    row_errors: pd.Series
+    null_rates: Dict[str, float]
+    null_rate_violations: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.valid_mask)
+
+    @property
+    def n_invalid(self) -> int:
+        return int(self.n_rows - self.valid_mask.sum())
+
+    @property
+    def invalid_row_rate(self) -> float:
+        return self.n_invalid / self.n_rows if self.n_rows else 0.0
+
+
+class ValidationEngine:
+    """
+    Column-wise dtype, range, category and null-rate checks with one boolean mask per rule.
+
+    Every rule is evaluated once over its whole column and OR-ed into a single invalid-row
+    mask, so a dataset is validated in one pass. Row-level failures (a value that does not
+    parse as its schema dtype, is out of range or is not an allowed level) quarantine the row;
+    nulls never do, they are only counted against the column's maximum null rate.
+    """
+
+    def __init__(self, column_dtypes: Dict[str, str], value_ranges: Optional[Dict[str, list]] = None,
+                 allowed_values: Optional[Dict[str, list]] = None,
+                 max_null_rates: Optional[Dict[str, float]] = None, default_max_null_rate: float = 1.0):
+        self.column_dtypes = column_dtypes
+        self.value_ranges = value_ranges or {}
+        self.allowed_values = allowed_values or {}
+        self.max_null_rates = max_null_rates or {}
+        self.default_max_null_rate = default_max_null_rate
+
+    @classmethod
+    def from_rules(cls, column_dtypes: Dict[str, str], rules: Optional[dict]) -> "ValidationEngine":
+        rules = rules or {}
+        return cls(
+            column_dtypes=column_dtypes,
+            value_ranges=rules.get("value_ranges"),
+            allowed_values=rules.get("allowed_values"),
+            max_null_rates=rules.get("max_null_rates"),
+            default_max_null_rate=rules.get("default_max_null_rate", 1.0),
+        )
+
+    def _rule_masks(self, dataframe: DataFrame) -> Dict[str, np.ndarray]:
+        masks = {}
+
+        for column, dtype in self.column_dtypes.items():
+            if column not in dataframe.columns:
+                continue
+            values = dataframe[column]
+            present = values.notna().to_numpy()
+            dtype = str(dtype).strip()
+
+            if dtype in INT_DTYPES or dtype in FLOAT_DTYPES:
+                numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+                unparsed = present & np.isnan(numeric)
+                if dtype in INT_DTYPES:
+                    with np.errstate(invalid="ignore"):
+                        unparsed |= present & ~np.isnan(numeric) & (numeric != np.floor(numeric))
+                if unparsed.any():
+                    masks[f"{column}:dtype"] = unparsed
+
+        for column, bounds in self.value_ranges.items():
+            if column not in dataframe.columns:
+                continue
+            lower, upper = bounds
+            numeric = pd.to_numeric(dataframe[column], errors="coerce").to_numpy(dtype=np.float64)
+            with np.errstate(invalid="ignore"):
+                out_of_range = np.zeros(len(numeric), dtype=bool)
+                if lower is not None:
+                    out_of_range |= numeric < lower
+                if upper is not None:
+                    out_of_range |= numeric > upper
+            if out_of_range.any():
+                masks[f"{column}:range"] = out_of_range
+
+        for column, levels in self.allowed_values.items():
+            if column not in dataframe.columns:
+                continue
+            values = dataframe[column]
+            disallowed = (values.notna() & ~values.isin(levels)).to_numpy()
+            if disallowed.any():
+                masks[f"{column}:level"] = disallowed
+
+        return masks
+
+    def validate(self, dataframe: DataFrame) -> ValidationResult:
+        try:
+            masks = self._rule_masks(dataframe)
+
+            invalid = np.zeros(len(dataframe), dtype=bool)
+            for mask in masks.values():
+                invalid |= mask
+
+            invalid_positions = np.flatnonzero(invalid)
+            row_errors = pd.Series("", index=invalid_positions, dtype=object)
+            for rule, mask in masks.items():
+                failed = mask[invalid_positions]
+                row_errors[failed] = row_errors[failed] + rule + ";"
+
+            null_rates = dataframe.isna().mean().to_dict() if len(dataframe) else {}
+            null_rate_violations = {
+                column: float(rate)
+                for column, rate in null_rates.items()
+                if rate > self.max_null_rates.get(column, self.default_max_null_rate)
+            }
+
+            result = ValidationResult(
+                valid_mask=~invalid,
+                row_errors=row_errors.str.rstrip(";"),
+                null_rates={column: float(rate) for column, rate in null_rates.items()},
+                null_rate_violations=null_rate_violations,
+            )
+
+            logging.info(
+                f"Validated {result.n_rows} rows: {result.n_invalid} quarantined, "
+                f"rules failed: {sorted(masks)}, null rate violations: {null_rate_violations}"
+            )
+            return result
+
+        except Exception as e:
+            raise CustomerException(e, sys) from e
+
+    @staticmethod
+    def split(dataframe: DataFrame, result: ValidationResult) -> List[DataFrame]:
+        """Returns the valid rows and the quarantined rows with their failed rules."""
+        valid_df = dataframe[result.valid_mask]
+        invalid_df = dataframe[~result.valid_mask].copy()
+        invalid_df[VALIDATION_ERRORS_COLUMN] = result.row_errors.to_numpy()
+        return [valid_df, invalid_df]
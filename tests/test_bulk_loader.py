@@ -0,0 +1,69 @@
+import os
+import uuid
+
+import pandas as pd
+import pymongo
+import pytest
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.constant.database import SEEN_AT_FIELD, UPDATED_AT_FIELD
+from src.data_access.bulk_loader import MongoBulkLoader
+
+MONGODB_TEST_URL_KEY = "MONGODB_TEST_URL"
+COLLECTION_NAME = "customers"
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv(MONGODB_TEST_URL_KEY),
+    reason=f"mongomock 4.3 cannot run bulk_write under pymongo 4.19 (UpdateOne passes sort= to its bulk builder, "
+           f"a TypeError); set {MONGODB_TEST_URL_KEY} to a MongoDB 4.2+ server",
+)
+
+
+@pytest.fixture
+def loader():
+    client = pymongo.MongoClient(os.getenv(MONGODB_TEST_URL_KEY))
+    database_name = f"bulk_loader_{uuid.uuid4().hex[:8]}"
+    previous_client, MongoDBClient.client = MongoDBClient.client, client
+    try:
+        yield MongoBulkLoader(COLLECTION_NAME, database_name=database_name, chunk_size=2, batch_size=2)
+    finally:
+        MongoDBClient.client = previous_client
+        client.drop_database(database_name)
+
+
+def write_csv(tmp_path, rows: dict) -> str:
+    csv_path = os.path.join(tmp_path, "customers.csv")
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    return csv_path
+
+
+def documents(loader: MongoBulkLoader) -> dict:
+    return {document["ID"]: document for document in loader.mongo_client.database[COLLECTION_NAME].find()}
+
+
+def test_reload_of_unchanged_file_changes_nothing(loader, tmp_path):
+    csv_path = write_csv(tmp_path, {"ID": [1, 2, 3], "Income": [100.0, None, 300.0],
+                                    "Education": ["PhD", "Basic", "$x"]})
+    first = loader.load(csv_path)
+    assert (first.n_upserted, first.n_changed) == (3, 0)
+    before = documents(loader)
+
+    second = loader.load(csv_path)
+    after = documents(loader)
+    assert (second.n_upserted, second.n_matched, second.n_changed, second.n_unchanged) == (0, 3, 0, 3)
+    assert all(after[key][UPDATED_AT_FIELD] == before[key][UPDATED_AT_FIELD] for key in before)
+    assert all(after[key][SEEN_AT_FIELD] > before[key][SEEN_AT_FIELD] for key in before)
+    assert after[3]["Education"] == "$x"
+
+
+def test_reload_marks_changed_rows_and_prunes_missing_ones(loader, tmp_path):
+    loader.load(write_csv(tmp_path, {"ID": [1, 2, 3], "Income": [100, 200, 300]}))
+    before = documents(loader)
+
+    result = loader.load(write_csv(tmp_path, {"ID": [1, 2, 4], "Income": [100, 250, 400]}), prune=True)
+    after = documents(loader)
+    assert (result.n_upserted, result.n_changed, result.n_unchanged, result.n_pruned) == (1, 1, 1, 1)
+    assert sorted(after) == [1, 2, 4]
+    assert after[1][UPDATED_AT_FIELD] == before[1][UPDATED_AT_FIELD]
+    assert after[2][UPDATED_AT_FIELD] > before[2][UPDATED_AT_FIELD]
+    assert after[2]["Income"] == 250
@@ -0,0 +1,73 @@
+import os
+import uuid
+from datetime import datetime
+
+import mongomock
+import numpy as np
+import pandas as pd
+import pymongo
+import pytest
+
+from src.configuration.mongo_db_connection import MongoDBClient
+from src.data_access.customer_data import CustomerData
+from src.data_access.engineered_features import DEFAULT_FEATURE_COLUMNS, engineer_features
+
+RAW_FIXTURE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "marketing_campaign.csv")
+# $dateFromString and $dateDiff need a real server; point this at a MongoDB 5.0+ to also check the date column
+MONGODB_TEST_URL_KEY = "MONGODB_TEST_URL"
+COLLECTION_NAME = "raw_customers"
+REFERENCE_DATE = datetime(2024, 6, 30)
+# the only feature computed with date operators, which mongomock 4.3 does not implement
+DATE_COLUMNS = ["Days_as_Customer"]
+OFFLINE_COLUMNS = [column for column in DEFAULT_FEATURE_COLUMNS if column not in DATE_COLUMNS] + ["ID"]
+
+
+@pytest.fixture
+def raw_collection():
+    """
+    The raw fixture in a throwaway database of the test server, or of mongomock without one;
+    yields the raw frame, the database name and the feature columns the client can compute.
+    """
+    mongo_db_url = os.getenv(MONGODB_TEST_URL_KEY)
+    client = pymongo.MongoClient(mongo_db_url) if mongo_db_url else mongomock.MongoClient()
+    database_name = f"feature_parity_{uuid.uuid4().hex[:8]}"
+    raw = pd.read_csv(RAW_FIXTURE, sep="\t")
+    client[database_name][COLLECTION_NAME].insert_many(raw.replace({np.nan: None}).to_dict("records"))
+    feature_columns = DEFAULT_FEATURE_COLUMNS + ["ID"] if mongo_db_url else OFFLINE_COLUMNS
+
+    previous_client, MongoDBClient.client = MongoDBClient.client, client
+    try:
+        yield raw, database_name, feature_columns
+    finally:
+        MongoDBClient.client = previous_client
+        client.drop_database(database_name)
+
+
+def assert_features_match(raw: pd.DataFrame, database_name: str, feature_columns: list) -> None:
+    expected = engineer_features(raw, feature_columns, REFERENCE_DATE).sort_values("ID", ignore_index=True)
+    actual = CustomerData().export_engineered_features_as_dataframe(
+        COLLECTION_NAME, database_name, feature_columns=feature_columns, reference_date=REFERENCE_DATE,
+    ).sort_values("ID", ignore_index=True)
+
+    assert list(actual.columns) == feature_columns
+    for column in feature_columns:
+        pd.testing.assert_series_equal(actual[column], expected[column], check_dtype=False, obj=column)
+
+
+def test_pipeline_features_match_pandas(raw_collection):
+    raw, database_name, feature_columns = raw_collection
+    assert_features_match(raw, database_name, feature_columns)
+
+
+@pytest.mark.skipif(not os.getenv(MONGODB_TEST_URL_KEY),
+                    reason=f"mongomock lacks $dateFromString/$dateDiff; set {MONGODB_TEST_URL_KEY} to a MongoDB 5.0+")
+def test_days_as_customer_matches_pandas(raw_collection):
+    raw, database_name, _ = raw_collection
+    assert_features_match(raw, database_name, DATE_COLUMNS + ["ID"])
+
+
+def test_check_feature_parity_compares_sample(raw_collection):
+    _, database_name, feature_columns = raw_collection
+    n_rows = CustomerData().check_feature_parity(COLLECTION_NAME, database_name, sample_size=500,
+                                                 feature_columns=feature_columns, reference_date=REFERENCE_DATE)
+    assert n_rows == 500
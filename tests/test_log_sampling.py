@@ -0,0 +1,45 @@
+import logging
+import queue
+from logging.handlers import QueueHandler
+
+import numpy as np
+import pandas as pd
+
+from src.components.model_trainer import CustomerSegmentationModel
+from src.constant.training_pipeline import DEFAULT_LOG_SAMPLING
+from src.logger import log_listener
+
+N_PREDICTIONS = 1000
+# log statements of CustomerSegmentationModel.predict
+N_STATEMENTS = 3
+
+
+class _Identity:
+    def transform(self, X):
+        return X
+
+    def predict(self, X):
+        return np.zeros(len(X))
+
+
+def test_served_model_predict_is_sampled():
+    queue_handler = next(handler for handler in logging.getLogger().handlers if isinstance(handler, QueueHandler))
+    assert queue_handler.queue is log_listener.queue
+    # records go to a queue of the test, not the log file; the configured filters stay in place
+    records = queue_handler.queue = queue.SimpleQueue()
+    try:
+        model = CustomerSegmentationModel(preprocessing_object=_Identity(), trained_model_object=_Identity())
+        for _ in range(N_PREDICTIONS):
+            model.predict(pd.DataFrame({"Income": [1.0]}))
+    finally:
+        queue_handler.queue = log_listener.queue
+
+    predict_records = []
+    while not records.empty():
+        record = records.get()
+        if f"{record.module}.{record.funcName}" == "model_trainer.predict":
+            predict_records.append(record)
+
+    rate = DEFAULT_LOG_SAMPLING["model_trainer.predict"]
+    # every statement keeps exactly 1 in rate of any rate * k consecutive calls
+    assert len(predict_records) == N_STATEMENTS * N_PREDICTIONS // rate
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.synthetic.generator import ENGINEERED_SPENDING_COLUMNS, SyntheticCustomerGenerator
+
+N_ROWS = 20000
+
+
+@pytest.fixture(scope="module")
+def engineered_rows() -> pd.DataFrame:
+    generator = SyntheticCustomerGenerator(layout="engineered", seed=7)
+    return pd.concat(generator.iter_chunks(N_ROWS, chunk_size=7000))
+
+
+def test_parental_status_follows_children(engineered_rows):
+    expected = (engineered_rows["Children"] > 0).astype(int)
+    assert (engineered_rows["Parental Status"] == expected).all()
+
+
+def test_total_spending_is_sum_of_spending(engineered_rows):
+    total = engineered_rows[ENGINEERED_SPENDING_COLUMNS].sum(axis=1)
+    np.testing.assert_allclose(engineered_rows["Total_Spending"], total)
+
+
+def test_rows_keep_source_columns(engineered_rows):
+    generator = SyntheticCustomerGenerator(layout="engineered", seed=7)
+    assert list(engineered_rows.columns) == list(generator.column_order)
+    assert len(engineered_rows) == N_ROWS
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -12,14 +13,26 @@ load_dotenv(os.path.join(project_root, '.env'))
 from src.pipeline.train_pipeline import TrainPipeline
 from src.logger import logging
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the customer segmentation model")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="resume the run with this id (its artifact directory name), skipping completed stages")
+    parser.add_argument("--from-stage", metavar="STAGE",
+                        help="with --resume, run this stage and every stage after it again")
+    args = parser.parse_args()
+    if args.from_stage and not args.resume:
+        parser.error("--from-stage requires --resume")
+    return args
+
 def main():
+    args = parse_args()
     try:
         logging.info("="*50)
         logging.info("Starting Training Pipeline")
         logging.info("="*50)
         
-        train_pipeline = TrainPipeline()
-        train_pipeline.run_pipeline()
+        train_pipeline = TrainPipeline(run_id=args.resume)
+        train_pipeline.run_pipeline(resume=args.resume is not None, from_stage=args.from_stage)
         
         logging.info("="*50)
         logging.info("Training Pipeline Completed Successfully")
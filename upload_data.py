@@ -1,51 +1,58 @@
+import argparse
+import os
 import sys
-import pandas as pd
-from pymongo import MongoClient
+
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 
-def upload_data_to_mongodb():
-    try:
-        print(" Uploading data to MongoDB...")
-
-        csv_path = 'data/processed/clustered_data.csv'
-        if not os.path.exists(csv_path):
-            print(f"Error: File not found at {csv_path}")
-            sys.exit(1)
-
-        df = pd.read_csv(csv_path)
-        print(f"✅ Loaded {len(df)} records from CSV")
+from src.constant.database import (BULK_LOAD_BATCH_SIZE, BULK_LOAD_CHUNK_SIZE, BULK_LOAD_KEY_FIELD,
+                                   BULK_LOAD_MAX_WORKERS, COLLECTION_NAME, DATABASE_NAME)
+from src.data_access.bulk_loader import MongoBulkLoader
+
+
+def upload_data_to_mongodb(argv=None):
+    parser = argparse.ArgumentParser(description="Load a CSV into MongoDB with chunked, idempotent upserts")
+    parser.add_argument("--csv", default="data/processed/clustered_data.csv", help="CSV file to load")
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--key", default=BULK_LOAD_KEY_FIELD,
+                        help="column to upsert by; rows are keyed by their content hash when it is missing")
+    parser.add_argument("--mode", choices=["upsert", "swap"], default="upsert",
+                        help="upsert into the live collection, or load a staging collection and swap it in")
+    parser.add_argument("--prune", action="store_true",
+                        help="in upsert mode, delete documents that are not in the CSV")
+    parser.add_argument("--chunk-size", type=int, default=BULK_LOAD_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BULK_LOAD_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=BULK_LOAD_MAX_WORKERS)
+    args = parser.parse_args(argv)
 
-        mongo_url = os.getenv('MONGO_DB_URL')
-        if not mongo_url:
-            print("Error: MONGO_DB_URL not found in .env file")
+    try:
+        if not os.path.exists(args.csv):
+            print(f"Error: File not found at {args.csv}")
             sys.exit(1)
 
-        client = MongoClient(mongo_url)
-        db = client["CustomerDB"]
-        collection = db["customer_0"]
-
-        print("🔄 Clearing existing data...")
-        collection.delete_many({})
-
-        print("Uploading data to MongoDB...")
-        data = df.to_dict('records')
-        if data:
-            collection.insert_many(data)
-            print(f"✅ Successfully uploaded {len(data)} records to MongoDB!")
-        else:
-            print("⚠️ No data found in CSV.")
-
-        print("📂 Database:", db.name)
-        print("📁 Collection:", collection.name)
-
-        client.close()
+        print(f"Uploading {args.csv} to MongoDB ({args.mode})...")
+        loader = MongoBulkLoader(
+            collection_name=args.collection,
+            database_name=args.database,
+            key_field=args.key,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            max_workers=args.workers,
+        )
+        result = loader.load(args.csv, mode=args.mode, prune=args.prune)
+
+        print(f"✅ Loaded {result.n_rows} records in {result.seconds:.1f}s ({result.docs_per_second:.0f} docs/sec)")
+        print(f"   inserted {result.n_upserted}, changed {result.n_changed}, unchanged {result.n_unchanged}, "
+              f"pruned {result.n_pruned}")
+        print("📂 Database:", args.database)
+        print("📁 Collection:", args.collection)
 
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
 
+
 if __name__ == "__main__":
-    upload_data_to_mongodb()
\ No newline at end of file
+    upload_data_to_mongodb()